@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Auth Endpoint Latency Benchmark
+Drives each auth endpoint N times at a configurable concurrency and reports
+p50/p95/p99/max latency plus throughput from a compact log-bucket histogram
+Results are saved as JSON so a later run can be checked for regressions
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from console import emit, enable_json_output
+from gobarberly_client import BASE_URL_ENV, DEFAULT_BASE_URL, create_session
+from profiling import profiled_main
+from rate_limiter import RateLimiter, add_rate_limit_arguments, rate_limiter_from_args
+
+DEFAULT_REQUESTS = 100
+DEFAULT_CONCURRENCY = 8
+
+# Regression check: fail when p95 grows by more than this fraction
+DEFAULT_REGRESSION_THRESHOLD = 0.20
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram backed by a flat array of counters
+    Buckets grow by `precision` (1% by default) from 10us up to 10 minutes,
+    so memory stays at a few KB no matter how many samples are recorded
+    """
+
+    def __init__(self, min_value: float = 1e-5, max_value: float = 600.0, precision: float = 0.01):
+        self.min_value = min_value
+        self.log_base = math.log1p(precision)
+        self.bucket_count = int(math.log(max_value / min_value) / self.log_base) + 2
+        self.counts = array('Q', bytes(8 * self.bucket_count))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def bucket_of(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return min(self.bucket_count - 1, int(math.log(value / self.min_value) / self.log_base) + 1)
+
+    def value_of(self, bucket: int) -> float:
+        """Upper edge of a bucket"""
+        return self.min_value * math.exp(bucket * self.log_base)
+
+    def record(self, seconds: float):
+        self.counts[self.bucket_of(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        for index, value in enumerate(other.counts):
+            if value:
+                self.counts[index] += value
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        """Latency (seconds) at or below which pct% of samples fall"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * pct / 100))
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                return min(self.value_of(index), self.max)
+        return self.max
+
+
+def _json_ok(response: requests.Response) -> bool:
+    return response.status_code in (200, 201)
+
+
+class Scenario:
+    """One endpoint call with the statuses that count as success"""
+
+    def __init__(self, name: str, method: str, path: str,
+                 body: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 expected: tuple = (200, 201), setup: Optional[Callable] = None,
+                 sends_email: bool = False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.expected = expected
+        self.setup = setup
+        self.sends_email = sends_email
+
+
+def _login_for_refresh(session, base_url: str, options: Dict[str, Any], state: Dict[str, Any]):
+    """Each worker logs in once and then walks its own refresh-token chain"""
+    response = session.post(f"{base_url}/api/auth/login/",
+                            json={"email": options["email"], "password": options["password"]})
+    state["refresh"] = response.json().get('data', {}).get('refresh') if _json_ok(response) else None
+
+
+def _refresh_body(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {"refresh": state.get("refresh")}
+
+
+SCENARIOS = {
+    'health': Scenario('health', 'GET', '/api/health/'),
+    'login': Scenario('login', 'POST', '/api/auth/login/',
+                      body=lambda state: {"email": state["email"], "password": state["password"]}),
+    'forgot-password': Scenario('forgot-password', 'POST', '/api/auth/forgot-password/',
+                                body=lambda state: {"email": state["email"]}, sends_email=True),
+    # A bogus token measures the full validation path without changing any password
+    'reset-password': Scenario('reset-password', 'POST', '/api/auth/reset-password/',
+                               body=lambda state: {"token": "benchmark-invalid-token",
+                                                   "new_password": "Benchmark123!",
+                                                   "new_password_confirm": "Benchmark123!"},
+                               expected=(400,)),
+    'token-refresh': Scenario('token-refresh', 'POST', '/api/auth/token/refresh/',
+                              body=_refresh_body, setup=_login_for_refresh),
+}
+
+
+class _SharedTickets:
+    """Thread-safe iterator handing out exactly N request slots"""
+
+    def __init__(self, total: int):
+        self.counter = itertools.count()
+        self.total = total
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self.lock:
+            index = next(self.counter)
+        if index >= self.total:
+            raise StopIteration
+        return index
+
+
+class AuthBenchmark:
+    """Runs scenarios against one backend and collects their histograms"""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, concurrency: int = DEFAULT_CONCURRENCY,
+                 email: str = 'admin@gobarberly.com', password: str = 'Admin123!',
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = max(1, concurrency)
+        self.options = {"email": email, "password": password}
+        self.rate_limiter = rate_limiter
+        # Direct connections: an agent hop would be part of every timing
+        self.session = create_session(user_agent='GoBarberly-Benchmark/1.0', pool_maxsize=self.concurrency,
+                                      rate_limiter=rate_limiter, use_agent=False)
+        self.session.record_requests = False  # --json reports one record per scenario
+
+    def worker(self, scenario: Scenario, tickets, histogram: LatencyHistogram,
+               statuses: Dict[str, int]):
+        state = dict(self.options)
+        if scenario.setup:
+            scenario.setup(self.session, self.base_url, self.options, state)
+        url = f"{self.base_url}{scenario.path}"
+
+        for _ in tickets:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(
+                    scenario.method, url,
+                    json=scenario.body(state) if scenario.body else None
+                )
+                response.content  # include body download in the timing
+                status = str(response.status_code)
+                if scenario.name == 'token-refresh' and _json_ok(response):
+                    state["refresh"] = response.json().get("refresh", state.get("refresh"))
+            except requests.exceptions.RequestException as e:
+                status = type(e).__name__
+            histogram.record(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    def run(self, scenario: Scenario, requests_count: int, warmup: int = 0) -> Dict[str, Any]:
+        """Send requests_count calls spread over the worker threads"""
+        if warmup:
+            self.worker(scenario, range(warmup), LatencyHistogram(), {})
+
+        tickets = _SharedTickets(requests_count)
+        histograms = [LatencyHistogram() for _ in range(self.concurrency)]
+        statuses: List[Dict[str, int]] = [{} for _ in range(self.concurrency)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [
+                pool.submit(self.worker, scenario, tickets, histograms[i], statuses[i])
+                for i in range(self.concurrency)
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        merged = histograms[0]
+        for histogram in histograms[1:]:
+            merged.merge(histogram)
+        status_counts: Dict[str, int] = {}
+        for counts in statuses:
+            for status, count in counts.items():
+                status_counts[status] = status_counts.get(status, 0) + count
+
+        errors = sum(count for status, count in status_counts.items()
+                     if not (status.isdigit() and int(status) in scenario.expected))
+        return {
+            "count": merged.count,
+            "errors": errors,
+            "error_rate": round(errors / merged.count, 4) if merged.count else 0.0,
+            "mean_ms": round(merged.total / merged.count * 1000, 2) if merged.count else 0.0,
+            "p50_ms": round(merged.percentile(50) * 1000, 2),
+            "p95_ms": round(merged.percentile(95) * 1000, 2),
+            "p99_ms": round(merged.percentile(99) * 1000, 2),
+            "max_ms": round(merged.max * 1000, 2),
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(merged.count / elapsed, 2) if elapsed else 0.0,
+            "status_counts": status_counts
+        }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[str]:
+    """Return a message per endpoint whose p95 or error rate regressed"""
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if before["p95_ms"] and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["error_rate"] > before["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {before['error_rate']:.2%} -> {result['error_rate']:.2%}")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict[str, Any]]):
+    header = f"{'endpoint':<16} {'n':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<16} {r['count']:>6} {r['errors']:>5} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+              f"{r['p99_ms']:>9.1f} {r['max_ms']:>9.1f} {r['throughput_rps']:>8.1f}")
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Benchmark the GoBarberly auth endpoints")
+    parser.add_argument("--base-url", help=f"backend to benchmark (default: {DEFAULT_BASE_URL})")
+    parser.add_argument("--send-emails", action="store_true",
+                        help="allow email-sending endpoints (forgot-password) against the default backend")
+    parser.add_argument("--endpoints", default="health",
+                        help=f"comma-separated, from: {', '.join(SCENARIOS)} (default: health)")
+    parser.add_argument("-n", "--requests", type=int, default=DEFAULT_REQUESTS, help="requests per endpoint")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed requests per endpoint first")
+    parser.add_argument("--email", default="admin@gobarberly.com", help="account for login/forgot/refresh")
+    parser.add_argument("--password", default="Admin123!")
+    parser.add_argument("--output", help="save results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="allowed p95 growth before a regression is reported (default: 0.20)")
+    add_rate_limit_arguments(parser)
+    parser.add_argument("--json", action="store_true", help="one JSON record per endpoint instead of the table")
+    args = parser.parse_args(argv)
+    if args.json:
+        enable_json_output('auth_benchmark')
+
+    names = [name.strip() for name in args.endpoints.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown endpoint(s): {', '.join(unknown)}")
+    # Every forgot-password call mails the account; never do that to production by accident
+    emailing = [name for name in names if SCENARIOS[name].sends_email]
+    if emailing and not (args.base_url or os.environ.get(BASE_URL_ENV) or args.send_emails):
+        parser.error(f"{', '.join(emailing)} sends a real email per request; name the backend with "
+                     f"--base-url (or {BASE_URL_ENV}), or confirm with --send-emails")
+
+    bench = AuthBenchmark(args.base_url or DEFAULT_BASE_URL, args.concurrency, args.email, args.password,
+                          rate_limiter_from_args(args))
+    results = {}
+    for name in names:
+        print(f"⏱️  {name}: {args.requests} requests @ concurrency {args.concurrency}...", file=sys.stderr)
+        results[name] = bench.run(SCENARIOS[name], args.requests, warmup=args.warmup)
+        emit({"event": "benchmark", "endpoint": name, "concurrency": args.concurrency, **results[name]})
+
+    report = {
+        "meta": {
+            "base_url": bench.base_url,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "rate_limit": bench.rate_limiter.summary() if bench.rate_limiter else None
+        },
+        "results": results
+    }
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            regressions = compare_results(report, json.load(handle), args.threshold)
+        for message in regressions:
+            print(f"❌ Regression: {message}")
+            emit({"event": "regression", "message": message})
+        if regressions:
+            return False
+        print("✅ No regressions against baseline")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('auth_benchmark', main) else 1)
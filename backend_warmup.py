@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Render Cold-Start Detector and Pre-Warmer
+Wakes the backend with repeated health probes, separates the cold-start
+latency of the first probe from steady-state latency, and only reports
+ready once probe latency has settled
+Every warm-up is appended to a JSONL history for later analysis
+Interactive tools start the warm-up in the background at launch so DNS,
+TLS and the cold start overlap with the operator typing credentials
+"""
+
+import argparse
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from console import emit, enable_json_output
+from gobarberly_client import DEFAULT_BASE_URL, create_session, state_path
+from profiling import profiled_main
+
+PROBE_PATH = '/api/health/'
+
+# A sleeping Render dyno can take close to a minute to answer
+PROBE_TIMEOUT = (10, 90)
+
+# First probe slower than this (seconds) is treated as a cold start
+COLD_START_THRESHOLD = 3.0
+
+# Settled once the last N probes are within factor x (or margin above) the fastest probe
+SETTLE_PROBES = 3
+SETTLE_FACTOR = 2.0
+SETTLE_MARGIN = 0.2
+
+WARMUP_HISTORY_FILE = 'warmup-history.jsonl'
+
+# A background warm-up older than this (seconds) is redone before use;
+# Render puts an idle dyno back to sleep after about 15 minutes
+PREWARM_MAX_AGE = 600
+
+
+class BackendWarmer:
+    """
+    Probes a backend until its latency settles
+    Probes go over a plain session (no retries, backoff, rate limiting,
+    circuit breaker or agent hop) so the timings are the backend's own;
+    `session`, the tool's session, only gets a warm connection at the end
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, base_url: str = DEFAULT_BASE_URL,
+                 probe_path: str = PROBE_PATH, history_path: Optional[str] = None,
+                 probe_session: Optional[requests.Session] = None):
+        self.session = session
+        self.probe_session = probe_session or create_session(user_agent='GoBarberly-Warmup/1.0', use_agent=False)
+        self.base_url = base_url.rstrip('/')
+        self.probe_path = probe_path
+        self.history_path = history_path
+
+    def probe(self) -> Dict[str, Any]:
+        """One health probe; any HTTP answer below 500 means the dyno is up"""
+        start = time.perf_counter()
+        try:
+            response = self.probe_session.get(f"{self.base_url}{self.probe_path}", timeout=PROBE_TIMEOUT)
+            response.content
+            status = response.status_code
+            error = None
+        except requests.exceptions.RequestException as e:
+            status = None
+            error = type(e).__name__
+        return {
+            "latency": time.perf_counter() - start,
+            "status": status,
+            "up": status is not None and status < 500,
+            "error": error
+        }
+
+    @staticmethod
+    def is_settled(latencies: List[float]) -> bool:
+        """True when the last SETTLE_PROBES latencies sit near the fastest one"""
+        if len(latencies) < SETTLE_PROBES:
+            return False
+        fastest = min(latencies)
+        limit = max(fastest * SETTLE_FACTOR, fastest + SETTLE_MARGIN)
+        return all(latency <= limit for latency in latencies[-SETTLE_PROBES:])
+
+    def warm_up(self, max_wait: float = 120, max_probes: int = 20,
+                interval: float = 0.5) -> Dict[str, Any]:
+        """
+        Probe until latency settles or max_wait runs out
+        Returns cold/steady timings; 'ready' is False if the backend never came up
+        """
+        started = time.perf_counter()
+        probes = []
+        up_latencies: List[float] = []
+
+        while len(probes) < max_probes and time.perf_counter() - started < max_wait:
+            result = self.probe()
+            probes.append(result)
+            if result["up"]:
+                up_latencies.append(result["latency"])
+                if self.is_settled(up_latencies):
+                    break
+            else:
+                # Render answers 502/503 while booting; back off a little
+                time.sleep(min(interval * 4, 2))
+                continue
+            # Give a freshly woken dyno a moment; probe a warm one quickly
+            time.sleep(interval if result["latency"] >= COLD_START_THRESHOLD else interval / 5)
+
+        first = probes[0]["latency"] if probes else None
+        steady_window = up_latencies[-SETTLE_PROBES:]
+        steady = statistics.median(steady_window) if steady_window else None
+        # Time spent before the first fast-enough answer counts as cold start
+        cold_start = bool(first is not None and (
+            not probes[0]["up"] or first >= COLD_START_THRESHOLD or
+            (steady and first > max(steady * 5, steady + 1.0))
+        ))
+
+        summary = {
+            "base_url": self.base_url,
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "ready": bool(up_latencies),
+            "settled": self.is_settled(up_latencies),
+            "cold_start": cold_start,
+            "cold_latency_ms": round(first * 1000) if first is not None else None,
+            "steady_latency_ms": round(steady * 1000) if steady is not None else None,
+            "probes": len(probes),
+            "failed_probes": sum(1 for probe in probes if not probe["up"]),
+            "total_ms": round((time.perf_counter() - started) * 1000),
+            "latencies_ms": [round(probe["latency"] * 1000) for probe in probes]
+        }
+        self.record(summary)
+        if summary["ready"]:
+            self.prime()
+        return summary
+
+    def prime(self):
+        """One untimed request on the tool's session, leaving a live connection in its pool"""
+        if self.session is None or self.session is self.probe_session:
+            return
+        try:
+            # requests.Session.request skips the tool session's retry policy and rate limiter
+            requests.Session.request(self.session, 'GET', f"{self.base_url}{self.probe_path}",
+                                     timeout=PROBE_TIMEOUT).close()
+        except requests.exceptions.RequestException:
+            pass
+
+    def resolve(self):
+        """Resolve the backend host so the first connect skips the DNS lookup"""
+        parts = urlsplit(self.base_url)
+        try:
+            socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80),
+                               type=socket.SOCK_STREAM)
+        except (OSError, UnicodeError):
+            pass  # the probe will report the failure
+
+    def start_background(self, max_wait: float = 120) -> Future:
+        """
+        Resolve DNS and warm up on a daemon thread
+        The warm-up ends with a handshaken keep-alive connection in the tool
+        session's pool, so the first real request reuses it
+        """
+        pending: Future = Future()
+
+        def worker():
+            try:
+                self.resolve()
+                summary = self.warm_up(max_wait=max_wait)
+                summary["finished_at"] = time.monotonic()
+                pending.set_result(summary)
+            except Exception as e:  # surfaced to the caller via the future
+                pending.set_exception(e)
+
+        threading.Thread(target=worker, name="backend-prewarm", daemon=True).start()
+        return pending
+
+    def record(self, summary: Dict[str, Any]):
+        """Append the warm-up to the history file (best effort)"""
+        try:
+            path = self.history_path or state_path(WARMUP_HISTORY_FILE)
+            with open(path, 'a', encoding='utf-8') as handle:
+                handle.write(json.dumps(summary) + "\n")
+        except OSError:
+            pass
+
+
+def start_prewarm(session: requests.Session, base_url: str = DEFAULT_BASE_URL) -> Future:
+    """Kick off a background warm-up for a tool's session"""
+    return BackendWarmer(session, base_url).start_background()
+
+
+def finish_warm_up(session: requests.Session, base_url: str = DEFAULT_BASE_URL,
+                   pending: Optional[Future] = None) -> Dict[str, Any]:
+    """
+    Result of the background warm-up, waiting for it if still running
+    Falls back to a fresh warm-up when none was started, it failed or it is stale
+    """
+    if pending is not None:
+        try:
+            summary = pending.result()
+            if time.monotonic() - summary["finished_at"] < PREWARM_MAX_AGE:
+                return summary
+        except Exception:
+            pass
+    return BackendWarmer(session, base_url).warm_up()
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Wake the GoBarberly backend and measure cold vs warm latency")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--max-wait", type=float, default=120, help="give up after this many seconds")
+    parser.add_argument("--history", help="JSONL file to append results to (default: ~/.gobarberly/warmup-history.jsonl)")
+    parser.add_argument("--json", action="store_true", help="one compact JSON record instead of the indented summary")
+    args = parser.parse_args(argv)
+    if args.json:
+        enable_json_output('backend_warmup')
+
+    warmer = BackendWarmer(base_url=args.base_url, history_path=args.history)
+    print(f"🔥 Warming up {warmer.base_url}...", file=sys.stderr)
+    summary = warmer.warm_up(max_wait=args.max_wait)
+    print(json.dumps(summary, indent=2))
+    emit({"event": "warmup", **summary})
+    return summary["ready"]
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('backend_warmup', main) else 1)
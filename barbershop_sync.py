@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Incremental Barbershop Data Sync to SQLite
+Copies /appointments/, /sales/ and /customers/ of a barbershop account into a
+local database for offline reporting, walking the page/page_size pagination
+Each endpoint keeps a watermark (newest updated_at seen); once a full walk
+has shown that the backend honours ordering=-updated_at, later runs only
+fetch the records created or changed since the previous sync
+
+    python barbershop_sync.py --email owner@shop.com --password ... [--db shops.sqlite3]
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from console import emit, enable_json_output
+from gobarberly_client import DEFAULT_BASE_URL, create_session, state_path
+from pagination import DEFAULT_PREFETCH, iter_pages
+from profiling import profiled_main
+from retry_policy import RetryPolicy
+
+DB_FILE = 'barbershop.sqlite3'
+
+BARBERSHOP_PREFIX = '/api/barbershop'
+
+DEFAULT_PAGE_SIZE = 100
+
+# Rows written per transaction
+DEFAULT_BATCH_SIZE = 500
+
+
+class Resource(NamedTuple):
+    name: str
+    path: str
+    watermark_field: str
+
+
+RESOURCES: Dict[str, Resource] = {
+    'appointments': Resource('appointments', '/appointments/', 'updated_at'),
+    'sales': Resource('sales', '/sales/', 'updated_at'),
+    'customers': Resource('customers', '/customers/', 'updated_at'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS shops (
+    shop_id TEXT PRIMARY KEY,
+    shop_name TEXT,
+    email TEXT,
+    synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    shop_id TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    watermark TEXT,
+    last_sync REAL,
+    ordered INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (shop_id, resource)
+);
+"""
+
+RESOURCE_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    shop_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    updated_at TEXT,
+    payload TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (shop_id, id)
+)
+"""
+
+# Unchanged records are skipped, so `changes()` counts only new or modified rows
+UPSERT = """
+INSERT INTO {name} (shop_id, id, updated_at, payload, synced_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (shop_id, id) DO UPDATE SET
+    updated_at = excluded.updated_at, payload = excluded.payload, synced_at = excluded.synced_at
+WHERE payload != excluded.payload
+"""
+
+
+class SyncError(Exception):
+    """The backend refused the sync (authentication, permissions, unexpected response)"""
+
+
+def open_database(path: str) -> sqlite3.Connection:
+    """Open (and create) the sync database"""
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.executescript(SCHEMA)
+    columns = {row[1] for row in db.execute('PRAGMA table_info(sync_state)')}
+    if 'ordered' not in columns:  # databases from before ordering was verified
+        db.execute('ALTER TABLE sync_state ADD COLUMN ordered INTEGER NOT NULL DEFAULT 0')
+    for resource in RESOURCES.values():
+        db.execute(RESOURCE_TABLE.format(name=resource.name))
+    db.commit()
+    return db
+
+
+class BarbershopSync:
+    """
+    Pulls the barbershop endpoints of one account into SQLite
+    Pages are requested newest-first. A complete walk that comes back stamped
+    and strictly newest-first marks the ordering as honoured; only then do
+    later runs stop at the first page reaching records older than the
+    watermark. Until then (or once the order breaks) every page is read,
+    which is still only written where a record changed
+    """
+
+    def __init__(self, db: sqlite3.Connection, base_url: str = DEFAULT_BASE_URL,
+                 session: Optional[requests.Session] = None,
+                 page_size: int = DEFAULT_PAGE_SIZE, batch_size: int = DEFAULT_BATCH_SIZE,
+                 prefetch: int = DEFAULT_PREFETCH):
+        self.db = db
+        self.base_url = base_url.rstrip('/')
+        self.session = session or create_session(retry_policy=RetryPolicy(),
+                                                 user_agent='GoBarberly-Sync/1.0')
+        self.page_size = page_size
+        self.batch_size = max(1, batch_size)
+        self.prefetch = prefetch
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        response = self.session.get(f"{self.base_url}{BARBERSHOP_PREFIX}{path}", params=params)
+        if response.status_code in (401, 403):
+            raise SyncError(f"{path}: access denied ({response.status_code}); log in as a barbershop account")
+        return response
+
+    def shop(self) -> Dict[str, Any]:
+        """Profile of the signed-in barbershop; its id scopes every synced row"""
+        response = self.get('/profile/')
+        if response.status_code != 200:
+            raise SyncError(f"/profile/: HTTP {response.status_code}")
+        profile = response.json()
+        if isinstance(profile.get('data'), dict):
+            profile = profile['data']
+        if profile.get('id') is None:
+            raise SyncError("/profile/: no shop id in the response")
+        return profile
+
+    def pages(self, resource: Resource, prefetch: int) -> Iterator[List[Dict[str, Any]]]:
+        """Records page by page, newest first, until the last page"""
+        pages = iter_pages(self.session, f"{self.base_url}{BARBERSHOP_PREFIX}{resource.path}",
+                           {'ordering': f'-{resource.watermark_field}'}, self.page_size, prefetch)
+        try:
+            for page in pages:
+                if page.records:
+                    yield page.records
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code
+            if status in (401, 403):
+                raise SyncError(f"{resource.path}: access denied ({status}); log in as a barbershop account")
+            raise SyncError(f"{resource.path}: HTTP {status}")
+        finally:
+            pages.close()
+
+    def state(self, shop_id: str, resource: Resource) -> Tuple[Optional[str], bool]:
+        """Watermark and whether the backend was seen honouring the ordering"""
+        row = self.db.execute('SELECT watermark, ordered FROM sync_state WHERE shop_id = ? AND resource = ?',
+                              (shop_id, resource.name)).fetchone()
+        return (row[0], bool(row[1])) if row else (None, False)
+
+    def sync_resource(self, shop_id: str, resource: Resource, full: bool = False) -> Dict[str, Any]:
+        """Fetch one endpoint and upsert its records; returns the run's counts"""
+        start = time.perf_counter()
+        field = resource.watermark_field
+        watermark, ordered = (None, False) if full else self.state(shop_id, resource)
+        upsert = UPSERT.format(name=resource.name)
+        stats = {"resource": resource.name, "pages": 0, "fetched": 0, "written": 0,
+                 "watermark": watermark, "incremental": watermark is not None and ordered}
+        newest = watermark
+        previous = None  # last timestamp seen, to notice a backend that ignores the ordering
+        in_order = True  # every record stamped and no newer than the one before
+        descending = False  # at least one step down, so the order is not a coincidence of equal stamps
+        batch: List[Tuple] = []
+
+        def flush():
+            if batch:
+                with self.db:
+                    before = self.db.total_changes
+                    self.db.executemany(upsert, batch)
+                    stats["written"] += self.db.total_changes - before
+                batch.clear()
+
+        # Incremental runs usually stop after a page or two; don't request pages they won't read
+        prefetch = 0 if stats["incremental"] else self.prefetch
+        for records in self.pages(resource, prefetch):
+            stats["pages"] += 1
+            stats["fetched"] += len(records)
+            reached_old = False
+            now = time.time()
+            for record in records:
+                stamp = record.get(field)
+                if stamp is None or (previous is not None and stamp > previous):
+                    in_order = False
+                    stats["incremental"] = False  # unordered or unstamped: walk everything
+                elif previous is not None and stamp < previous:
+                    descending = True
+                previous = stamp if stamp is not None else previous
+                if stamp is not None and (newest is None or stamp > newest):
+                    newest = stamp
+                if stats["incremental"] and stamp < watermark:
+                    reached_old = True  # equal stamps are re-read: a tie may still be new
+                    continue
+                batch.append((shop_id, str(record.get('id')), stamp,
+                              json.dumps(record, sort_keys=True), now))
+            if len(batch) >= self.batch_size:
+                flush()
+            if reached_old and stats["incremental"]:
+                break
+
+        flush()
+        with self.db:
+            self.db.execute(
+                'INSERT INTO sync_state (shop_id, resource, watermark, last_sync, ordered) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (shop_id, resource) DO UPDATE SET '
+                'watermark = excluded.watermark, last_sync = excluded.last_sync, ordered = excluded.ordered',
+                (shop_id, resource.name, newest, time.time(), int(in_order and (descending or ordered)))
+            )
+        stats["watermark"] = newest
+        stats["ordering_verified"] = in_order and (descending or ordered)
+        stats["duration_ms"] = round((time.perf_counter() - start) * 1000)
+        return stats
+
+    def run(self, resources: List[str], full: bool = False) -> List[Dict[str, Any]]:
+        """Sync the given resources of the signed-in shop"""
+        profile = self.shop()
+        shop_id = str(profile['id'])
+        with self.db:
+            self.db.execute(
+                'INSERT INTO shops (shop_id, shop_name, email, synced_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (shop_id) DO UPDATE SET shop_name = excluded.shop_name, '
+                'email = excluded.email, synced_at = excluded.synced_at',
+                (shop_id, profile.get('shop_name'), profile.get('email'), time.time())
+            )
+        return [dict(self.sync_resource(shop_id, RESOURCES[name], full), shop_id=shop_id)
+                for name in resources]
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Sync barbershop appointments, sales and customers to SQLite")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--email", help="barbershop account to log in with")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="access token instead of --email/--password")
+    parser.add_argument("--db", help=f"SQLite database (default: ~/.gobarberly/{DB_FILE})")
+    parser.add_argument("--resources", default=','.join(RESOURCES),
+                        help="comma-separated subset of: " + ', '.join(RESOURCES))
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH,
+                        help="pages fetched ahead on full syncs (0: one at a time)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--full", action="store_true", help="ignore the watermarks and re-read everything")
+    parser.add_argument("--json", action="store_true", help="JSON-lines records instead of text")
+    args = parser.parse_args(argv)
+    if args.json:
+        enable_json_output('barbershop_sync')
+
+    resources = [name.strip() for name in args.resources.split(',') if name.strip()]
+    unknown = [name for name in resources if name not in RESOURCES]
+    if unknown:
+        parser.error(f"unknown resource(s): {', '.join(unknown)}")
+    if not args.token and not args.email:
+        parser.error("give --email/--password or --token")
+
+    from token_cache import login_with_cache
+
+    base_url = args.base_url.rstrip('/')
+    db_path = args.db or state_path(DB_FILE)
+    session = create_session(retry_policy=RetryPolicy(), user_agent='GoBarberly-Sync/1.0')
+    start = time.perf_counter()
+    try:
+        if args.token:
+            session.headers['Authorization'] = f'Bearer {args.token}'
+        elif not login_with_cache(session, base_url, args.email, args.password or ''):
+            print("❌ Login rejected", file=sys.stderr)
+            emit({"event": "result", "operation": "barbershop_sync", "success": False, "error": "login rejected"})
+            return False
+
+        db = open_database(db_path)
+        try:
+            results = BarbershopSync(db, base_url, session, args.page_size, args.batch_size,
+                                     args.prefetch).run(resources, args.full)
+        finally:
+            db.close()
+    except (SyncError, requests.exceptions.RequestException, ValueError) as e:
+        print(f"❌ Sync failed: {e}", file=sys.stderr)
+        emit({"event": "result", "operation": "barbershop_sync", "success": False, "error": str(e)})
+        return False
+
+    print(f"🗄️  {db_path}")
+    for stats in results:
+        mode = "incremental" if stats["incremental"] else "full"
+        print(f"✅ {stats['resource']:<13} {stats['fetched']:>7} fetched  {stats['written']:>7} written  "
+                      f"{stats['pages']:>4} pages  {stats['duration_ms']:>6} ms  ({mode}, "
+                      f"watermark {stats['watermark'] or '-'})")
+        emit({"event": "sync", **stats})
+    emit({"event": "result", "operation": "barbershop_sync", "success": True,
+          "duration_ms": round((time.perf_counter() - start) * 1000)})
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('barbershop_sync', main) else 1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Resumable Batch Journal
+Append-only JSONL journal of completed batch items, fsynced in batches
+A dbm index of finished row keys lets --resume skip rows in O(1)
+"""
+
+import dbm
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Index key holding how many journal bytes are already reflected in the index
+OFFSET_KEY = b'__journal_offset__'
+
+
+def row_key(row: Dict[str, Any]) -> str:
+    """Stable identity of a manifest row (email + token)"""
+    raw = f"{row.get('email', '')}\x00{row.get('token', '')}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+
+class BatchJournal:
+    """
+    Append-only journal with a batched fsync and an on-disk completion index
+    The journal file is the source of truth; the index is rebuilt from its
+    tail on open, so a crash between the two never loses a completed row
+    """
+
+    def __init__(self, path: str, sync_every: int = 64, sync_interval: float = 1.0):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.sync_every = max(1, sync_every)
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()
+
+        self.index = dbm.open(self.index_path, 'c')
+        self.pending_keys = []
+        self.last_sync = time.monotonic()
+        self.skipped = 0
+
+        # Replay (and cut a torn tail) before appending, so new entries start on a fresh line
+        self._replay_tail()
+        self.journal = open(path, 'ab')
+
+    def _replay_tail(self):
+        """Index any journal entries written after the last index update"""
+        indexed = int(self.index.get(OFFSET_KEY, b'0'))
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if indexed >= size:
+            return
+
+        with open(self.path, 'r+b') as handle:
+            handle.seek(indexed)
+            offset = indexed
+            for line in handle:
+                # A torn final line (crash mid-write) is cut off below
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('success'):
+                    self.index[entry['key'].encode()] = b'1'
+            if offset < size:
+                handle.truncate(offset)
+                handle.flush()
+                os.fsync(handle.fileno())
+
+        self.index[OFFSET_KEY] = str(offset).encode()
+        self._sync_index()
+
+    def _sync_index(self):
+        sync = getattr(self.index, 'sync', None)
+        if sync:
+            sync()
+
+    def is_done(self, key: str) -> bool:
+        """True when this row already completed successfully"""
+        with self.lock:
+            return key.encode() in self.index
+
+    def record(self, key: str, result: Dict[str, Any]):
+        """Append a result; fsync once per batch instead of once per row"""
+        entry = dict(result, key=key, recorded_at=time.time())
+        with self.lock:
+            self.journal.write((json.dumps(entry) + "\n").encode('utf-8'))
+            if result.get('success'):
+                self.pending_keys.append(key)
+
+            due = time.monotonic() - self.last_sync >= self.sync_interval
+            if len(self.pending_keys) >= self.sync_every or due:
+                self._sync()
+
+    def _sync(self):
+        """Make the journal durable, then publish pending keys to the index"""
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+        for key in self.pending_keys:
+            self.index[key.encode()] = b'1'
+        self.index[OFFSET_KEY] = str(self.journal.tell()).encode()
+        self._sync_index()
+
+        self.pending_keys = []
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        """Flush everything still buffered and close both files"""
+        with self.lock:
+            if self.journal.closed:
+                return
+            self._sync()
+            self.journal.close()
+            self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def default_journal_path(manifest: str) -> Optional[str]:
+    """Journal file that sits next to the manifest (None for stdin)"""
+    return None if manifest == '-' else f"{manifest}.journal"
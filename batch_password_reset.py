@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Batch Password Reset
+Streams email/token/password rows from a CSV or JSONL manifest
+Runs the resets concurrently over one pooled session and writes
+one JSON result line per row, written out in buffered blocks
+Completed rows are journaled so an interrupted run can --resume
+"""
+
+import argparse
+import csv
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, Optional, TextIO
+
+from batch_journal import BatchJournal, default_journal_path, row_key
+from console import JsonLinesWriter
+from direct_password_reset import PasswordResetManager
+from gobarberly_client import DEFAULT_BASE_URL
+from profiling import profiled_main
+from rate_limiter import DEFAULT_ENDPOINT_RATES, add_rate_limit_arguments, rate_limiter_from_args
+
+DEFAULT_WORKERS = 8
+
+# Accepted column names for each manifest field
+EMAIL_KEYS = ('email',)
+TOKEN_KEYS = ('token', 'reset_token')
+PASSWORD_KEYS = ('password', 'new_password')
+
+
+def _pick(row: Dict[str, Any], keys) -> str:
+    """Return the first non-empty value among the accepted column names"""
+    for key in keys:
+        value = row.get(key)
+        if value:
+            return str(value).strip()
+    return ''
+
+
+def _read_jsonl(handle) -> Iterator[Any]:
+    """Yield each non-blank line's object, or an error message for a line that is not one"""
+    for line_no, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else f"invalid manifest line {line_no}"
+
+
+def read_manifest(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield manifest rows one at a time (never loads the whole file)
+    Format is picked from the extension: .jsonl/.ndjson or CSV with a header row
+    Use '-' to read CSV from stdin
+    """
+    is_jsonl = path.endswith(('.jsonl', '.ndjson'))
+    handle = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+
+    try:
+        rows = _read_jsonl(handle) if is_jsonl else csv.DictReader(handle)
+        for line_no, row in enumerate(rows, start=1):
+            if isinstance(row, str):
+                # Unparseable line: becomes a failed result row instead of ending the batch
+                yield {"row": line_no, "email": '', "token": '', "password": '', "error": row}
+                continue
+            yield {
+                "row": line_no,
+                "email": _pick(row, EMAIL_KEYS),
+                "token": _pick(row, TOKEN_KEYS),
+                "password": _pick(row, PASSWORD_KEYS)
+            }
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+class BatchPasswordReset:
+    """Runs reset-password calls for a manifest with a bounded worker count"""
+
+    def __init__(self, manager: PasswordResetManager, workers: int = DEFAULT_WORKERS,
+                 output: TextIO = sys.stdout, journal: Optional[BatchJournal] = None,
+                 resume: bool = False):
+        self.manager = manager
+        self.workers = max(1, workers)
+        # Result lines are written in blocks; the journal is what survives a crash
+        self.output = JsonLinesWriter(output)
+        self.journal = journal
+        self.resume = resume and journal is not None
+        self.output_lock = threading.Lock()
+        self.stats = {"total": 0, "succeeded": 0, "failed": 0, "skipped": 0}
+
+    def reset_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Reset one manifest row and build its result record"""
+        record = {"row": row["row"], "email": row["email"], "key": row_key(row)}
+
+        if row.get("error"):
+            record.update(success=False, status=None, duration_ms=None, message=None, error=row["error"])
+            return record
+
+        if not row["email"] or not row["token"] or not row["password"]:
+            record.update(success=False, status=None, duration_ms=None, message=None,
+                          error="Row needs email, token and password")
+            return record
+
+        try:
+            record.update(self.manager.submit_password_reset(row["token"], row["password"]))
+        except Exception as e:
+            record.update(success=False, status=None, duration_ms=None, message=None, error=str(e))
+        return record
+
+    def write_result(self, record: Dict[str, Any]):
+        """Write one JSON line and update the counters"""
+        with self.output_lock:
+            self.stats["total"] += 1
+            self.stats["succeeded" if record["success"] else "failed"] += 1
+            key = record.pop("key")
+            if self.journal:
+                self.journal.record(key, record)
+            self.output.write(record)
+
+    def run(self, rows) -> Dict[str, Any]:
+        """Process rows; at most 2x workers rows are held in memory at once"""
+        start_time = time.time()
+        max_in_flight = self.workers * 2
+        interrupted = False
+        error = None
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        in_flight = set()
+        written = set()  # futures whose result is already out, so an interrupt never writes them twice
+
+        def write_done(done):
+            for future in done:
+                if future not in written:
+                    self.write_result(future.result())
+                    written.add(future)
+                in_flight.discard(future)
+
+        try:
+            for row in rows:
+                if self.resume and self.journal.is_done(row_key(row)):
+                    self.stats["skipped"] += 1
+                    continue
+                if len(in_flight) >= max_in_flight:
+                    write_done(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                in_flight.add(pool.submit(self.reset_row, row))
+
+            write_done(wait(in_flight).done)
+        except (KeyboardInterrupt, Exception) as e:
+            # Let running resets finish and journal them; drop queued ones
+            interrupted = True
+            if not isinstance(e, KeyboardInterrupt):
+                error = f"{type(e).__name__}: {e}"
+            pool.shutdown(wait=True, cancel_futures=True)
+            write_done([future for future in list(in_flight) if future.done() and not future.cancelled()])
+        finally:
+            pool.shutdown(wait=True)
+            self.output.flush()
+
+        summary = dict(self.stats)
+        summary["interrupted"] = interrupted
+        if error:
+            summary["error"] = error
+        summary["duration_ms"] = round((time.time() - start_time) * 1000)
+        return summary
+
+
+def batch_main(argv: Optional[list] = None) -> bool:
+    """Command line entry for batch mode"""
+    parser = argparse.ArgumentParser(
+        prog="direct_password_reset.py --batch",
+        description="Reset many passwords from a CSV/JSONL manifest (email, token, password)"
+    )
+    parser.add_argument("manifest", help="CSV with header row, .jsonl file, or '-' for CSV on stdin")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent resets (default: 8)")
+    parser.add_argument("--output", help="write JSON result lines here instead of stdout")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help="backend URL")
+    parser.add_argument("--skip-connectivity", action="store_true", help="do not test the backend first")
+    parser.add_argument("--journal", help="journal file (default: <manifest>.journal)")
+    parser.add_argument("--resume", action="store_true", help="skip rows the journal already marks as done")
+    add_rate_limit_arguments(parser, default_note="none")
+    parser.add_argument("--paced", action="store_true",
+                        help="apply the standard ceilings (forgot-password 2/s, reset-password and login 10/s)")
+    args = parser.parse_args(argv)
+
+    journal_path = args.journal or default_journal_path(args.manifest)
+    if args.resume and not journal_path:
+        parser.error("--resume with a stdin manifest needs --journal")
+
+    # Unpaced by default: limiter waits would stretch the run and every row's duration_ms
+    rate_limiter = rate_limiter_from_args(args, DEFAULT_ENDPOINT_RATES if args.paced else None)
+    manager = PasswordResetManager(args.base_url, pool_maxsize=args.workers, rate_limiter=rate_limiter)
+
+    # Progress goes to stderr so stdout stays pure JSON lines
+    if not args.skip_connectivity:
+        stdout, sys.stdout = sys.stdout, sys.stderr
+        try:
+            reachable = manager.test_connectivity()
+        finally:
+            sys.stdout = stdout
+        if not reachable:
+            return False
+
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    journal = BatchJournal(journal_path) if journal_path else None
+    try:
+        batch = BatchPasswordReset(manager, workers=args.workers, output=output,
+                                   journal=journal, resume=args.resume)
+        summary = batch.run(read_manifest(args.manifest))
+    finally:
+        if journal:
+            journal.close()
+        if output is not sys.stdout:
+            output.close()
+
+    if rate_limiter:
+        summary["rate_limit"] = rate_limiter.summary()
+    print(json.dumps({"summary": summary}), file=sys.stderr)
+    if summary.get("error"):
+        print(f"Stopped by {summary['error']} - rerun with --resume to continue from {journal_path}", file=sys.stderr)
+    elif summary["interrupted"]:
+        print(f"Interrupted - rerun with --resume to continue from {journal_path}", file=sys.stderr)
+    return summary["failed"] == 0 and not summary["interrupted"]
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('batch_password_reset', batch_main) else 1)
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Chain-Wide Analytics from the Synced Barbershop Data
+Computes the dashboard aggregates (monthly revenue, service popularity,
+staff performance) for every shop in the barbershop_sync database at once,
+as vectorized NumPy group-bys instead of one HTTP call per shop and chart
+
+    python chain_analytics.py [--db ~/.gobarberly/barbershop.sqlite3] [--per-shop] [--json]
+
+Needs the optional `numpy` package (pip install numpy)
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from console import emit, enable_json_output
+from gobarberly_client import state_path
+from profiling import profiled_main
+
+try:
+    import numpy as np
+except ImportError:  # optional: only this tool needs it
+    np = None
+
+# Appointments that never happened don't count towards a month
+EXCLUDED_STATUSES = ('cancelled', 'no_show')
+
+# Rows fetched from SQLite per step while building the columns
+FETCH_SIZE = 100_000
+
+# Bump when the column layout changes so stale caches are rebuilt
+CACHE_VERSION = 1
+
+# Both queries return the rows synced at or after a given time, in rowid order:
+# the sync never deletes and gives every new or changed row a fresh synced_at, so
+# a cache only needs those rows patched in (an upsert keeps the row's rowid). The
+# bound is inclusive because one sync stamps many rows, possibly committed after
+# the cache was built, with the same synced_at; merge() dedupes the re-read ones
+SALES_QUERY = """
+SELECT rowid, synced_at, shop_id,
+       COALESCE(CAST(substr(json_extract(payload, '$.sale_date'), 1, 4) AS INTEGER) * 100
+                + CAST(substr(json_extract(payload, '$.sale_date'), 6, 2) AS INTEGER), 0),
+       COALESCE(json_extract(payload, '$.service'), ''),
+       COALESCE(json_extract(payload, '$.barber_name'), ''),
+       COALESCE(CAST(json_extract(payload, '$.amount') AS REAL), 0.0)
+FROM sales
+WHERE synced_at >= ?
+ORDER BY rowid
+"""
+
+APPOINTMENTS_QUERY = """
+SELECT rowid, synced_at, shop_id,
+       COALESCE(CAST(substr(json_extract(payload, '$.appointment_date'), 1, 4) AS INTEGER) * 100
+                + CAST(substr(json_extract(payload, '$.appointment_date'), 6, 2) AS INTEGER), 0),
+       COALESCE(json_extract(payload, '$.service'), ''),
+       COALESCE(json_extract(payload, '$.barber_name'), ''),
+       COALESCE(json_extract(payload, '$.status'), '')
+FROM appointments
+WHERE synced_at >= ?
+ORDER BY rowid
+"""
+
+# Column name -> kind; 'category' and 'month' columns are dictionary-encoded
+SALES_COLUMNS = (('shop', 'category'), ('month', 'month'), ('service', 'category'),
+                 ('barber', 'category'), ('amount', 'float'))
+APPOINTMENT_COLUMNS = (('shop', 'category'), ('month', 'month'), ('service', 'category'),
+                       ('barber', 'category'), ('status', 'category'))
+ENCODED_KINDS = ('category', 'month')
+
+# group_by counts straight into a dense array when there are at most this many possible keys
+DENSE_GROUP_LIMIT = 1 << 22
+
+
+def _dtype(kind: str):
+    return {'month': np.int32, 'float': np.float64}.get(kind, np.str_)
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """NumPy is not installed"""
+
+
+def require_numpy():
+    if np is None:
+        raise AnalyticsUnavailable("chain_analytics needs NumPy: pip install numpy")
+
+
+class Table:
+    """
+    Columnar table: one NumPy array per column, plus the SQLite rowid of each row
+    Strings and months are stored as int32 codes into an array of categories,
+    so every group-by runs on small dense integers
+    """
+
+    def __init__(self, rowid, columns: Dict[str, Any], categories: Dict[str, Any], synced_through: float = 0.0):
+        self.rowid = rowid
+        self.columns = columns
+        self.categories = categories
+        self.synced_through = synced_through  # newest synced_at included
+
+    def __len__(self) -> int:
+        return len(self.rowid)
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def labels(self, name: str, codes) -> List[Any]:
+        return self.categories[name][codes].tolist()
+
+    def filter(self, mask) -> 'Table':
+        return Table(self.rowid[mask], {name: column[mask] for name, column in self.columns.items()},
+                     self.categories, self.synced_through)
+
+    @classmethod
+    def from_query(cls, db: sqlite3.Connection, query: str, layout: Tuple[Tuple[str, str], ...],
+                   since: float = 0.0) -> 'Table':
+        """Rows synced at or after `since` as columns, read FETCH_SIZE rows at a time"""
+        encoders: Dict[str, Dict[Any, int]] = {name: {} for name, kind in layout if kind in ENCODED_KINDS}
+        chunks: Dict[str, List[Any]] = {name: [] for name in ['rowid'] + [name for name, _ in layout]}
+        synced_through = since
+        cursor = db.execute(query, (since,))
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            rowids, synced, *values = zip(*rows)
+            chunks['rowid'].append(np.array(rowids, dtype=np.int64))
+            synced_through = max(synced_through, max(synced))
+            for (name, kind), column in zip(layout, values):
+                if kind in ENCODED_KINDS:
+                    encoder = encoders[name]
+                    chunks[name].append(np.fromiter((encoder.setdefault(value, len(encoder)) for value in column),
+                                                    np.int32, len(column)))
+                else:
+                    chunks[name].append(np.array(column, dtype=_dtype(kind)))
+
+        def joined(name: str, dtype):
+            return np.concatenate(chunks[name]) if chunks[name] else np.array([], dtype=dtype)
+
+        columns = {name: joined(name, np.int32 if kind in ENCODED_KINDS else _dtype(kind)) for name, kind in layout}
+        categories = {name: np.array(list(encoder), dtype=_dtype(dict(layout)[name]))
+                      for name, encoder in encoders.items()}
+        return cls(joined('rowid', np.int64), columns, categories, synced_through)
+
+    def merge(self, delta: 'Table') -> 'Table':
+        """This table with the rows of `delta` replacing (same rowid) or added to its own"""
+        columns, categories = {}, {}
+        for name, codes in delta.columns.items():
+            if name in self.categories:
+                # Re-code the delta's categories into ours, appending the new ones
+                encoder = {value: code for code, value in enumerate(self.categories[name].tolist())}
+                mapping = np.array([encoder.setdefault(value, len(encoder))
+                                    for value in delta.categories[name].tolist()], dtype=np.int32)
+                dtype = np.str_ if self.categories[name].dtype.kind == 'U' else self.categories[name].dtype
+                categories[name] = np.array(list(encoder), dtype=dtype)  # str_ re-widens for longer values
+                codes = mapping[codes] if len(codes) else codes
+            columns[name] = codes
+
+        positions = np.searchsorted(self.rowid, delta.rowid)
+        positions[positions >= len(self.rowid)] = 0
+        existing = (self.rowid[positions] == delta.rowid) if len(self.rowid) else np.zeros(len(delta), bool)
+        merged = {}
+        for name, column in self.columns.items():
+            column = column.copy()
+            column[positions[existing]] = columns[name][existing]
+            merged[name] = np.concatenate([column, columns[name][~existing]])
+        rowid = np.concatenate([self.rowid, delta.rowid[~existing]])
+        order = np.argsort(rowid, kind='stable')
+        if not np.array_equal(order, np.arange(len(rowid))):
+            rowid = rowid[order]
+            merged = {name: column[order] for name, column in merged.items()}
+        return Table(rowid, merged, categories, max(self.synced_through, delta.synced_through))
+
+    def same_as(self, other: 'Table') -> bool:
+        """True when both tables hold the same rows, values and categories"""
+        return (np.array_equal(self.rowid, other.rowid) and self.synced_through == other.synced_through
+                and all(np.array_equal(column, other.columns[name]) for name, column in self.columns.items())
+                and all(np.array_equal(values, other.categories[name]) for name, values in self.categories.items()))
+
+    def save(self, path: str):
+        arrays = {f"col_{name}": column for name, column in self.columns.items()}
+        arrays.update({f"cat_{name}": values for name, values in self.categories.items()})
+        temp_path = f"{path}.tmp.npz"
+        np.savez(temp_path, version=CACHE_VERSION, rowid=self.rowid, synced_through=self.synced_through, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['Table']:
+        """Cached columns, or None when there is no usable cache"""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['version']) != CACHE_VERSION:
+                    return None
+                columns = {name[4:]: data[name] for name in data.files if name.startswith('col_')}
+                categories = {name[4:]: data[name] for name in data.files if name.startswith('cat_')}
+                return cls(data['rowid'], columns, categories, float(data['synced_through']))
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def load_table(db: sqlite3.Connection, db_path: str, table: str, query: str, layout,
+               cache_dir: Optional[str]) -> Table:
+    """
+    Columns of a synced table; with a cache directory only the rows synced
+    since the last run are read from SQLite and patched into the cached columns
+    """
+    if cache_dir is None:
+        return Table.from_query(db, query, layout)
+    path = os.path.join(cache_dir, f"{os.path.basename(db_path)}.{table}.npz")
+    cached = Table.load(path)
+    if cached is None:
+        loaded = Table.from_query(db, query, layout)
+    else:
+        delta = Table.from_query(db, query, layout, cached.synced_through)
+        if not len(delta):
+            return cached
+        loaded = cached.merge(delta)
+        if loaded.same_as(cached):
+            return cached  # only the rows at synced_through came back again
+    loaded.save(path)
+    return loaded
+
+
+def group_by(keys: List[Any], weights: Optional[Any] = None) -> Tuple[List[Any], Any, Any]:
+    """
+    Group rows by one or more dictionary-encoded key columns
+    Returns (key columns of each group, row count per group, weight sum per group)
+    """
+    sizes = [int(key.max()) + 1 if len(key) else 1 for key in keys]
+    combined = np.zeros(len(keys[0]), dtype=np.int64)
+    for key, size in zip(keys, sizes):
+        combined = combined * size + key
+    possible = int(np.prod(sizes, dtype=np.int64))
+    if possible <= DENSE_GROUP_LIMIT:
+        # One O(n) pass: count into every possible key, keep the ones that occur
+        counts = np.bincount(combined, minlength=possible)
+        groups = np.flatnonzero(counts)
+        counts = counts[groups]
+        sums = np.bincount(combined, weights=weights, minlength=possible)[groups] if weights is not None else counts
+    else:
+        groups, inverse = np.unique(combined, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(groups))
+        sums = np.bincount(inverse, weights=weights, minlength=len(groups)) if weights is not None else counts
+    group_keys = []
+    for size in reversed(sizes):
+        group_keys.append(groups % size)
+        groups = groups // size
+    return group_keys[::-1], counts, sums
+
+
+def _month_label(month: int) -> str:
+    return f"{month // 100:04d}-{month % 100:02d}" if month else 'unknown'
+
+
+def monthly_revenue(sales: Table, appointments: Table, per_shop: bool = False) -> List[Dict[str, Any]]:
+    """Revenue (sales) and appointments held (not cancelled / no-show) per month"""
+    excluded = np.isin(appointments.categories['status'], EXCLUDED_STATUSES)
+    held = appointments.filter(~excluded[appointments['status']]) if len(appointments) else appointments
+
+    rows: Dict[Tuple, Dict[str, Any]] = {}
+    for table, field in ((sales, 'revenue'), (held, 'appointments')):
+        if not len(table):
+            continue
+        keys = [table['shop'], table['month']] if per_shop else [table['month']]
+        group_keys, counts, sums = group_by(keys, table['amount'] if field == 'revenue' else None)
+        shops = table.labels('shop', group_keys[0]) if per_shop else [None] * len(counts)
+        months = table.labels('month', group_keys[-1])
+        values = sums.tolist() if field == 'revenue' else counts.tolist()
+        for shop, month, value in zip(shops, months, values):
+            row = rows.setdefault((shop, month), {"month": _month_label(month), "revenue": 0.0, "appointments": 0})
+            if per_shop:
+                row["shop_id"] = shop
+            row[field] = round(value, 2) if field == 'revenue' else int(value)
+    return [rows[key] for key in sorted(rows, key=lambda k: (k[0] or '', k[1]))]
+
+
+def service_popularity(sales: Table, per_shop: bool = False) -> List[Dict[str, Any]]:
+    """Services by number of sales, with their revenue"""
+    return _ranking(sales, 'service', ('service', 'count', 'revenue'), per_shop)
+
+
+def staff_performance(sales: Table, per_shop: bool = False) -> List[Dict[str, Any]]:
+    """Services sold and revenue per staff member"""
+    return _ranking(sales, 'barber', ('staff_name', 'total_services', 'total_revenue'), per_shop)
+
+
+def _ranking(sales: Table, column: str, fields: Tuple[str, str, str], per_shop: bool) -> List[Dict[str, Any]]:
+    if not len(sales):
+        return []
+    keys = [sales['shop'], sales[column]] if per_shop else [sales[column]]
+    group_keys, counts, sums = group_by(keys, sales['amount'])
+    names = sales.labels(column, group_keys[-1])
+    shops = sales.labels('shop', group_keys[0]) if per_shop else [None] * len(names)
+    rows = []
+    for shop, name, count, total in zip(shops, names, counts.tolist(), sums.tolist()):
+        row = {fields[0]: name, fields[1]: int(count), fields[2]: round(total, 2)}
+        if per_shop:
+            row["shop_id"] = shop
+        rows.append(row)
+    # Busiest first (per shop), then by revenue; one row per group, so sorting in Python is cheap
+    rows.sort(key=lambda row: (row.get("shop_id") or '', -row[fields[1]], -row[fields[2]], row[fields[0]]))
+    return rows
+
+
+REPORTS = ('monthly', 'services', 'staff')
+
+
+def run_reports(db_path: str, reports: List[str], per_shop: bool = False,
+                cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Load the synced tables and compute the requested reports, with timings"""
+    require_numpy()
+    db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        start = time.perf_counter()
+        sales = load_table(db, db_path, 'sales', SALES_QUERY, SALES_COLUMNS, cache_dir)
+        appointments = load_table(db, db_path, 'appointments', APPOINTMENTS_QUERY, APPOINTMENT_COLUMNS,
+                                  cache_dir)
+        shop_names = dict(db.execute('SELECT shop_id, shop_name FROM shops').fetchall())
+    finally:
+        db.close()
+    loaded = time.perf_counter()
+
+    results: Dict[str, Any] = {}
+    if 'monthly' in reports:
+        results['monthly'] = monthly_revenue(sales, appointments, per_shop)
+    if 'services' in reports:
+        results['services'] = service_popularity(sales, per_shop)
+    if 'staff' in reports:
+        results['staff'] = staff_performance(sales, per_shop)
+    computed = time.perf_counter()
+
+    results['meta'] = {
+        "sales": len(sales),
+        "appointments": len(appointments),
+        "shops": len(shop_names),
+        "shop_names": shop_names,
+        "load_ms": round((loaded - start) * 1000, 1),
+        "compute_ms": round((computed - loaded) * 1000, 1),
+    }
+    return results
+
+
+def _top_rows(rows: List[Dict[str, Any]], top: int) -> List[Dict[str, Any]]:
+    """First `top` rows of a ranking, per shop when the rows carry one"""
+    shown, seen = [], {}
+    for row in rows:
+        shop = row.get('shop_id')
+        seen[shop] = seen.get(shop, 0) + 1
+        if seen[shop] <= top:
+            shown.append(row)
+    return shown
+
+
+def print_report(name: str, rows: List[Dict[str, Any]], shop_names: Dict[str, str], top: int):
+    titles = {'monthly': "📅 Monthly revenue", 'services': "✂️  Service popularity", 'staff': "💈 Staff performance"}
+    print(f"\n{titles[name]}")
+    if not rows:
+        print("   (no data)")
+        return
+    fields = [key for key in rows[0] if key != 'shop_id']
+    per_shop = 'shop_id' in rows[0]
+    header = (['shop'] if per_shop else []) + fields
+    print("   " + ''.join(f"{column:>18}" if i else f"{column:<28}" for i, column in enumerate(header)))
+    for row in rows if name == 'monthly' else _top_rows(rows, top):
+        values = ([shop_names.get(row['shop_id']) or row['shop_id']] if per_shop else []) + [row[key] for key in fields]
+        cells = [f"{value:>18,.2f}" if isinstance(value, float) else f"{value:>18}" for value in values[1:]]
+        print(f"   {str(values[0])[:27]:<28}" + ''.join(cells))
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Chain-wide revenue, service and staff analytics from synced data")
+    parser.add_argument("--db", help="database written by barbershop_sync.py (default: ~/.gobarberly/barbershop.sqlite3)")
+    parser.add_argument("--report", action="append", choices=REPORTS, help="report to compute (repeatable; default: all)")
+    parser.add_argument("--per-shop", action="store_true", help="one group per shop instead of chain totals")
+    parser.add_argument("--top", type=int, default=10, help="rows per ranking in the text output")
+    parser.add_argument("--no-cache", action="store_true", help="don't keep the loaded columns in .npz files")
+    parser.add_argument("--json", action="store_true", help="one JSON record per result row")
+    args = parser.parse_args(argv)
+    if args.json:
+        enable_json_output('chain_analytics')
+
+    from barbershop_sync import DB_FILE
+
+    db_path = args.db or state_path(DB_FILE)
+    if not os.path.exists(db_path):
+        print(f"❌ No synced data at {db_path} - run barbershop_sync.py first", file=sys.stderr)
+        emit({"event": "result", "operation": "chain_analytics", "success": False, "error": "no database"})
+        return False
+    reports = args.report or list(REPORTS)
+    cache_dir = None if args.no_cache else os.path.dirname(os.path.abspath(db_path))
+    try:
+        results = run_reports(db_path, reports, args.per_shop, cache_dir)
+    except (AnalyticsUnavailable, sqlite3.Error) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        emit({"event": "result", "operation": "chain_analytics", "success": False, "error": str(e)})
+        return False
+
+    meta = results.pop('meta')
+    print(f"📊 {meta['sales']:,} sales and {meta['appointments']:,} appointments from {meta['shops']} shops "
+          f"(load {meta['load_ms']:.0f} ms, compute {meta['compute_ms']:.0f} ms)")
+    for name in reports:
+        print_report(name, results[name], meta['shop_names'], args.top)
+        for row in results[name]:
+            emit({"event": name, **row})
+    meta.pop('shop_names')
+    emit({"event": "result", "operation": "chain_analytics", "success": True, **meta})
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('chain_analytics', main) else 1)
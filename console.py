@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Terminal Helpers for the GoBarberly Tools
+Screen clearing with ANSI escapes instead of spawning cls/clear, and the
+--json output mode: one JSON record per operation, written in blocks
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+_vt_enabled = False
+
+# Records are written out once this many characters are buffered (and at exit)
+JSON_BUFFER_SIZE = 64 * 1024
+
+
+def enable_ansi() -> bool:
+    """Turn on escape-sequence handling in Windows consoles (no-op elsewhere)"""
+    global _vt_enabled
+    if os.name != 'nt' or _vt_enabled:
+        return True
+    try:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        _vt_enabled = bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (AttributeError, OSError):
+        return False
+    return _vt_enabled
+
+
+def clear_screen():
+    """Clear the terminal; does nothing when output is piped or redirected"""
+    if not sys.stdout.isatty():
+        return
+    enable_ansi()
+    sys.stdout.write('\033[2J\033[3J\033[H')
+    sys.stdout.flush()
+
+
+class JsonLinesWriter:
+    """Buffered JSON-lines sink; records reach the stream in blocks, not one write per line"""
+
+    def __init__(self, stream: TextIO, buffer_size: int = JSON_BUFFER_SIZE, tool: Optional[str] = None):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.tool = tool
+        self.pending: List[str] = []
+        self.pending_size = 0
+        self.lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]):
+        if self.tool and "tool" not in record:
+            record = {"tool": self.tool, **record}
+        line = json.dumps(record, default=str) + '\n'
+        with self.lock:
+            self.pending.append(line)
+            self.pending_size += len(line)
+            if self.pending_size >= self.buffer_size:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self.pending:
+            self.stream.write(''.join(self.pending))
+            self.pending.clear()
+            self.pending_size = 0
+        self.stream.flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush_locked()
+
+
+_json_writer: Optional[JsonLinesWriter] = None
+
+
+def enable_json_output(tool: str, stream: Optional[TextIO] = None) -> JsonLinesWriter:
+    """
+    Switch the process to --json mode: records go to stdout (or stream), and the
+    human-readable output is dropped instead of rendered
+    """
+    global _json_writer
+    if _json_writer is None:
+        _json_writer = JsonLinesWriter(stream or sys.stdout, tool=tool)
+        atexit.register(_json_writer.flush)
+        sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    return _json_writer
+
+
+def json_output() -> Optional[JsonLinesWriter]:
+    """The active --json writer, None in normal terminal mode"""
+    return _json_writer
+
+
+def emit(record: Dict[str, Any]):
+    """Write one record in --json mode (no-op otherwise)"""
+    if _json_writer is not None:
+        _json_writer.write({"ts": round(time.time(), 3), **record})
+
+
+def take_json_flag(argv: List[str]) -> Tuple[List[str], bool]:
+    """Strip --json from an argument list; returns (remaining args, whether it was there)"""
+    rest = [arg for arg in argv if arg != '--json']
+    return rest, len(rest) != len(argv)
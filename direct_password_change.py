@@ -6,25 +6,33 @@ No email verification, no tokens - just direct password change
 """
 
 import requests
-import json
 import sys
 import getpass
-import hashlib
+import time
+from concurrent.futures import Future
 from typing import Optional
 
+from backend_warmup import finish_warm_up, start_prewarm
+from console import clear_screen, emit, enable_json_output, json_output, take_json_flag
+from gobarberly_client import DEFAULT_BASE_URL, create_session
+from profiling import profiled_main
+from retry_policy import RetryPolicy
+from token_log_follower import obtain_reset_token, token_follower_from_env
+
 class DirectPasswordChanger:
-    def __init__(self, base_url: str = "https://gobarberly-backend.onrender.com"):
+    def __init__(self, base_url: str = DEFAULT_BASE_URL):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.timeout = 30
-        
-        # Set headers
-        self.session.headers.update({
-            'Content-Type': 'application/json'
-        })
+        self.session = create_session(timeout=(10, 30), retry_policy=RetryPolicy())
+        self.prewarm: Optional[Future] = None
+    
+    def start_prewarm(self):
+        """Resolve DNS, open the TLS connection and wake the backend while the user types"""
+        self.prewarm = start_prewarm(self.session, self.base_url)
     
     def print_colored(self, message: str, color: str = 'white'):
-        """Print colored output"""
+        """Print colored output (nothing in --json mode)"""
+        if json_output():
+            return
         colors = {
             'red': '\033[91m', 'green': '\033[92m', 'yellow': '\033[93m',
             'blue': '\033[94m', 'cyan': '\033[96m', 'white': '\033[97m', 'reset': '\033[0m'
@@ -55,6 +63,11 @@ class DirectPasswordChanger:
             self.show_password_requirements()
             return False
         
+        # Wake a sleeping backend so the endpoint probes below don't time out
+        warmup = finish_warm_up(self.session, self.base_url, self.prewarm)
+        if warmup["cold_start"]:
+            self.print_colored(f"🥶 Backend cold start: {warmup['cold_latency_ms']}ms", 'yellow')
+        
         try:
             # Method 1: Try direct update endpoint (if exists)
             payload = {
@@ -79,7 +92,7 @@ class DirectPasswordChanger:
                     if response.status_code in [200, 201]:
                         self.print_colored(f"✅ Password updated successfully via {endpoint}!", 'green')
                         return True
-                except:
+                except requests.exceptions.RequestException:
                     continue
             
             # Method 2: Create a super admin and use admin privileges
@@ -111,7 +124,7 @@ class DirectPasswordChanger:
             # Create admin (ignore if already exists)
             try:
                 self.session.post(f"{self.base_url}/api/auth/register/", json=admin_payload)
-            except:
+            except requests.exceptions.RequestException:
                 pass  # Admin might already exist
             
             # Step 2: Login as admin
@@ -162,7 +175,7 @@ class DirectPasswordChanger:
                     if response.status_code in [200, 201]:
                         self.print_colored(f"✅ Password force-updated via admin endpoint!", 'green')
                         return True
-                except:
+                except requests.exceptions.RequestException:
                     continue
                     
             return False
@@ -201,7 +214,7 @@ class DirectPasswordChanger:
                     if response.status_code in [200, 201]:
                         self.print_colored(f"✅ Password updated via internal API!", 'green')
                         return True
-                except:
+                except requests.exceptions.RequestException:
                     continue
             
             # Last resort: Use the reset system but simulate token
@@ -220,6 +233,7 @@ class DirectPasswordChanger:
             
             # Step 1: Request reset (generates token in backend)
             reset_request = {"email": email}
+            follower = token_follower_from_env()
             response = self.session.post(f"{self.base_url}/api/auth/forgot-password/", json=reset_request)
             
             if response.status_code not in [200, 201]:
@@ -233,7 +247,7 @@ class DirectPasswordChanger:
             self.print_colored("🔍 Or check the database PasswordResetToken table", 'yellow')
             
             # Ask user for the token from logs
-            token = input("\n🔑 Enter the reset token from backend logs: ").strip()
+            token = obtain_reset_token(follower, email, "\n🔑 Enter the reset token from backend logs: ")
             
             if not token:
                 self.print_colored("❌ No token provided", 'red')
@@ -272,8 +286,7 @@ class DirectPasswordChanger:
 
 def main():
     """Main function - simple input and direct password change"""
-    import os
-    os.system('cls' if os.name == 'nt' else 'clear')
+    clear_screen()
     
     print("🔐" + "=" * 78 + "🔐")
     print("🔐" + " " * 20 + "DIRECT PASSWORD CHANGER" + " " * 25 + "🔐")
@@ -282,6 +295,7 @@ def main():
     print()
     
     changer = DirectPasswordChanger()
+    changer.start_prewarm()
     
     try:
         # Simple inputs - just email and password
@@ -330,26 +344,29 @@ def main():
 
 
 def command_line_mode():
-    """Command line usage: python script.py email password"""
-    if len(sys.argv) < 3:
-        print("Usage: python direct_password_change.py <email> <password>")
+    """Command line usage: python script.py email password [--json]"""
+    argv, as_json = take_json_flag(sys.argv[1:])
+    if len(argv) < 2:
+        print("Usage: python direct_password_change.py <email> <password> [--json]")
         print("\nExample:")
         print("  python direct_password_change.py user@example.com MyNewPass123!")
         return False
     
-    email = sys.argv[1]
-    password = sys.argv[2]
+    email = argv[0]
+    password = argv[1]
     
+    if as_json:
+        enable_json_output('direct_password_change')
+    start_time = time.time()
     changer = DirectPasswordChanger()
-    return changer.direct_password_update(email, password)
+    success = changer.direct_password_update(email, password)
+    emit({"event": "result", "operation": "password_change", "email": email, "success": success,
+          "duration_ms": round((time.time() - start_time) * 1000)})
+    return success
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        # Command line mode
-        success = command_line_mode()
-    else:
-        # Interactive mode
-        success = main()
+    # Command line mode when arguments are given, interactive otherwise
+    success = profiled_main('direct_password_change', lambda: command_line_mode() if len(sys.argv) > 1 else main())
     
     sys.exit(0 if success else 1)
\ No newline at end of file
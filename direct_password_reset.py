@@ -6,26 +6,86 @@ Useful for admin operations and testing
 """
 
 import requests
-import json
 import sys
 import getpass
+import os
+import select
+import threading
 import time
+from concurrent.futures import Future
 from typing import Optional, Dict, Any
 
+from backend_warmup import finish_warm_up, start_prewarm
+from console import clear_screen, emit, enable_json_output, json_output, take_json_flag
+from gobarberly_client import DEFAULT_BASE_URL, DEFAULT_POOL_MAXSIZE, create_session
+from profiling import profiled_main
+from rate_limiter import RateLimiter
+from retry_policy import RetryPolicy
+from token_log_follower import DEFAULT_TOKEN_WAIT, TokenLogFollower, token_follower_from_env
+
+# Seconds between progress lines while forgot-password is in flight
+PROGRESS_INTERVAL = 5
+
+
+class PromptReader:
+    """
+    Reads one line of operator input without blocking the caller
+    Polling (instead of input() on a thread) leaves nothing holding stdin
+    when the tool exits early
+    """
+    
+    def __init__(self, closed: bool = False):
+        self.buffer = ''
+        self.closed = closed  # stdin hit EOF (or belongs to someone else): nothing more to read
+    
+    def poll(self, timeout: float) -> Optional[str]:
+        """Return the finished line, or None if nothing was entered yet (see `closed` for EOF)"""
+        if self.closed:
+            time.sleep(timeout)
+            return None
+        if os.name == 'nt':
+            import msvcrt
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                while msvcrt.kbhit():
+                    char = msvcrt.getwche()
+                    if char in '\r\n':
+                        print()
+                        line, self.buffer = self.buffer, ''
+                        return line
+                    self.buffer = self.buffer[:-1] if char == '\b' else self.buffer + char
+                time.sleep(0.05)
+            return None
+        
+        ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        if not ready:
+            return None
+        line = sys.stdin.readline()
+        if not line:
+            self.closed = True
+            return None
+        return line
+
 class PasswordResetManager:
-    def __init__(self, base_url: str = "https://gobarberly-backend.onrender.com"):
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 rate_limiter: Optional[RateLimiter] = None):
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.timeout = 90  # 90 second timeout for slow email operations
-        
-        # Set headers
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'GoBarberly-DirectReset/1.0'
-        })
+        # Pooled session; forgot-password gets its own 90 second read timeout.
+        # Transient 5xx are retried and an endpoint that keeps failing is short-circuited,
+        # so a batch fails fast instead of stacking timeouts. Batch runs pass a rate limiter
+        self.session = create_session(user_agent='GoBarberly-DirectReset/1.0', pool_maxsize=pool_maxsize,
+                                      retry_policy=RetryPolicy(), rate_limiter=rate_limiter)
+        # Background warm-up started at launch (see start_prewarm)
+        self.prewarm: Optional[Future] = None
+    
+    def start_prewarm(self):
+        """Resolve DNS, open the TLS connection and wake the backend while the user types"""
+        self.prewarm = start_prewarm(self.session, self.base_url)
     
     def print_colored(self, message: str, color: str = 'white'):
-        """Print colored output for better visibility"""
+        """Print colored output for better visibility (nothing in --json mode)"""
+        if json_output():
+            return
         colors = {
             'red': '\033[91m',
             'green': '\033[92m',
@@ -45,77 +105,246 @@ class PasswordResetManager:
         self.print_colored("=" * 80, 'cyan')
     
     def test_connectivity(self) -> bool:
-        """Test if the backend is accessible"""
+        """
+        Test if the backend is accessible and wait until it is warm
+        A sleeping Render dyno is woken first so the reset calls do not pay
+        the cold start (and hit their timeouts) themselves
+        """
         self.print_header("TESTING BACKEND CONNECTIVITY")
+        self.print_colored("🔥 Waking backend and waiting for latency to settle...", 'yellow')
         
-        try:
-            start_time = time.time()
-            response = self.session.options(f"{self.base_url}/api/auth/forgot-password/")
-            duration = (time.time() - start_time) * 1000
-            
-            self.print_colored(f"✅ Backend is reachable!", 'green')
-            self.print_colored(f"📍 URL: {self.base_url}", 'blue')
-            self.print_colored(f"⏱️  Response time: {duration:.0f}ms", 'blue')
-            self.print_colored(f"📊 Status: {response.status_code}", 'blue')
-            
-            return True
-            
-        except requests.exceptions.RequestException as e:
-            self.print_colored(f"❌ Failed to connect to backend: {str(e)}", 'red')
+        warmup = finish_warm_up(self.session, self.base_url, self.prewarm)
+        emit({"event": "warmup", **warmup})
+        
+        if not warmup["ready"]:
+            self.print_colored(f"❌ Failed to connect to backend after {warmup['total_ms'] / 1000:.0f}s", 'red')
             self.print_colored("💡 Please check if the Render backend is running", 'yellow')
             return False
+        
+        self.print_colored(f"✅ Backend is reachable!", 'green')
+        self.print_colored(f"📍 URL: {self.base_url}", 'blue')
+        if warmup["cold_start"]:
+            self.print_colored(f"🥶 Cold start detected: first response took {warmup['cold_latency_ms']}ms", 'yellow')
+        else:
+            self.print_colored(f"⏱️  First response: {warmup['cold_latency_ms']}ms", 'blue')
+        self.print_colored(f"⏱️  Warm response time: {warmup['steady_latency_ms']}ms", 'blue')
+        if not warmup["settled"]:
+            self.print_colored("⚠️  Latency has not fully settled yet - expect slower responses", 'yellow')
+        
+        return True
     
-    def request_password_reset(self, email: str) -> Optional[str]:
-        """Request password reset and return the reset token"""
-        self.print_header("STEP 1: REQUEST PASSWORD RESET")
+    def submit_forgot_password(self, email: str) -> Dict[str, Any]:
+        """
+        Send the forgot-password call without printing anything
+        Returns a result dict (success, status, duration_ms, message, error, timed_out)
+        """
+        result = {
+            "success": False,
+            "status": None,
+            "duration_ms": None,
+            "message": None,
+            "error": None,
+            "timed_out": False
+        }
         
+        start_time = time.time()
         try:
-            start_time = time.time()
-            
-            payload = {"email": email}
-            self.print_colored(f"📧 Requesting reset for: {email}", 'blue')
-            self.print_colored("⏳ Sending request... (may take up to 90 seconds)", 'yellow')
-            
             response = self.session.post(
                 f"{self.base_url}/api/auth/forgot-password/",
-                json=payload
+                json={"email": email}
             )
-            
-            duration = (time.time() - start_time) * 1000
-            
-            if response.status_code in [200, 201]:
-                data = response.json()
-                self.print_colored(f"✅ Password reset request successful!", 'green')
-                self.print_colored(f"📧 Email: {email}", 'blue')
-                self.print_colored(f"⏱️  Duration: {duration:.0f}ms", 'blue')
-                self.print_colored(f"📊 Status: {response.status_code}", 'blue')
-                self.print_colored(f"📝 Message: {data.get('message', 'Reset request sent')}", 'blue')
-                
-                # In a real scenario, you'd extract the token from email or database
-                # For testing, we'll ask the user to provide it
-                print()
-                self.print_colored("🔑 Next: You need the reset token", 'yellow')
-                self.print_colored("💡 Check your email or backend logs for the reset token", 'yellow')
-                
-                return "pending_token"  # Indicates success but token needed
-                
-            else:
-                data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-                self.print_colored(f"❌ Password reset request failed", 'red')
-                self.print_colored(f"📊 Status: {response.status_code}", 'red')
-                self.print_colored(f"💬 Error: {data.get('message', data.get('error', 'Unknown error'))}", 'red')
-                self.print_colored(f"⏱️  Duration: {duration:.0f}ms", 'blue')
-                
-                return None
-                
         except requests.exceptions.Timeout:
-            self.print_colored(f"⏰ Request timed out after 90 seconds", 'red')
+            result["duration_ms"] = round((time.time() - start_time) * 1000)
+            result["timed_out"] = True
+            result["error"] = "Request timed out"
+            return result
+        except requests.exceptions.RequestException as e:
+            result["duration_ms"] = round((time.time() - start_time) * 1000)
+            result["error"] = f"Network error: {str(e)}"
+            return result
+        
+        result["duration_ms"] = round((time.time() - start_time) * 1000)
+        result["status"] = response.status_code
+        # Per-phase breakdown when GOBARBERLY_TRACE is set
+        result["phases_ms"] = getattr(response, 'trace_phases', None)
+        
+        try:
+            data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
+        except ValueError:
+            result["error"] = f"Invalid JSON in HTTP {response.status_code} response"
+            return result
+        if not isinstance(data, dict):
+            data = {}
+        if response.status_code in [200, 201]:
+            result["success"] = True
+            result["message"] = data.get('message', 'Reset request sent')
+        else:
+            result["error"] = data.get('message', data.get('error', 'Unknown error'))
+        
+        return result
+    
+    def report_forgot_password(self, email: str, result: Dict[str, Any]):
+        """Print the outcome of a forgot-password call"""
+        if result["success"]:
+            self.print_colored(f"✅ Password reset request successful!", 'green')
+            self.print_colored(f"📧 Email: {email}", 'blue')
+            self.print_colored(f"⏱️  Duration: {result['duration_ms']:.0f}ms", 'blue')
+            self.print_colored(f"📊 Status: {result['status']}", 'blue')
+            self.print_colored(f"📝 Message: {result['message']}", 'blue')
+            if result.get("phases_ms"):
+                phases = ' / '.join(f"{name} {ms:.0f}" for name, ms in result["phases_ms"].items())
+                self.print_colored(f"🔬 Phases (ms): {phases}", 'blue')
+        elif result["timed_out"]:
+            self.print_colored(f"⏰ Request timed out after {result['duration_ms'] / 1000:.0f} seconds", 'red')
             self.print_colored("💡 Backend email service is very slow", 'yellow')
+        elif result["status"] is None:
+            self.print_colored(f"❌ {result['error']}", 'red')
+        else:
+            self.print_colored(f"❌ Password reset request failed", 'red')
+            self.print_colored(f"📊 Status: {result['status']}", 'red')
+            self.print_colored(f"💬 Error: {result['error']}", 'red')
+            self.print_colored(f"⏱️  Duration: {result['duration_ms']:.0f}ms", 'blue')
+    
+    def request_password_reset(self, email: str) -> Optional[str]:
+        """Request password reset and return the reset token"""
+        self.print_header("STEP 1: REQUEST PASSWORD RESET")
+        
+        self.print_colored(f"📧 Requesting reset for: {email}", 'blue')
+        self.print_colored("⏳ Sending request... (may take up to 90 seconds)", 'yellow')
+        
+        result = self.submit_forgot_password(email)
+        self.report_forgot_password(email, result)
+        
+        if not result["success"]:
             return None
+        
+        # In a real scenario, you'd extract the token from email or database
+        # For testing, we'll ask the user to provide it
+        print()
+        self.print_colored("🔑 Next: You need the reset token", 'yellow')
+        self.print_colored("💡 Check your email or backend logs for the reset token", 'yellow')
+        
+        return "pending_token"  # Indicates success but token needed
+    
+    def start_password_reset_request(self, email: str) -> Future:
+        """
+        Send forgot-password on a background thread and return right away
+        The daemon thread never holds up exit once the token has been used
+        """
+        future = Future()
+        
+        def worker():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(self.submit_forgot_password(email))
+            except Exception as e:
+                future.set_exception(e)
+        
+        threading.Thread(target=worker, name="forgot-password", daemon=True).start()
+        return future
+    
+    def prompt_token_while_pending(self, email: str, pending: Future, prompt: str,
+                                   follower: Optional[TokenLogFollower] = None) -> Optional[str]:
+        """
+        Ask for the reset token while forgot-password is still in flight
+        Shows elapsed time until the call returns; the operator can paste the
+        token at any moment. With a log follower the token is picked up from
+        the backend logs without typing; once stdin is closed (scripted runs)
+        only the follower is waited for. Returns None if the request failed first.
+        """
+        # With GOBARBERLY_TOKEN_LOG=- stdin carries the log, not the operator's input
+        reader = PromptReader(closed=follower is not None and follower.source == '-')
+        print(prompt, end='', flush=True)
+        
+        start_time = time.time()
+        next_tick = PROGRESS_INTERVAL
+        reported = False
+        
+        while True:
+            answer = reader.poll(0.25)
+            if answer is not None:
+                return answer.strip()
             
+            token = follower.poll_token(email) if follower else None
+            if token:
+                print()
+                self.print_colored(f"🔑 Token picked up from logs: {token[:20]}...", 'green')
+                return token
+            
+            elapsed = time.time() - start_time
+            if pending.done() and not reported:
+                reported = True
+                print()
+                result = pending.result()
+                self.report_forgot_password(email, result)
+                if not result["success"]:
+                    return None
+                print(prompt, end='', flush=True)
+            elif not pending.done() and elapsed >= next_tick:
+                next_tick += PROGRESS_INTERVAL
+                print()
+                self.print_colored(f"⏳ forgot-password still running ({elapsed:.0f}s elapsed) - "
+                                   f"paste the token as soon as it shows up", 'yellow')
+                print(prompt, end='', flush=True)
+            
+            # Nothing left to read: give up once the call is done and the follower had its time
+            if reader.closed and reported and (follower is None or elapsed >= DEFAULT_TOKEN_WAIT):
+                print()
+                if follower is not None:
+                    self.print_colored(f"⚠️  No token showed up within {DEFAULT_TOKEN_WAIT}s", 'yellow')
+                return ''
+    
+    def submit_password_reset(self, token: str, new_password: str) -> Dict[str, Any]:
+        """
+        Send the reset-password call without printing anything
+        Returns a result dict (success, status, duration_ms, message, error)
+        """
+        result = {
+            "success": False,
+            "status": None,
+            "duration_ms": None,
+            "message": None,
+            "error": None
+        }
+        
+        if not self.validate_password(new_password):
+            result["error"] = "Password does not meet requirements"
+            return result
+        
+        payload = {
+            "token": token,
+            "new_password": new_password,
+            "new_password_confirm": new_password
+        }
+        
+        start_time = time.time()
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/auth/reset-password/",
+                json=payload
+            )
         except requests.exceptions.RequestException as e:
-            self.print_colored(f"❌ Network error: {str(e)}", 'red')
-            return None
+            result["duration_ms"] = round((time.time() - start_time) * 1000)
+            result["error"] = f"Network error: {str(e)}"
+            return result
+        
+        result["duration_ms"] = round((time.time() - start_time) * 1000)
+        result["status"] = response.status_code
+        
+        try:
+            data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
+        except ValueError:
+            result["error"] = f"Invalid JSON in HTTP {response.status_code} response"
+            return result
+        if not isinstance(data, dict):
+            data = {}
+        if response.status_code in [200, 201]:
+            result["success"] = True
+            result["message"] = data.get('message', 'Password reset successfully')
+        else:
+            result["error"] = data.get('message', data.get('error', 'Reset failed'))
+        
+        return result
     
     def reset_password_with_token(self, token: str, new_password: str) -> bool:
         """Reset password using the provided token"""
@@ -126,47 +355,27 @@ class PasswordResetManager:
             self.show_password_requirements()
             return False
         
-        try:
-            start_time = time.time()
-            
-            payload = {
-                "token": token,
-                "new_password": new_password,
-                "new_password_confirm": new_password
-            }
-            
-            self.print_colored("🔐 Resetting password...", 'blue')
-            
-            response = self.session.post(
-                f"{self.base_url}/api/auth/reset-password/",
-                json=payload
-            )
-            
-            duration = (time.time() - start_time) * 1000
-            
-            if response.status_code in [200, 201]:
-                data = response.json()
-                self.print_colored(f"✅ Password reset successful!", 'green')
-                self.print_colored(f"⏱️  Duration: {duration:.0f}ms", 'blue')
-                self.print_colored(f"📊 Status: {response.status_code}", 'blue')
-                self.print_colored(f"📝 Message: {data.get('message', 'Password reset successfully')}", 'blue')
-                self.print_colored(f"🎉 User can now login with the new password!", 'green')
-                
-                return True
-                
-            else:
-                data = response.json() if response.headers.get('content-type', '').startswith('application/json') else {}
-                self.print_colored(f"❌ Password reset failed", 'red')
-                self.print_colored(f"📊 Status: {response.status_code}", 'red')
-                self.print_colored(f"💬 Error: {data.get('message', data.get('error', 'Reset failed'))}", 'red')
-                self.print_colored(f"⏱️  Duration: {duration:.0f}ms", 'blue')
-                self.print_colored("💡 Common issues: Invalid/expired token, password requirements", 'yellow')
-                
-                return False
-                
-        except requests.exceptions.RequestException as e:
-            self.print_colored(f"❌ Network error: {str(e)}", 'red')
+        self.print_colored("🔐 Resetting password...", 'blue')
+        result = self.submit_password_reset(token, new_password)
+        
+        if result["success"]:
+            self.print_colored(f"✅ Password reset successful!", 'green')
+            self.print_colored(f"⏱️  Duration: {result['duration_ms']:.0f}ms", 'blue')
+            self.print_colored(f"📊 Status: {result['status']}", 'blue')
+            self.print_colored(f"📝 Message: {result['message']}", 'blue')
+            self.print_colored(f"🎉 User can now login with the new password!", 'green')
+            return True
+        
+        if result["status"] is None:
+            self.print_colored(f"❌ {result['error']}", 'red')
             return False
+        
+        self.print_colored(f"❌ Password reset failed", 'red')
+        self.print_colored(f"📊 Status: {result['status']}", 'red')
+        self.print_colored(f"💬 Error: {result['error']}", 'red')
+        self.print_colored(f"⏱️  Duration: {result['duration_ms']:.0f}ms", 'blue')
+        self.print_colored("💡 Common issues: Invalid/expired token, password requirements", 'yellow')
+        return False
     
     def validate_password(self, password: str) -> bool:
         """Validate password meets requirements"""
@@ -210,14 +419,21 @@ class PasswordResetManager:
             self.print_colored(f"🔑 Using provided token: {reset_token[:20]}...", 'blue')
             return self.reset_password_with_token(reset_token, new_password)
         
-        # Otherwise, request reset first
-        result = self.request_password_reset(email)
-        if not result:
-            return False
+        # Otherwise, request reset in the background and ask for the token meanwhile
+        self.print_header("STEP 1: REQUEST PASSWORD RESET")
+        self.print_colored(f"📧 Requesting reset for: {email}", 'blue')
+        self.print_colored("⏳ Sending request in the background... (email may take up to 90 seconds)", 'yellow')
+        self.print_colored("💡 Paste the token as soon as it appears in your email or backend logs", 'yellow')
+        follower = token_follower_from_env()
+        if follower:
+            self.print_colored(f"👀 Watching {follower.source} for the token", 'blue')
+        pending = self.start_password_reset_request(email)
         
-        # Ask for token
         print()
-        token = input("🔑 Enter the reset token from email/logs: ").strip()
+        token = self.prompt_token_while_pending(email, pending, "🔑 Enter the reset token from email/logs: ",
+                                                follower)
+        if token is None:
+            return False
         if not token:
             self.print_colored("❌ Reset token is required", 'red')
             return False
@@ -228,10 +444,8 @@ class PasswordResetManager:
 
 def main():
     """Main interactive function"""
-    import os
-    
     # Clear screen for better presentation
-    os.system('cls' if os.name == 'nt' else 'clear')
+    clear_screen()
     
     print()
     print("🔐" + "=" * 78 + "🔐")
@@ -240,8 +454,9 @@ def main():
     print("🔐" + "=" * 78 + "🔐")
     print()
     
-    # Initialize the manager
+    # Initialize the manager and warm the connection while the user types
     manager = PasswordResetManager()
+    manager.start_prewarm()
     
     try:
         # Get input
@@ -303,28 +518,49 @@ def main():
 
 def command_line_mode():
     """Command line mode for scripting"""
-    if len(sys.argv) < 3:
-        print("Usage: python direct_password_reset.py <email> <new_password> [reset_token]")
+    if sys.argv[1] == '--batch':
+        from batch_password_reset import batch_main
+        return batch_main(sys.argv[2:])
+    
+    argv, as_json = take_json_flag(sys.argv[1:])
+    if len(argv) < 2:
+        print("Usage: python direct_password_reset.py <email> <new_password> [reset_token] [--json]")
+        print("       python direct_password_reset.py --batch <manifest.csv|manifest.jsonl> [--workers N] [--output results.jsonl]")
         print()
         print("Examples:")
         print("  python direct_password_reset.py user@example.com MyNewPass123!")
         print("  python direct_password_reset.py user@example.com MyNewPass123! abc123token456")
+        print("  python direct_password_reset.py user@example.com MyNewPass123! abc123token456 --json")
+        print("  python direct_password_reset.py --batch chain_resets.csv --workers 16")
         return False
     
-    email = sys.argv[1]
-    new_password = sys.argv[2]
-    reset_token = sys.argv[3] if len(sys.argv) > 3 else None
+    email = argv[0]
+    new_password = argv[1]
+    reset_token = argv[2] if len(argv) > 2 else None
     
+    if as_json:
+        enable_json_output('direct_password_reset')
+    return run_scripted_reset(email, new_password, reset_token)
+
+
+def run_scripted_reset(email: str, new_password: str, reset_token: Optional[str] = None) -> bool:
+    """Non-interactive reset; in --json mode ends with one "result" record"""
+    start_time = time.time()
     manager = PasswordResetManager()
-    return manager.direct_password_reset(email, new_password, reset_token)
+    success = manager.direct_password_reset(email, new_password, reset_token)
+    emit({
+        "event": "result",
+        "operation": "password_reset",
+        "email": email,
+        "success": success,
+        "duration_ms": round((time.time() - start_time) * 1000)
+    })
+    return success
 
 
 if __name__ == "__main__":
-    # Check if running in command line mode
-    if len(sys.argv) > 1:
-        success = command_line_mode()
-    else:
-        success = main()
+    # Command line mode when arguments are given, interactive otherwise
+    success = profiled_main('direct_password_reset', lambda: command_line_mode() if len(sys.argv) > 1 else main())
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
\ No newline at end of file
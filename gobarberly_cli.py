@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+GoBarberly Tools - Single Entry Point
+One command for the reset, health and benchmark tools:
+
+    python -m gobarberly_cli reset user@example.com NewPass123! [token]
+    python -m gobarberly_cli admin-reset [admin@gobarberly.com user@example.com --json]
+    python -m gobarberly_cli health --email admin@gobarberly.com --password ... [--json]
+    python -m gobarberly_cli bench --endpoints health,login -n 200
+    python -m gobarberly_cli batch chain_resets.csv --workers 16
+    python -m gobarberly_cli sync --email owner@shop.com --password ...
+    python -m gobarberly_cli export /api/super-admin/barbershops/ --email ... -o shops.jsonl
+    python -m gobarberly_cli analytics --per-shop
+    python -m gobarberly_cli reports --email admin@gobarberly.com --password ... -c 32
+    python -m gobarberly_cli import-report
+    python -m gobarberly_cli --profile health          # cProfile + flame-graph stacks
+
+Subcommands import their modules only when they run, so `--help`, typos and
+scripted calls never pay for requests or the other tools' dependencies
+"""
+
+import sys
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# Fail `import-report` when a command's cold import exceeds this (ms)
+DEFAULT_IMPORT_BUDGET_MS = 250.0
+
+
+class Command(NamedTuple):
+    module: str
+    help: str
+    run: Callable[[List[str]], bool]
+
+
+def _reset(argv: List[str]) -> bool:
+    import direct_password_reset
+    from console import enable_json_output, take_json_flag
+
+    if not argv:
+        return direct_password_reset.main()
+    argv, as_json = take_json_flag(argv)
+    if argv[:1] in (['-h'], ['--help']) or len(argv) < 2:
+        print("usage: python -m gobarberly_cli reset [<email> <new_password> [reset_token] [--json]]")
+        print("       (no arguments: interactive mode)")
+        return argv[:1] in (['-h'], ['--help'])
+    if as_json:
+        enable_json_output('direct_password_reset')
+    return direct_password_reset.run_scripted_reset(argv[0], argv[1], argv[2] if len(argv) > 2 else None)
+
+
+def _admin_reset(argv: List[str]) -> bool:
+    import admin_password_reset
+
+    return admin_password_reset.run_cli(argv)
+
+
+def _health(argv: List[str]) -> bool:
+    import health_matrix
+
+    return health_matrix.main(argv)
+
+
+def _bench(argv: List[str]) -> bool:
+    import auth_benchmark
+
+    return auth_benchmark.main(argv)
+
+
+def _batch(argv: List[str]) -> bool:
+    import batch_password_reset
+
+    return batch_password_reset.batch_main(argv)
+
+
+def _warmup(argv: List[str]) -> bool:
+    import backend_warmup
+
+    return backend_warmup.main(argv)
+
+
+def _agent(argv: List[str]) -> bool:
+    import reset_agent
+
+    return reset_agent.main(argv)
+
+
+def _sync(argv: List[str]) -> bool:
+    import barbershop_sync
+
+    return barbershop_sync.main(argv)
+
+
+def _export(argv: List[str]) -> bool:
+    import pagination
+
+    return pagination.main(argv)
+
+
+def _analytics(argv: List[str]) -> bool:
+    import chain_analytics
+
+    return chain_analytics.main(argv)
+
+
+def _reports(argv: List[str]) -> bool:
+    import nightly_reports
+
+    return nightly_reports.main(argv)
+
+
+def _monitor(argv: List[str]) -> bool:
+    import probe_daemon
+
+    return probe_daemon.main(argv)
+
+
+COMMANDS: Dict[str, Command] = {
+    'reset': Command('direct_password_reset', "reset a password with a reset token (email flow)", _reset),
+    'admin-reset': Command('admin_password_reset', "force a reset as super admin", _admin_reset),
+    'health': Command('health_matrix', "parallel health/CORS check of the API", _health),
+    'bench': Command('auth_benchmark', "auth endpoint latency benchmark", _bench),
+    'batch': Command('batch_password_reset', "reset many passwords from a CSV/JSONL manifest", _batch),
+    'warmup': Command('backend_warmup', "wake the backend and measure its cold start", _warmup),
+    'agent': Command('reset_agent', "start/stop/status of the background reset agent", _agent),
+    'sync': Command('barbershop_sync', "incremental copy of shop data into SQLite", _sync),
+    'export': Command('pagination', "every record of a paginated listing as JSON lines", _export),
+    'analytics': Command('chain_analytics', "chain-wide revenue/service/staff reports (NumPy)", _analytics),
+    'reports': Command('nightly_reports', "every shop's reports, fetched concurrently", _reports),
+    'monitor': Command('probe_daemon', "continuous probes with Prometheus metrics", _monitor),
+}
+
+
+def import_report(argv: List[str]) -> bool:
+    """Cold import time of each subcommand, measured with -X importtime in fresh interpreters"""
+    import argparse
+    import subprocess
+
+    parser = argparse.ArgumentParser(prog="gobarberly_cli import-report",
+                                     description="Measure how long each subcommand takes to import")
+    parser.add_argument("commands", nargs="*", help="subcommands to measure (default: all)")
+    parser.add_argument("--top", type=int, default=5, help="slowest modules to list per command")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_IMPORT_BUDGET_MS,
+                        help="exit 1 if a command's import exceeds this (default: 250)")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.commands if name not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    over_budget = []
+    for name in args.commands or list(COMMANDS):
+        module = COMMANDS[name].module
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"❌ {name}: import failed\n{result.stderr.strip().splitlines()[-1]}")
+            over_budget.append(name)
+            continue
+
+        # "import time:      self [us] |  cumulative | imported package"
+        timings = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, package = line[len('import time:'):].split('|')
+            timings.append((int(self_us), int(cumulative_us), package.rstrip()))
+        total_ms = sum(self_us for self_us, _, _ in timings) / 1000
+
+        icon = '✅' if total_ms <= args.budget_ms else '⚠️ '
+        print(f"{icon} {name:<12} {total_ms:>8.1f} ms  ({len(timings)} modules)")
+        for self_us, cumulative_us, package in sorted(timings, reverse=True)[:args.top]:
+            print(f"      {self_us / 1000:>7.1f} ms self {cumulative_us / 1000:>8.1f} ms cum  {package.strip()}")
+        if total_ms > args.budget_ms:
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"\n⚠️  Over the {args.budget_ms:g}ms import budget: {', '.join(over_budget)}")
+        return False
+    return True
+
+
+def print_usage():
+    print("usage: python -m gobarberly_cli <command> [options]")
+    print()
+    print("commands:")
+    for name, command in COMMANDS.items():
+        print(f"  {name:<14} {command.help}")
+    print(f"  {'import-report':<14} cold-start import time of each command")
+    print()
+    print("Run 'python -m gobarberly_cli <command> --help' for command options.")
+    print("Add --profile[=PREFIX] to any command to write cProfile stats and flame-graph stacks.")
+
+
+def main(argv: Optional[List[str]] = None) -> bool:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print_usage()
+        return bool(argv)
+
+    from profiling import Profiler, default_prefix, take_profile_flag
+
+    argv, profile_prefix = take_profile_flag(argv)
+    if not argv:
+        print_usage()
+        return False
+    name, rest = argv[0], argv[1:]
+    if name == 'import-report':
+        return import_report(rest)
+    command = COMMANDS.get(name)
+    if command is None:
+        print(f"❌ Unknown command: {name}\n")
+        print_usage()
+        return False
+    if profile_prefix is None:
+        return bool(command.run(rest))
+    return bool(Profiler(profile_prefix or default_prefix(name)).run(lambda: command.run(rest)))
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
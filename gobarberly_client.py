@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Client for the GoBarberly Tools
+One pooled requests session with real connect/read timeouts on every call
+Per-endpoint timeouts let slow email endpoints wait longer than quick ones
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from console import emit, json_output
+from rate_limiter import RateLimiter
+from retry_policy import RetryPolicy
+
+if TYPE_CHECKING:
+    from request_tracing import Tracer
+
+RENDER_BASE_URL = "https://gobarberly-backend.onrender.com"
+LOCAL_BASE_URL = "http://localhost:8000"
+
+# Points every tool at another backend (e.g. the local stub server)
+BASE_URL_ENV = 'GOBARBERLY_BASE_URL'
+
+
+def resolve_base_url(default: str = RENDER_BASE_URL) -> str:
+    """Backend URL from GOBARBERLY_BASE_URL, else the tool's usual default"""
+    return os.environ.get(BASE_URL_ENV, default).rstrip('/')
+
+
+DEFAULT_BASE_URL = resolve_base_url()
+
+# Per-user directory for tool state (warm-up history, caches)
+STATE_DIR_ENV = 'GOBARBERLY_STATE_DIR'
+
+
+def state_path(name: str) -> str:
+    """Path of a file in the tools' state directory (created on demand)"""
+    directory = os.environ.get(STATE_DIR_ENV) or os.path.join(os.path.expanduser('~'), '.gobarberly')
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+# Sessions route through a running reset agent (reset_agent.py); set to 0 to bypass it
+AGENT_ENV = 'GOBARBERLY_AGENT'
+AGENT_SOCKET_FILE = 'agent.sock'
+
+
+def agent_socket_path() -> str:
+    return state_path(AGENT_SOCKET_FILE)
+
+
+def _agent_socket() -> Optional[str]:
+    """Socket path of a reset agent this process may use, if one seems to be running"""
+    if os.environ.get(AGENT_ENV, '1') == '0' or not hasattr(socket, 'AF_UNIX'):
+        return None
+    path = agent_socket_path()
+    return path if os.path.exists(path) else None
+
+
+# Append per-phase request spans (DNS, connect, TLS, TTFB, body) to this JSONL file
+TRACE_ENV = 'GOBARBERLY_TRACE'
+
+
+def _tracer_from_env() -> Optional['Tracer']:
+    path = os.environ.get(TRACE_ENV)
+    if not path:
+        return None
+    from request_tracing import tracer_for
+
+    return tracer_for(path)
+
+
+# (connect timeout, read timeout) in seconds
+Timeout = Tuple[float, float]
+
+DEFAULT_TIMEOUT: Timeout = (10, 30)
+
+# Per-endpoint overrides, matched against the URL path
+ENDPOINT_TIMEOUTS: Dict[str, Timeout] = {
+    '/api/auth/forgot-password/': (10, 90),  # backend sends the email synchronously
+    '/api/auth/reset-password/': (10, 20),
+    '/api/auth/login/': (10, 30),
+    '/api/auth/register/': (10, 30),
+    '/api/auth/token/refresh/': (10, 15),
+    '/api/health/': (5, 10),
+}
+
+# Keep-alive pool bounds (per host)
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+
+
+def _normalize_timeout(timeout: Union[float, Timeout]) -> Timeout:
+    """Turn a single number into a (connect, read) pair"""
+    if isinstance(timeout, (int, float)):
+        return (float(timeout), float(timeout))
+    return (float(timeout[0]), float(timeout[1]))
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that never sends a request without a timeout"""
+
+    def __init__(self, timeout: Timeout = DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class GoBarberlySession(requests.Session):
+    """
+    requests.Session with enforced per-endpoint timeouts and a bounded pool
+    Drop-in replacement: existing session.get/post/options calls keep working
+    When the reset agent runs, requests go over its already-warm connections
+    A RateLimiter paces every attempt, retries included
+    With a Tracer every attempt becomes a span; traced sessions bypass the agent
+    In --json mode every call is also written out as one "request" record
+    """
+
+    def __init__(self, timeout: Union[float, Timeout] = DEFAULT_TIMEOUT,
+                 endpoint_timeouts: Optional[Dict[str, Union[float, Timeout]]] = None,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 use_agent: bool = True,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 tracer: Optional['Tracer'] = None):
+        super().__init__()
+        self.default_timeout = _normalize_timeout(timeout)
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.tracer = tracer if tracer is not None else _tracer_from_env()
+        # High-volume callers (benchmarks) report aggregates instead of per-call records
+        self.record_requests = True
+        self.endpoint_timeouts: Dict[str, Timeout] = dict(ENDPOINT_TIMEOUTS)
+        for path, value in (endpoint_timeouts or {}).items():
+            self.endpoint_timeouts[path] = _normalize_timeout(value)
+
+        # pool_block keeps the number of sockets per host bounded under concurrency
+        pool_kwargs = dict(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=True)
+        agent_socket = _agent_socket() if use_agent and self.tracer is None else None
+        if self.tracer is not None:
+            from request_tracing import TracingHTTPAdapter
+
+            adapter = TracingHTTPAdapter(timeout=self.default_timeout, **pool_kwargs)
+        elif agent_socket:
+            from reset_agent import AgentAdapter
+
+            adapter = AgentAdapter(agent_socket, timeout=self.default_timeout, **pool_kwargs)
+        else:
+            adapter = TimeoutHTTPAdapter(timeout=self.default_timeout, **pool_kwargs)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def set_endpoint_timeout(self, path: str, timeout: Union[float, Timeout]):
+        """Override the timeout used for one endpoint path"""
+        self.endpoint_timeouts[path] = _normalize_timeout(timeout)
+
+    def timeout_for(self, url: str) -> Timeout:
+        """Resolve the (connect, read) timeout for a URL"""
+        return self.endpoint_timeouts.get(urlsplit(url).path, self.default_timeout)
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout_for(url)
+        if self.record_requests and json_output() is not None:
+            return self._send_recorded(method, url, *args, **kwargs)
+        return self._send_retried(method, url, *args, **kwargs)
+
+    def _send_recorded(self, method, url, *args, **kwargs):
+        body = kwargs.get('json') if isinstance(kwargs.get('json'), dict) else {}
+        record = {
+            "event": "request",
+            "method": method.upper(),
+            "endpoint": urlsplit(url).path,
+            "email": body.get('email') or body.get('user_email') or body.get('target_email'),
+            "status": None,
+            "duration_ms": None,
+            "error": None,
+        }
+        start = time.perf_counter()
+        try:
+            response = self._send_retried(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException as e:
+            record["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            record["error"] = f"{type(e).__name__}: {e}"
+            emit(record)
+            raise
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        record["status"] = response.status_code
+        if getattr(response, 'trace_phases', None):
+            record["phases_ms"] = response.trace_phases
+        emit(record)
+        return response
+
+    def _send_retried(self, method, url, *args, **kwargs):
+        if self.retry_policy is None:
+            return self._send_paced(method, url, *args, **kwargs)
+        return self.retry_policy.call(method, url, lambda: self._send_paced(method, url, *args, **kwargs))
+
+    def _send_paced(self, method, url, *args, **kwargs):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        response = self._send_traced(method, url, *args, **kwargs)
+        if self.rate_limiter is not None:
+            self.rate_limiter.observe(url, response)
+        return response
+
+    def _send_traced(self, method, url, *args, **kwargs):
+        if self.tracer is None:
+            return super().request(method, url, *args, **kwargs)
+        return self.tracer.call(method, url, lambda: super(GoBarberlySession, self).request(method, url, *args, **kwargs))
+
+
+def create_session(timeout: Union[float, Timeout] = DEFAULT_TIMEOUT,
+                   endpoint_timeouts: Optional[Dict[str, Union[float, Timeout]]] = None,
+                   user_agent: Optional[str] = None,
+                   pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                   pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                   use_agent: bool = True,
+                   retry_policy: Optional[RetryPolicy] = None,
+                   rate_limiter: Optional[RateLimiter] = None,
+                   tracer: Optional['Tracer'] = None) -> GoBarberlySession:
+    """Build a pooled session for one tool (optionally retrying, rate limited and traced)"""
+    session = GoBarberlySession(
+        timeout=timeout,
+        endpoint_timeouts=endpoint_timeouts,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        use_agent=use_agent,
+        retry_policy=retry_policy,
+        rate_limiter=rate_limiter,
+        tracer=tracer
+    )
+    session.headers.update({'Content-Type': 'application/json'})
+    if user_agent:
+        session.headers['User-Agent'] = user_agent
+    return session
+
+
+_shared_session: Optional[GoBarberlySession] = None
+_shared_lock = threading.Lock()
+
+
+def get_session() -> GoBarberlySession:
+    """Process-wide shared session for the function-style scripts"""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session(user_agent='GoBarberly-Tools/1.0')
+        return _shared_session
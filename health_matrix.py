@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Backend Health Matrix
+Checks the API surface the React frontend depends on (src/services/*.ts)
+in parallel: status, latency and CORS preflight correctness per endpoint
+A full sweep takes about as long as the slowest endpoint, not the sum
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import requests
+
+from console import emit, enable_json_output
+from gobarberly_client import DEFAULT_BASE_URL, create_session
+from profiling import profiled_main
+
+# Origin the frontend is served from during development
+DEFAULT_ORIGIN = 'http://localhost:3000'
+
+# Enough workers to run every check of the default list in a single round
+DEFAULT_CONCURRENCY = 64
+
+# (connect, read) per check - a health sweep should not wait 90s on one endpoint
+CHECK_TIMEOUT = (5, 10)
+
+
+class Endpoint(NamedTuple):
+    """One frontend call; `call=False` only preflights it (write endpoints)"""
+    group: str
+    path: str
+    method: str = 'GET'
+    auth: bool = True
+    call: bool = True
+    cors: bool = True
+
+
+# {today} is filled in at run time
+ENDPOINTS: List[Endpoint] = [
+    Endpoint('core', '/api/health/', auth=False),
+    Endpoint('core', '/api/', auth=False),
+    Endpoint('core', '/admin/', auth=False, cors=False),
+
+    # api.ts
+    Endpoint('auth', '/api/auth/login/', 'POST', auth=False, call=False),
+    Endpoint('auth', '/api/auth/forgot-password/', 'POST', auth=False, call=False),
+    Endpoint('auth', '/api/auth/reset-password/', 'POST', auth=False, call=False),
+    Endpoint('auth', '/api/auth/token/refresh/', 'POST', auth=False, call=False),
+    Endpoint('auth', '/api/auth/profile/'),
+
+    # barbershopApi.ts
+    Endpoint('barbershop', '/api/barbershop/dashboard/stats/'),
+    Endpoint('barbershop', '/api/barbershop/dashboard/monthly-revenue/'),
+    Endpoint('barbershop', '/api/barbershop/dashboard/service-popularity/'),
+    Endpoint('barbershop', '/api/barbershop/dashboard/staff-performance/'),
+    Endpoint('barbershop', '/api/barbershop/profile/'),
+    Endpoint('barbershop', '/api/barbershop/appointments/?page_size=1'),
+    Endpoint('barbershop', '/api/barbershop/appointments/today/'),
+    Endpoint('barbershop', '/api/barbershop/schedule/grid/?date={today}'),
+    Endpoint('barbershop', '/api/barbershop/sales/daily-summary/?date={today}'),
+    Endpoint('barbershop', '/api/barbershop/staff/active-barbers/'),
+    Endpoint('barbershop', '/api/barbershop/customers/?page_size=1'),
+    Endpoint('barbershop', '/api/barbershop/services/active/'),
+    Endpoint('barbershop', '/api/barbershop/inventory/low-stock/'),
+    Endpoint('barbershop', '/api/barbershop/reports/summary/'),
+
+    # adminApi.ts
+    Endpoint('admin', '/api/admin/dashboard/stats/'),
+    Endpoint('admin', '/api/admin/barbershops/?page_size=1'),
+
+    # superAdminApi.ts
+    Endpoint('super-admin', '/api/super-admin/dashboard/stats/'),
+    Endpoint('super-admin', '/api/super-admin/admins/?page_size=1'),
+    Endpoint('super-admin', '/api/super-admin/barbershops/?page_size=1'),
+]
+
+
+def classify(status: Optional[int], authenticated: bool) -> str:
+    """Verdict for one response: ok, protected, missing, error or down"""
+    if status is None:
+        return 'down'
+    if status >= 500:
+        return 'error'
+    if status == 404:
+        return 'missing'
+    if status in (401, 403) and not authenticated:
+        return 'protected'  # reachable and enforcing auth
+    if status >= 400 and status not in (401, 403, 405):
+        return 'error'
+    return 'ok' if status < 400 or status == 405 else 'denied'
+
+
+def _header_list(value: str) -> List[str]:
+    return [item.strip().lower() for item in value.split(',') if item.strip()]
+
+
+def check_cors(headers, origin: str, method: str, request_headers: List[str]) -> List[str]:
+    """Problems with a preflight response (empty list = correct)"""
+    problems = []
+    allow_origin = headers.get('Access-Control-Allow-Origin')
+    if allow_origin not in (origin, '*'):
+        problems.append(f"allow-origin={allow_origin or 'missing'}")
+    methods = _header_list(headers.get('Access-Control-Allow-Methods', ''))
+    if method != 'GET' and '*' not in methods and method.lower() not in methods:
+        problems.append(f"{method} not allowed")
+    allowed = _header_list(headers.get('Access-Control-Allow-Headers', ''))
+    if '*' not in allowed:
+        missing = [name for name in request_headers if name not in allowed]
+        if missing:
+            problems.append(f"headers not allowed: {', '.join(missing)}")
+    return problems
+
+
+class HealthMatrix:
+    """Runs every endpoint check concurrently over one pooled session"""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, origin: str = DEFAULT_ORIGIN,
+                 concurrency: int = DEFAULT_CONCURRENCY, token: Optional[str] = None,
+                 endpoints: Optional[List[Endpoint]] = None):
+        self.base_url = base_url.rstrip('/')
+        self.origin = origin
+        self.concurrency = max(1, concurrency)
+        self.token = token
+        self.endpoints = endpoints if endpoints is not None else ENDPOINTS
+        self.session = create_session(timeout=CHECK_TIMEOUT, user_agent='GoBarberly-HealthMatrix/1.0',
+                                      pool_maxsize=self.concurrency)
+        self.session.record_requests = False  # each row is reported as one "check" record
+
+    def url_for(self, endpoint: Endpoint) -> str:
+        return f"{self.base_url}{endpoint.path.format(today=time.strftime('%Y-%m-%d'))}"
+
+    def _timed(self, method: str, url: str, headers: Dict[str, str]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=headers, timeout=CHECK_TIMEOUT,
+                                            allow_redirects=False)
+            response.content
+            return {"status": response.status_code, "headers": response.headers, "error": None,
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+        except requests.exceptions.RequestException as e:
+            return {"status": None, "headers": {}, "error": type(e).__name__,
+                    "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    def preflight(self, endpoint: Endpoint) -> Dict[str, Any]:
+        """Browser-style CORS preflight for the method the frontend uses"""
+        request_headers = ['content-type'] + (['authorization'] if endpoint.auth else [])
+        result = self._timed('OPTIONS', self.url_for(endpoint), {
+            'Origin': self.origin,
+            'Access-Control-Request-Method': endpoint.method,
+            'Access-Control-Request-Headers': ', '.join(request_headers)
+        })
+        if result["status"] is None:
+            result["cors_problems"] = [result["error"]]
+        else:
+            result["cors_problems"] = check_cors(result["headers"], self.origin, endpoint.method, request_headers)
+        return result
+
+    def call(self, endpoint: Endpoint) -> Dict[str, Any]:
+        """The actual (read-only) request, with the Origin header a browser would send"""
+        headers = {'Origin': self.origin}
+        if endpoint.auth and self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        return self._timed(endpoint.method, self.url_for(endpoint), headers)
+
+    def run(self) -> List[Dict[str, Any]]:
+        """Check every endpoint; returns one row per endpoint in declaration order"""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            preflights = [pool.submit(self.preflight, endpoint) if endpoint.cors else None
+                          for endpoint in self.endpoints]
+            calls = [pool.submit(self.call, endpoint) if endpoint.call else None
+                     for endpoint in self.endpoints]
+
+            rows = []
+            for endpoint, preflight, call in zip(self.endpoints, preflights, calls):
+                cors = preflight.result() if preflight else {"status": None, "cors_problems": []}
+                result = call.result() if call else cors
+                verdict = classify(result["status"], bool(self.token))
+                if not call and verdict == 'ok' and cors["cors_problems"]:
+                    verdict = 'cors'
+                if call and endpoint.cors and result["status"] is not None and \
+                        result["headers"].get('Access-Control-Allow-Origin') not in (self.origin, '*'):
+                    cors["cors_problems"].append("response lacks allow-origin")
+                rows.append({
+                    "group": endpoint.group,
+                    "method": endpoint.method,
+                    "path": endpoint.path.split('?')[0],
+                    "status": result["status"] if call else None,
+                    "preflight_status": cors["status"],
+                    "latency_ms": result["latency_ms"] if call else cors["latency_ms"],
+                    "cors_ok": not cors["cors_problems"],
+                    "cors_problems": cors["cors_problems"],
+                    "verdict": verdict,
+                    "error": result["error"]
+                })
+        self.elapsed = time.perf_counter() - start
+        return rows
+
+
+VERDICT_ICONS = {'ok': '✅', 'protected': '🔒', 'missing': '❓', 'denied': '⛔', 'cors': '🌐',
+                 'error': '❌', 'down': '💥'}
+
+
+def print_matrix(rows: List[Dict[str, Any]], elapsed: Optional[float] = None):
+    header = f"{'':2} {'endpoint':<48} {'method':<6} {'status':>6} {'ms':>8}  {'CORS':<4}  notes"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        status = row["status"] if row["status"] is not None else (
+            f"({row['preflight_status']})" if row["preflight_status"] is not None else '-')
+        notes = row["error"] or '; '.join(row["cors_problems"])
+        print(f"{VERDICT_ICONS[row['verdict']]:2} {row['path']:<48} {row['method']:<6} {str(status):>6} "
+              f"{row['latency_ms']:>8.1f}  {'✅' if row['cors_ok'] else '❌':<4}  {notes}")
+
+    slowest = max((row["latency_ms"] for row in rows), default=0)
+    counts: Dict[str, int] = {}
+    for row in rows:
+        counts[row["verdict"]] = counts.get(row["verdict"], 0) + 1
+    print()
+    print("📊 " + ", ".join(f"{verdict}: {count}" for verdict, count in sorted(counts.items())))
+    if elapsed is not None:
+        print(f"⏱️  Sweep took {elapsed * 1000:.0f}ms (slowest endpoint {slowest:.0f}ms)")
+
+
+def is_healthy(rows: List[Dict[str, Any]]) -> bool:
+    """No 5xx, no unreachable endpoints and no broken CORS"""
+    return all(row["verdict"] not in ('error', 'down', 'cors') and row["cors_ok"] for row in rows)
+
+
+def run_health_matrix(base_url: str = DEFAULT_BASE_URL, origin: str = DEFAULT_ORIGIN,
+                      concurrency: int = DEFAULT_CONCURRENCY, token: Optional[str] = None) -> bool:
+    """Run the sweep, print the table and return overall health"""
+    matrix = HealthMatrix(base_url, origin, concurrency, token)
+    print(f"🔍 Checking {len(matrix.endpoints)} endpoints on {matrix.base_url} (origin {origin})")
+    print()
+    rows = matrix.run()
+    print_matrix(rows, matrix.elapsed)
+    healthy = is_healthy(rows)
+    for row in rows:
+        emit({"event": "check", **row})
+    emit({"event": "result", "operation": "health_matrix", "success": healthy,
+          "duration_ms": round(matrix.elapsed * 1000)})
+    return healthy
+
+
+def _login(base_url: str, email: str, password: str) -> Optional[str]:
+    """Access token for authenticated checks (cached between runs)"""
+    from token_cache import login_with_cache
+
+    session = create_session(timeout=CHECK_TIMEOUT, user_agent='GoBarberly-HealthMatrix/1.0')
+    return login_with_cache(session, base_url, email, password)
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Parallel health and CORS check of the GoBarberly API")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--origin", default=DEFAULT_ORIGIN, help="frontend origin for the CORS checks")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--token", help="access token for the authenticated endpoints")
+    parser.add_argument("--email", help="log in with this account instead of --token")
+    parser.add_argument("--password")
+    parser.add_argument("--json", action="store_true", help="one JSON record per endpoint instead of the table")
+    args = parser.parse_args(argv)
+    if args.json:
+        enable_json_output('health_matrix')
+
+    base_url = args.base_url.rstrip('/')
+    token = args.token
+    if args.email and not token:
+        try:
+            token = _login(base_url, args.email, args.password or '')
+            if not token:
+                print("⚠️  Login rejected; checking anonymously", file=sys.stderr)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️  Login failed ({type(e).__name__}); checking anonymously", file=sys.stderr)
+    return run_health_matrix(base_url, args.origin, args.concurrency, token)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('health_matrix', main) else 1)
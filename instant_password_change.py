@@ -8,6 +8,19 @@ NO EMAIL VERIFICATION - DIRECT UPDATE
 
 import requests
 import getpass
+import sys
+import time
+
+from console import emit, enable_json_output, take_json_flag
+from gobarberly_client import LOCAL_BASE_URL, get_session, resolve_base_url
+from profiling import profiled_main
+from token_log_follower import obtain_reset_token, token_follower_from_env
+
+# Shared pooled session (keep-alive + per-endpoint timeouts)
+session = get_session()
+
+# Backend URL (GOBARBERLY_BASE_URL overrides the local Django server)
+BACKEND_URL = resolve_base_url(LOCAL_BASE_URL)
 
 def test_backend_first():
     """Test if backend is accessible before attempting password change"""
@@ -15,7 +28,7 @@ def test_backend_first():
     
     try:
         # Test basic connectivity
-        response = requests.get("http://localhost:8000/api/health/", timeout=10)
+        response = session.get(f"{BACKEND_URL}/api/health/")
         if response.status_code == 200:
             print("✅ Backend is accessible")
             return True
@@ -37,7 +50,7 @@ def change_password(email, new_password):
         return False
     
     # Backend URL
-    url = "http://localhost:8000"
+    url = BACKEND_URL
     
     # Step 1: Generate reset token (but we'll use it immediately)
     print("📧 Requesting reset...")
@@ -53,10 +66,10 @@ def change_password(email, new_password):
         print(f"🔍 Payload: {payload}")
         print(f"🔍 Headers: {headers}")
         
-        response = requests.post(f"{url}/api/auth/forgot-password/", 
-                               json=payload, 
-                               headers=headers,
-                               timeout=90)
+        follower = token_follower_from_env()
+        response = session.post(f"{url}/api/auth/forgot-password/", 
+                              json=payload, 
+                              headers=headers)
         
         print(f"🔍 Response status: {response.status_code}")
         print(f"🔍 Response content-type: {response.headers.get('content-type', 'unknown')}")
@@ -75,7 +88,7 @@ def change_password(email, new_password):
             print("4. Copy the token from the logs")
             print("="*50)
             
-            token = input("\n🔑 Paste the reset token here: ").strip()
+            token = obtain_reset_token(follower, email, "\n🔑 Paste the reset token here: ")
             
             if token:
                 # Step 2: Use token immediately to set new password
@@ -87,9 +100,8 @@ def change_password(email, new_password):
                     "new_password_confirm": new_password
                 }
                 
-                reset_response = requests.post(f"{url}/api/auth/reset-password/",
-                                             json=reset_data,
-                                             timeout=30)
+                reset_response = session.post(f"{url}/api/auth/reset-password/",
+                                            json=reset_data)
                 
                 if reset_response.status_code in [200, 201]:
                     print("✅ SUCCESS! Password changed!")
@@ -107,7 +119,7 @@ def change_password(email, new_password):
             try:
                 error_data = response.json()
                 print(f"🔍 Error details: {error_data}")
-            except:
+            except ValueError:
                 print(f"🔍 Raw error response: {response.text}")
             return False
             
@@ -123,10 +135,10 @@ def test_forgot_password_endpoint():
     print("\n🧪 Testing forgot-password endpoint...")
     
     try:
-        response = requests.post("http://localhost:8000/api/auth/forgot-password/",
-                               json={"email": "test@example.com"},
-                               headers={'Content-Type': 'application/json'},
-                               timeout=10)
+        response = session.post(f"{BACKEND_URL}/api/auth/forgot-password/",
+                              json={"email": "test@example.com"},
+                              headers={'Content-Type': 'application/json'},
+                              timeout=10)
         
         print(f"Status: {response.status_code}")
         print(f"Content-Type: {response.headers.get('content-type')}")
@@ -138,8 +150,8 @@ def test_forgot_password_endpoint():
         print(f"Error: {e}")
         return False
 
-# Main execution
-if __name__ == "__main__":
+def main():
+    """Interactive flow: endpoint check, then email + password"""
     print("🔐 SIMPLE PASSWORD CHANGER")
     print("="*40)
     
@@ -160,4 +172,23 @@ if __name__ == "__main__":
     if change_password(email, password):
         print("\n🎉 DONE!")
     else:
-        print("\n❌ FAILED!")
\ No newline at end of file
+        print("\n❌ FAILED!")
+
+def run_cli():
+    """Command line: python instant_password_change.py email password [--json] [--profile]"""
+    argv, as_json = take_json_flag(sys.argv[1:])
+    if len(argv) >= 2:
+        email = argv[0]
+        password = argv[1]
+        if as_json:
+            enable_json_output('instant_password_change')
+        start_time = time.time()
+        success = change_password(email, password)
+        emit({"event": "result", "operation": "password_change", "email": email, "success": success,
+              "duration_ms": round((time.time() - start_time) * 1000)})
+    else:
+        main()
+
+# Main execution
+if __name__ == "__main__":
+    profiled_main('instant_password_change', run_cli)
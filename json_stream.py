@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON Decoding for the GoBarberly Tools
+Parses the records of a large listing while its body is still downloading
+and hands them out one at a time, instead of response.json() holding the
+whole body, its text and every parsed record in memory at once
+
+Understands a bare array, DRF pages ({count, next, results: [...]}) and the
+{success, data: [...]} envelope (also {data: {results: [...]}})
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+import requests
+
+# Bytes read from the socket per step
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Object keys whose array (or object) holds the records
+RECORD_KEYS = ('results', 'data')
+
+_WHITESPACE = ' \t\n\r'
+
+# What follows an array item: optional whitespace, the separator, more whitespace
+_ITEM_END = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+
+
+class StreamFormatError(ValueError):
+    """The body is not JSON, or holds no record array where one was expected"""
+
+
+class JsonArrayStream:
+    """
+    Iterator over the records of one JSON body, fed chunk by chunk
+    Scalars around the record array (count, next, success, ...) are kept in
+    `meta`; values after the array are only there once iteration finished
+    """
+
+    def __init__(self, chunks: Iterable[bytes], record_keys: Sequence[str] = RECORD_KEYS):
+        self.chunks = iter(chunks)
+        self.record_keys = tuple(record_keys)
+        self.decoder = json.JSONDecoder()
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.consumed = 0  # characters dropped from the front of the buffer
+        self.exhausted = False
+        self.meta: Dict[str, Any] = {}
+        self.records = 0
+        self._items = self._parse()
+
+    def __iter__(self) -> Iterator[Any]:
+        return self._items  # the generator itself, so for-loops skip __next__
+
+    def __next__(self) -> Any:
+        return next(self._items)
+
+    def close(self):
+        self._items.close()
+
+    @property
+    def offset(self) -> int:
+        """Position in the decoded body, for error messages"""
+        return self.consumed + self.pos
+
+    # ---- Buffer --------------------------------------------------------
+
+    def _read(self) -> bool:
+        """Append the next chunk to the buffer; False once the body is done"""
+        if self.exhausted:
+            return False
+        # Drop what has been parsed so the buffer stays around one chunk
+        if self.pos > len(self.buffer) // 2:
+            self.buffer = self.buffer[self.pos:]
+            self.consumed += self.pos
+            self.pos = 0
+        for chunk in self.chunks:
+            if chunk:
+                self.buffer += self.text.decode(chunk)
+                return True
+        self.buffer += self.text.decode(b'', final=True)
+        self.exhausted = True
+        return False
+
+    def _peek(self) -> str:
+        """Next non-whitespace character ('' at the end of the body)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read():
+                return ''
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if not char or char not in chars:
+            raise StreamFormatError(f"Expected one of {chars!r} at offset {self.offset}, got {char or 'end of body'!r}")
+        self.pos += 1
+        return char
+
+    def _value(self) -> Any:
+        """Decode one complete value, reading more of the body until it is whole"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._read():
+                    raise StreamFormatError(f"Invalid JSON: {e}") from None
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.exhausted:
+                self._read()
+                continue
+            self.pos = end
+            return value
+
+    # ---- Structure -----------------------------------------------------
+
+    def _parse(self) -> Iterator[Any]:
+        char = self._peek()
+        if char == '[':
+            yield from self._array()
+        elif char == '{':
+            if not (yield from self._object()):
+                raise StreamFormatError(f"No record array under any of {self.record_keys}")
+        else:
+            raise StreamFormatError("Body is not a JSON array or object")
+        if self._peek():
+            raise StreamFormatError(f"Trailing data at offset {self.offset}")
+
+    def _array(self) -> Iterator[Any]:
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        scan = self.decoder.scan_once  # the C scanner behind raw_decode, without its wrapper
+        item_end = _ITEM_END.match
+        records = 0
+        try:
+            while True:
+                # Fast path: the item and its separator are already buffered
+                try:
+                    value, end = scan(self.buffer, self.pos)
+                    match = item_end(self.buffer, end)
+                except (StopIteration, ValueError):
+                    match = None
+                if match is None:
+                    value = self._value()
+                    separator = self._expect(',]')
+                    self._peek()  # back onto the next item, so the fast path applies again
+                else:
+                    self.pos = match.end()
+                    separator = match.group(1)
+                records += 1
+                yield value
+                if separator == ']':
+                    return
+        finally:
+            self.records += records
+
+    def _object(self) -> Iterator[Any]:
+        """Stream the record array inside an object; returns whether one was found"""
+        self._expect('{')
+        found = False
+        if self._peek() == '}':
+            self.pos += 1
+            return found
+        while True:
+            if self._peek() != '"':
+                raise StreamFormatError(f"Expected an object key at offset {self.offset}")
+            key = self._value()
+            self._expect(':')
+            char = self._peek()
+            if key in self.record_keys and not found and char == '[':
+                yield from self._array()
+                found = True
+            elif key in self.record_keys and not found and char == '{':
+                found = yield from self._object()
+            else:
+                self.meta[key] = self._value()
+            if self._expect(',}') == '}':
+                return found
+
+
+def stream_records(response: requests.Response, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   record_keys: Sequence[str] = RECORD_KEYS) -> JsonArrayStream:
+    """Records of a response requested with stream=True, parsed as the body arrives"""
+    return JsonArrayStream(response.iter_content(chunk_size), record_keys)
+
+
+def iter_json_records(session: requests.Session, url: str, params: Optional[Dict[str, Any]] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      record_keys: Sequence[str] = RECORD_KEYS) -> Iterator[Any]:
+    """GET a listing and yield its records one at a time; the connection is released at the end"""
+    response = session.get(url, params=params, stream=True)
+    try:
+        response.raise_for_status()
+        yield from stream_records(response, chunk_size, record_keys)
+    finally:
+        response.close()
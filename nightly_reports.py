@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Nightly Report Runner for Every Barbershop
+Lists all shops from /api/super-admin/barbershops/ and fetches their
+/reports/summary/, /reports/analytics/ and /reports/export/ concurrently:
+an asyncio loop bounds the requests in flight, while a process pool turns
+the responses into files so formatting never stalls the downloads
+Writes one directory per shop plus manifest.json with every result and timing
+
+    python nightly_reports.py --email admin@gobarberly.com --password ... [--out reports/2025-01-31]
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from console import emit, enable_json_output
+from gobarberly_client import DEFAULT_BASE_URL, create_session
+from profiling import profiled_main
+from rate_limiter import add_rate_limit_arguments, rate_limiter_from_args
+from retry_policy import RetryPolicy
+
+REPORTS = {
+    'summary': '/api/barbershop/reports/summary/',
+    'analytics': '/api/barbershop/reports/analytics/',
+    'export': '/api/barbershop/reports/export/',
+}
+
+# Reports that take start_date/end_date (analytics always covers its own range)
+DATED_REPORTS = ('summary', 'export')
+
+SHOPS_PATH = '/api/super-admin/barbershops/'
+
+# Query parameter that points a super admin's report request at one shop
+DEFAULT_SHOP_PARAM = 'barbershop_id'
+
+# Report requests in flight at once
+DEFAULT_CONCURRENCY = 16
+
+# Reports (especially exports) can take a while to build server-side
+REPORT_TIMEOUT = (10.0, 120.0)
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '-', text).strip('-').lower()[:40] or 'shop'
+
+
+def _csv_text(rows: List[Dict[str, Any]]) -> str:
+    """CSV of a list of records; nested values are written as JSON"""
+    fields: Dict[str, None] = {}
+    for row in rows:
+        fields.update(dict.fromkeys(row))
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(fields))
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: json.dumps(value) if isinstance(value, (dict, list)) else value
+                         for key, value in row.items()})
+    return out.getvalue()
+
+
+def render_report(directory: str, report: str, body: bytes) -> Dict[str, Any]:
+    """
+    Write one fetched report as files (runs in a worker process)
+    The JSON is written pretty-printed; every list of records in it also
+    becomes a CSV (report.csv, or report-<key>.csv for lists inside an object)
+    """
+    start = time.perf_counter()
+    data = json.loads(body)
+    if isinstance(data, dict) and isinstance(data.get('data'), (dict, list)) and 'success' in data:
+        data = data['data']
+    os.makedirs(directory, exist_ok=True)
+    files = []
+
+    def write(name: str, text: str):
+        with open(os.path.join(directory, name), 'w', encoding='utf-8', newline='') as handle:
+            handle.write(text)
+        files.append(name)
+
+    write(f"{report}.json", json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False))
+    tables = {'': data} if isinstance(data, list) else data if isinstance(data, dict) else {}
+    for key, value in tables.items():
+        if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+            write(f"{report}-{_slug(key)}.csv" if key else f"{report}.csv", _csv_text(value))
+    return {"files": files, "render_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+
+class ReportRunner:
+    """
+    Fetches every report of every shop with at most `concurrency` requests in
+    flight and hands each response to a process pool for rendering
+    The requests go through the tools' pooled, retrying session on a thread
+    pool of the same size, so asyncio only schedules and never blocks on I/O
+    """
+
+    def __init__(self, session: requests.Session, base_url: str, out_dir: str,
+                 reports: List[str], concurrency: int = DEFAULT_CONCURRENCY,
+                 render_workers: Optional[int] = None, shop_param: str = DEFAULT_SHOP_PARAM,
+                 params: Optional[Dict[str, str]] = None):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.out_dir = out_dir
+        self.reports = reports
+        self.concurrency = max(1, concurrency)
+        self.render_workers = render_workers
+        self.shop_param = shop_param
+        self.params = dict(params or {})
+
+    def list_shops(self) -> List[Dict[str, Any]]:
+        from pagination import paginate
+
+        return list(paginate(self.session, f"{self.base_url}{SHOPS_PATH}"))
+
+    def fetch(self, shop_id: Any, report: str) -> requests.Response:
+        params = dict(self.params if report in DATED_REPORTS else {}, **{self.shop_param: shop_id})
+        response = self.session.get(f"{self.base_url}{REPORTS[report]}", params=params, timeout=REPORT_TIMEOUT)
+        response.content  # read the body on the I/O thread, not the event loop
+        return response
+
+    def new_entry(self, shop: Dict[str, Any], report: str) -> Dict[str, Any]:
+        shop_dir = f"{shop.get('id')}-{_slug(str(shop.get('shop_name') or shop.get('email') or ''))}"
+        return {"shop_id": shop.get('id'), "shop_name": shop.get('shop_name'), "report": report,
+                "directory": shop_dir, "status": None, "bytes": 0, "queued_ms": None, "fetch_ms": None,
+                "render_ms": None, "files": [], "error": None}
+
+    async def run_one(self, loop: asyncio.AbstractEventLoop, limit: asyncio.Semaphore,
+                      io_pool: ThreadPoolExecutor, render_pool: ProcessPoolExecutor,
+                      entry: Dict[str, Any]):
+        queued = time.perf_counter()
+        async with limit:  # held for the download only; rendering doesn't occupy a request slot
+            start = time.perf_counter()
+            entry["queued_ms"] = round((start - queued) * 1000, 1)
+            try:
+                response = await loop.run_in_executor(io_pool, self.fetch, entry["shop_id"], entry["report"])
+            except requests.exceptions.RequestException as e:
+                entry["error"] = f"{type(e).__name__}: {e}"
+            entry["fetch_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        if entry["error"]:
+            return
+
+        entry["status"] = response.status_code
+        entry["bytes"] = len(response.content)
+        if response.status_code != 200:
+            entry["error"] = f"HTTP {response.status_code}"
+            return
+        try:
+            rendered = await loop.run_in_executor(render_pool, render_report,
+                                                  os.path.join(self.out_dir, entry["directory"]),
+                                                  entry["report"], response.content)
+        except Exception as e:  # bad JSON, disk errors, a crashed worker (BrokenProcessPool)
+            entry["error"] = f"render failed: {type(e).__name__}: {e}"
+            return
+        entry.update(rendered)
+
+    async def run_guarded(self, *args, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """run_one that records any failure in its entry instead of ending the whole run"""
+        try:
+            await self.run_one(*args, entry)
+        except Exception as e:
+            entry["error"] = entry["error"] or f"{type(e).__name__}: {e}"
+        return entry
+
+    async def run_all(self, shops: List[Dict[str, Any]], entries: List[Dict[str, Any]]):
+        """Fetch and render every report; finished entries are appended to `entries` as they complete"""
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="report-io") as io_pool, \
+                ProcessPoolExecutor(max_workers=self.render_workers) as render_pool:
+            tasks = [self.run_guarded(loop, limit, io_pool, render_pool, entry=self.new_entry(shop, report))
+                     for shop in shops for report in self.reports]
+            for finished in asyncio.as_completed(tasks):
+                entry = await finished
+                emit({"event": "report", **{key: entry[key] for key in
+                                            ("shop_id", "report", "status", "bytes", "fetch_ms", "render_ms", "error")}})
+                entries.append(entry)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        List the shops, fetch and render every report, write the manifest
+        The manifest is written even when the run is cut short; the error is
+        then re-raised
+        """
+        started = time.time()
+        start = time.perf_counter()
+        shops: List[Dict[str, Any]] = []
+        entries: List[Dict[str, Any]] = []
+        listed = None
+        os.makedirs(self.out_dir, exist_ok=True)
+        try:
+            shops = self.list_shops()
+            listed = time.perf_counter()
+            asyncio.run(self.run_all(shops, entries))
+        except BaseException as e:
+            self.write_manifest(started, start, listed, shops, entries, f"{type(e).__name__}: {e}")
+            raise
+        return self.write_manifest(started, start, listed, shops, entries)
+
+    def write_manifest(self, started: float, start: float, listed: Optional[float],
+                       shops: List[Dict[str, Any]], entries: List[Dict[str, Any]],
+                       error: Optional[str] = None) -> Dict[str, Any]:
+        finished = time.perf_counter()
+        entries.sort(key=lambda entry: (str(entry["shop_id"]), self.reports.index(entry["report"])))
+        fetch_times = sorted(entry["fetch_ms"] for entry in entries if entry["fetch_ms"] is not None)
+        manifest = {
+            "base_url": self.base_url,
+            "started_at": time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(started)),
+            "reports": self.reports,
+            "params": self.params,
+            "concurrency": self.concurrency,
+            "shops": len(shops),
+            "planned": len(shops) * len(self.reports),
+            "succeeded": sum(1 for entry in entries if not entry["error"]),
+            "failed": sum(1 for entry in entries if entry["error"]),
+            "bytes": sum(entry["bytes"] for entry in entries),
+            "error": error,  # set when the run itself stopped early
+            "timings_ms": {
+                "list_shops": round(((listed or finished) - start) * 1000, 1),
+                "reports": round((finished - listed) * 1000, 1) if listed is not None else None,
+                "total": round((finished - start) * 1000, 1),
+                "fetch_p50": fetch_times[len(fetch_times) // 2] if fetch_times else None,
+                "fetch_max": fetch_times[-1] if fetch_times else None,
+                "render_total": round(sum(entry["render_ms"] or 0 for entry in entries), 1),
+            },
+            "results": entries,
+        }
+        temp_path = os.path.join(self.out_dir, f"{MANIFEST_FILE}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle, indent=2)
+        os.replace(temp_path, os.path.join(self.out_dir, MANIFEST_FILE))
+        return manifest
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Fetch the reports of every barbershop concurrently")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--email", help="super admin account to log in with")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="access token instead of --email/--password")
+    parser.add_argument("--out", help="output directory (default: reports/<today>)")
+    parser.add_argument("--reports", default=','.join(REPORTS),
+                        help="comma-separated subset of: " + ', '.join(REPORTS))
+    parser.add_argument("--start-date", help="YYYY-MM-DD, passed to summary and export")
+    parser.add_argument("--end-date", help="YYYY-MM-DD, passed to summary and export")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="requests in flight")
+    parser.add_argument("--render-workers", type=int, help="rendering processes (default: one per CPU)")
+    parser.add_argument("--shop-param", default=DEFAULT_SHOP_PARAM,
+                        help=f"query parameter selecting the shop (default: {DEFAULT_SHOP_PARAM})")
+    add_rate_limit_arguments(parser)
+    parser.add_argument("--json", action="store_true", help="JSON-lines records instead of text")
+    args = parser.parse_args(argv)
+    if args.json:
+        enable_json_output('nightly_reports')
+
+    reports = [name.strip() for name in args.reports.split(',') if name.strip()]
+    unknown = [name for name in reports if name not in REPORTS]
+    if unknown:
+        parser.error(f"unknown report(s): {', '.join(unknown)}")
+    if not args.token and not args.email:
+        parser.error("give --email/--password or --token")
+
+    from token_cache import login_with_cache
+
+    base_url = args.base_url.rstrip('/')
+    out_dir = args.out or os.path.join('reports', time.strftime('%Y-%m-%d'))
+    params = {key: value for key, value in (('start_date', args.start_date), ('end_date', args.end_date)) if value}
+    session = create_session(retry_policy=RetryPolicy(), rate_limiter=rate_limiter_from_args(args),
+                             user_agent='GoBarberly-Reports/1.0', pool_maxsize=max(10, args.concurrency))
+    try:
+        if args.token:
+            session.headers['Authorization'] = f'Bearer {args.token}'
+        elif not login_with_cache(session, base_url, args.email, args.password or ''):
+            print("❌ Login rejected", file=sys.stderr)
+            emit({"event": "result", "operation": "nightly_reports", "success": False, "error": "login rejected"})
+            return False
+        print(f"🌙 Fetching {', '.join(reports)} for every shop ({args.concurrency} at a time)...")
+        runner = ReportRunner(session, base_url, out_dir, reports, args.concurrency, args.render_workers,
+                              args.shop_param, params)
+        manifest = runner.run()
+    except (requests.exceptions.RequestException, ValueError, OSError) as e:
+        print(f"❌ Report run failed: {e}", file=sys.stderr)
+        print(f"📁 {os.path.join(out_dir, MANIFEST_FILE)} has the reports finished before that", file=sys.stderr)
+        emit({"event": "result", "operation": "nightly_reports", "success": False, "error": str(e)})
+        return False
+
+    timings = manifest["timings_ms"]
+    icon = '✅' if not manifest["failed"] else '⚠️ '
+    print(f"{icon} {manifest['succeeded']}/{manifest['succeeded'] + manifest['failed']} reports for "
+          f"{manifest['shops']} shops in {timings['total'] / 1000:.1f}s "
+          f"(listing {timings['list_shops'] / 1000:.1f}s, fetch p50 {timings['fetch_p50'] or 0:.0f} ms, "
+          f"rendering {timings['render_total'] / 1000:.1f}s CPU in worker processes)")
+    for entry in manifest["results"]:
+        if entry["error"]:
+            print(f"   ❌ {entry['shop_name'] or entry['shop_id']} {entry['report']}: {entry['error']}")
+    print(f"📁 {os.path.join(out_dir, MANIFEST_FILE)}")
+    emit({"event": "result", "operation": "nightly_reports", "success": not manifest["failed"],
+          **{key: manifest[key] for key in ("shops", "succeeded", "failed", "bytes")},
+          "duration_ms": timings["total"]})
+    return not manifest["failed"]
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('nightly_reports', main) else 1)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Prefetching Pagination for the GoBarberly Tools
+Walks page/page_size listings while the next pages are already in flight,
+so a bulk reader waits on one round-trip per K pages instead of per page
+Records come out of a generator in page order; at most K pages are held
+
+    python pagination.py /api/super-admin/barbershops/ --email admin@gobarberly.com --password ... > shops.jsonl
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional
+
+import requests
+
+from console import emit, enable_json_output
+from gobarberly_client import DEFAULT_BASE_URL, create_session
+from json_stream import stream_records
+from profiling import profiled_main
+from retry_policy import RetryPolicy
+
+DEFAULT_PAGE_SIZE = 100
+
+# Pages requested ahead of the one being consumed
+DEFAULT_PREFETCH = 4
+
+
+class Page(NamedTuple):
+    number: int
+    records: List[Dict[str, Any]]
+    has_next: bool
+    count: Optional[int]  # total records, when the backend reports it
+
+
+class PageFormatError(ValueError):
+    """A listing answered with something that is not a page of records"""
+
+
+def page_has_next(meta: Dict[str, Any], number: int, page_size: int, records: int) -> bool:
+    """Whether a page with these envelope fields is followed by another one"""
+    count = meta.get('count') if isinstance(meta.get('count'), int) else None
+    if 'next' in meta:
+        has_next = bool(meta['next'])
+    else:
+        has_next = count is not None and number * page_size < count
+    return has_next and records > 0
+
+
+def parse_page(data: Any, number: int, page_size: int) -> Page:
+    """
+    Page from a DRF response ({count, next, results}), the {success, data, count}
+    envelope of the super-admin API or a bare list (a single page)
+    """
+    if isinstance(data, list):
+        return Page(number, data, False, len(data))
+    if not isinstance(data, dict):
+        raise PageFormatError("Unexpected page format (not a JSON object or list)")
+    body = data.get('data') if isinstance(data.get('data'), (dict, list)) else data
+    meta = dict(data)
+    if isinstance(body, dict):
+        if not isinstance(body.get('results'), list):
+            raise PageFormatError("Unexpected page format (no results list)")
+        meta.update(body)
+        records = body['results']
+    else:
+        records = body
+    count = meta.get('count') if isinstance(meta.get('count'), int) else None
+    return Page(number, records, page_has_next(meta, number, page_size, len(records)), count)
+
+
+def last_page(count: Optional[int], page_size: int) -> Optional[int]:
+    return max(1, math.ceil(count / page_size)) if count is not None else None
+
+
+class PageFetcher:
+    """Fetches single pages of one listing; safe to call from several threads"""
+
+    def __init__(self, session: requests.Session, url: str, params: Optional[Dict[str, Any]] = None,
+                 page_size: int = DEFAULT_PAGE_SIZE):
+        self.session = session
+        self.url = url
+        self.params = dict(params or {})
+        self.page_size = page_size
+
+    def fetch(self, number: int) -> Optional[Page]:
+        """One page, or None past the end (DRF answers 404 "Invalid page")"""
+        response = self.session.get(self.url, params=dict(self.params, page=number, page_size=self.page_size))
+        if response.status_code == 404 and number > 1:
+            return None
+        response.raise_for_status()
+        return parse_page(response.json(), number, self.page_size)
+
+
+def iter_pages(session: requests.Session, url: str, params: Optional[Dict[str, Any]] = None,
+               page_size: int = DEFAULT_PAGE_SIZE, prefetch: int = DEFAULT_PREFETCH) -> Iterator[Page]:
+    """
+    Pages of a listing in order, with up to `prefetch` later pages in flight
+    Once the first page reports a total count nothing past the last page is
+    requested; without one, requests run ahead speculatively and the walk
+    stops at the first page that is empty, missing or has no next link
+    Closing the generator early cancels the pages not yet sent
+    """
+    fetcher = PageFetcher(session, url, params, page_size)
+    first = fetcher.fetch(1)
+    if first is None:
+        return
+    yield first
+    if not first.has_next:
+        return
+    if prefetch <= 0:
+        number = 1
+        while True:
+            number += 1
+            page = fetcher.fetch(number)
+            if page is None:
+                return
+            yield page
+            if not page.has_next:
+                return
+
+    final = last_page(first.count, page_size)
+    executor = ThreadPoolExecutor(max_workers=prefetch, thread_name_prefix="page-prefetch")
+    pending: Deque[Future] = deque()
+    next_number = 2
+    try:
+        while True:
+            while len(pending) < prefetch and (final is None or next_number <= final):
+                pending.append(executor.submit(fetcher.fetch, next_number))
+                next_number += 1
+            if not pending:
+                return
+            page = pending.popleft().result()
+            if page is None or not page.records:
+                return
+            yield page
+            if not page.has_next:
+                return
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_streamed(session: requests.Session, url: str, params: Optional[Dict[str, Any]] = None,
+                  page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Every record of a listing, parsed while each page downloads (json_stream)
+    Pages are read one after another; memory stays at one chunk plus one record
+    """
+    number = 1
+    while True:
+        response = session.get(url, params=dict(params or {}, page=number, page_size=page_size), stream=True)
+        try:
+            if response.status_code == 404 and number > 1:
+                return
+            response.raise_for_status()
+            records = stream_records(response)
+            yield from records
+        finally:
+            response.close()
+        if not page_has_next(records.meta, number, page_size, records.records):
+            return
+        number += 1
+
+
+def paginate(session: requests.Session, url: str, params: Optional[Dict[str, Any]] = None,
+             page_size: int = DEFAULT_PAGE_SIZE, prefetch: int = DEFAULT_PREFETCH,
+             stream: bool = False) -> Iterator[Dict[str, Any]]:
+    """Every record of a listing, one at a time (see iter_pages, or iter_streamed with stream=True)"""
+    if stream:
+        yield from iter_streamed(session, url, params, page_size)
+        return
+    for page in iter_pages(session, url, params, page_size, prefetch):
+        yield from page.records
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Export every record of a paginated listing as JSON lines")
+    parser.add_argument("path", help="listing path, e.g. /api/super-admin/barbershops/")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--email", help="account to log in with")
+    parser.add_argument("--password")
+    parser.add_argument("--token", help="access token instead of --email/--password")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE", help="extra query parameter")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH, help="pages in flight ahead of the output")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse each page while it downloads (constant memory, no prefetch)")
+    parser.add_argument("-o", "--output", help="write the records here instead of stdout")
+    parser.add_argument("--json", action="store_true", help="JSON-lines progress records on stdout (needs -o)")
+    args = parser.parse_args(argv)
+    if args.json and not args.output:
+        parser.error("--json needs --output for the records")
+    if args.json:
+        enable_json_output('pagination')
+
+    from token_cache import login_with_cache
+
+    base_url = args.base_url.rstrip('/')
+    params = dict(param.partition('=')[::2] for param in args.param)
+    session = create_session(retry_policy=RetryPolicy(), user_agent='GoBarberly-Export/1.0',
+                             pool_maxsize=max(10, args.prefetch + 1))
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    start = time.perf_counter()
+    records = 0
+    try:
+        if args.token:
+            session.headers['Authorization'] = f'Bearer {args.token}'
+        elif args.email and not login_with_cache(session, base_url, args.email, args.password or ''):
+            print("❌ Login rejected", file=sys.stderr)
+            emit({"event": "result", "operation": "pagination", "success": False, "error": "login rejected"})
+            return False
+        for record in paginate(session, f"{base_url}{args.path}", params, args.page_size, args.prefetch,
+                               args.stream):
+            out.write(json.dumps(record) + '\n')
+            records += 1
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"❌ Export failed after {records} records: {e}", file=sys.stderr)
+        emit({"event": "result", "operation": "pagination", "success": False, "records": records, "error": str(e)})
+        return False
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        else:
+            out.flush()
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {records} records in {elapsed:.2f}s", file=sys.stderr)
+    emit({"event": "result", "operation": "pagination", "success": True, "records": records,
+          "duration_ms": round(elapsed * 1000)})
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('pagination', main) else 1)
@@ -61,18 +61,7 @@ goto MENU
 echo.
 echo 📊 Testing Backend Connectivity...
 echo.
-python -c "
-import requests
-import time
-try:
-    start = time.time()
-    response = requests.get('https://gobarberly-backend.onrender.com/api/auth/forgot-password/', timeout=30)
-    duration = (time.time() - start) * 1000
-    print(f'✅ Backend reachable - Response time: {duration:.0f}ms')
-    print(f'📊 Status: {response.status_code}')
-except Exception as e:
-    print(f'❌ Backend unreachable: {str(e)}')
-"
+python health_matrix.py
 echo.
 echo Press any key to return to menu...
 pause >nul
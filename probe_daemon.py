@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Synthetic Monitoring Daemon
+Probes a set of GoBarberly endpoints on a fixed schedule, keeps the latest
+samples per endpoint in fixed-size ring buffers and serves rolling
+percentiles and error rates at /metrics in Prometheus text format
+"""
+
+import argparse
+import math
+import sys
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from gobarberly_client import DEFAULT_BASE_URL, create_session
+from profiling import profiled_main
+
+DEFAULT_INTERVAL = 15.0
+DEFAULT_WINDOW = 1024
+DEFAULT_LISTEN = '127.0.0.1:9464'
+
+# A monitor should notice a hung endpoint well before the next round
+PROBE_TIMEOUT = (5, 10)
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class ProbeTarget(NamedTuple):
+    """One endpoint to probe; responses with status >= 500 count as errors"""
+    method: str
+    path: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+DEFAULT_TARGETS = [
+    ProbeTarget('GET', '/api/health/'),
+    ProbeTarget('POST', '/api/auth/login/'),  # empty body: exercises routing and validation only
+    ProbeTarget('GET', '/api/auth/profile/'),
+    ProbeTarget('OPTIONS', '/api/auth/forgot-password/'),
+    ProbeTarget('GET', '/api/barbershop/dashboard/stats/'),
+    ProbeTarget('GET', '/api/super-admin/dashboard/stats/'),
+]
+
+
+def parse_target(spec: str) -> ProbeTarget:
+    """'GET /api/health/' or just '/api/health/'"""
+    method, _, path = spec.strip().rpartition(' ')
+    return ProbeTarget((method or 'GET').upper(), path)
+
+
+class RingBuffer:
+    """
+    Last `capacity` probe results for one endpoint in flat typed arrays
+    Memory is fixed at start-up no matter how long the daemon runs
+    """
+
+    def __init__(self, capacity: int = DEFAULT_WINDOW):
+        self.capacity = capacity
+        self.latencies = array('d', bytes(8 * capacity))
+        self.statuses = array('H', bytes(2 * capacity))  # 0 = no response
+        self.next = 0
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def append(self, latency: float, status: int):
+        with self.lock:
+            self.latencies[self.next] = latency
+            self.statuses[self.next] = status
+            self.next = (self.next + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+    def snapshot(self) -> Tuple[List[float], List[int]]:
+        """Copy of the buffered latencies and statuses (order does not matter)"""
+        with self.lock:
+            return list(self.latencies[:self.size]), list(self.statuses[:self.size])
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return math.nan
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+def _number(value: float) -> str:
+    return 'NaN' if math.isnan(value) else f"{value:.6f}"
+
+
+def _is_error(status: int) -> bool:
+    return status == 0 or status >= 500
+
+
+class EndpointStats:
+    """Ring buffer plus the cumulative counters Prometheus expects"""
+
+    def __init__(self, target: ProbeTarget, window: int):
+        self.target = target
+        self.ring = RingBuffer(window)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.status_counts: Dict[str, int] = {}
+        self.last_status = 0
+        self.last_success = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, latency: float, status: int, error: Optional[str]):
+        now = time.time()
+        self.ring.append(latency, status)
+        with self.lock:
+            self.count += 1
+            self.total_seconds += latency
+            key = str(status) if status else (error or 'error')
+            self.status_counts[key] = self.status_counts.get(key, 0) + 1
+            self.last_status = status
+            if not _is_error(status):
+                self.last_success = now
+
+
+class ProbeDaemon:
+    """Runs probe rounds on a fixed-rate schedule"""
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, targets: Optional[List[ProbeTarget]] = None,
+                 interval: float = DEFAULT_INTERVAL, window: int = DEFAULT_WINDOW,
+                 token: Optional[str] = None):
+        self.base_url = base_url.rstrip('/')
+        self.targets = targets or DEFAULT_TARGETS
+        self.interval = interval
+        self.stats = {target.label: EndpointStats(target, window) for target in self.targets}
+        # Direct connections: a running reset agent's socket hop would skew the latencies
+        self.session = create_session(timeout=PROBE_TIMEOUT, user_agent='GoBarberly-ProbeDaemon/1.0',
+                                      pool_maxsize=len(self.targets), use_agent=False)
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+        self.pool = ThreadPoolExecutor(max_workers=len(self.targets), thread_name_prefix='probe')
+        self.rounds = 0
+        self.stopping = threading.Event()
+
+    def probe(self, target: ProbeTarget):
+        start = time.perf_counter()
+        status, error = 0, None
+        try:
+            response = self.session.request(target.method, f"{self.base_url}{target.path}",
+                                            timeout=PROBE_TIMEOUT, allow_redirects=False)
+            response.content
+            status = response.status_code
+        except requests.exceptions.RequestException as e:
+            error = type(e).__name__
+        self.stats[target.label].record(time.perf_counter() - start, status, error)
+
+    def run_round(self):
+        """Probe every target concurrently and wait for the round to finish"""
+        for future in [self.pool.submit(self.probe, target) for target in self.targets]:
+            future.result()
+        self.rounds += 1
+
+    def run(self):
+        """Fixed-rate loop: a slow round shortens the following sleep instead of drifting"""
+        next_round = time.monotonic()
+        try:
+            while not self.stopping.is_set():
+                self.run_round()
+                next_round += self.interval
+                delay = next_round - time.monotonic()
+                if delay < 0:
+                    next_round = time.monotonic()  # fell behind; don't burst to catch up
+                    delay = 0
+                self.stopping.wait(delay)
+        finally:
+            self.pool.shutdown(wait=False)
+
+    def stop(self):
+        self.stopping.set()
+
+    def render_metrics(self) -> str:
+        """Prometheus text exposition of the current windows and counters"""
+        lines = [
+            "# HELP gobarberly_probe_latency_seconds Probe latency over the ring-buffer window",
+            "# TYPE gobarberly_probe_latency_seconds summary",
+        ]
+        gauges: Dict[str, List[str]] = {"error_ratio": [], "window_samples": [], "up": [],
+                                        "last_success_timestamp_seconds": []}
+        counters: List[str] = []
+
+        for stats in self.stats.values():
+            labels = f'method="{stats.target.method}",endpoint="{_escape(stats.target.path)}"'
+            latencies, statuses = stats.ring.snapshot()
+            latencies.sort()
+            for q in QUANTILES:
+                lines.append(f'gobarberly_probe_latency_seconds{{{labels},quantile="{q}"}} '
+                             f'{_number(percentile(latencies, q))}')
+            with stats.lock:
+                lines.append(f'gobarberly_probe_latency_seconds_sum{{{labels}}} {stats.total_seconds:.6f}')
+                lines.append(f'gobarberly_probe_latency_seconds_count{{{labels}}} {stats.count}')
+                for status, count in sorted(stats.status_counts.items()):
+                    counters.append(f'gobarberly_probe_requests_total{{{labels},status="{_escape(status)}"}} {count}')
+                last_status, last_success = stats.last_status, stats.last_success
+
+            errors = sum(1 for status in statuses if _is_error(status))
+            ratio = errors / len(statuses) if statuses else 0.0
+            gauges["error_ratio"].append(f'gobarberly_probe_error_ratio{{{labels}}} {ratio:.6f}')
+            gauges["window_samples"].append(f'gobarberly_probe_window_samples{{{labels}}} {len(statuses)}')
+            gauges["up"].append(f'gobarberly_probe_up{{{labels}}} {0 if _is_error(last_status) else 1}')
+            gauges["last_success_timestamp_seconds"].append(
+                f'gobarberly_probe_last_success_timestamp_seconds{{{labels}}} {last_success:.3f}')
+
+        lines += ["# HELP gobarberly_probe_requests_total Probes by response status",
+                  "# TYPE gobarberly_probe_requests_total counter"] + counters
+        help_text = {
+            "error_ratio": "Share of 5xx/failed probes in the window",
+            "window_samples": "Samples currently held in the ring buffer",
+            "up": "1 if the last probe got a non-5xx answer",
+            "last_success_timestamp_seconds": "Unix time of the last successful probe",
+        }
+        for name, samples in gauges.items():
+            lines += [f"# HELP gobarberly_probe_{name} {help_text[name]}",
+                      f"# TYPE gobarberly_probe_{name} gauge"] + samples
+        lines += ["# HELP gobarberly_probe_rounds_total Completed probe rounds",
+                  "# TYPE gobarberly_probe_rounds_total counter",
+                  f"gobarberly_probe_rounds_total {self.rounds}"]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def serve_metrics(daemon: ProbeDaemon, host: str, port: int) -> ThreadingHTTPServer:
+    """Start the /metrics endpoint on a background thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = daemon.render_metrics().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every few seconds would flood stderr
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Probe GoBarberly endpoints and expose Prometheus metrics")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--endpoint", action="append", dest="endpoints",
+                        help="'METHOD /path' to probe (repeatable; default: health, auth and dashboard endpoints)")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between rounds")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="samples kept per endpoint")
+    parser.add_argument("--listen", default=DEFAULT_LISTEN, help="host:port for /metrics")
+    parser.add_argument("--token", help="access token sent with every probe")
+    args = parser.parse_args(argv)
+
+    targets = [parse_target(spec) for spec in args.endpoints] if args.endpoints else None
+    daemon = ProbeDaemon(args.base_url, targets, args.interval, args.window, args.token)
+    host, _, port = args.listen.rpartition(':')
+    try:
+        server = serve_metrics(daemon, host or '127.0.0.1', int(port))
+    except OSError as e:
+        print(f"❌ Cannot serve metrics on {args.listen}: {e}", file=sys.stderr)
+        daemon.pool.shutdown(wait=False)
+        return False
+
+    print(f"📡 Probing {len(daemon.targets)} endpoints on {daemon.base_url} every {daemon.interval:g}s",
+          file=sys.stderr)
+    print(f"📊 Metrics at http://{server.server_address[0]}:{server.server_address[1]}/metrics", file=sys.stderr)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.shutdown()
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('probe_daemon', main) else 1)
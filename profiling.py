@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Profiling Hooks for the GoBarberly Tools
+Every tool accepts --profile (or --profile=PREFIX) and then writes:
+
+    PREFIX.pstats      cProfile stats of the main thread (python -m pstats, snakeviz)
+    PREFIX.collapsed   sampled stacks of all threads (flamegraph.pl, speedscope)
+
+plus a summary on stderr that splits CPU time from time spent waiting on
+the network, select/poll, sleeps, other threads and terminal input
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+PROFILE_FLAG = '--profile'
+
+# Stack sampling period for the collapsed-stack file (seconds)
+SAMPLE_INTERVAL = 0.005
+
+# Blocking builtins, matched against cProfile's function names; their own
+# time is wall time spent waiting rather than computing
+WAIT_CATEGORIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ('network', ("'_socket.socket'", "_socket.getaddrinfo", "'_ssl._SSLSocket'")),
+    ('select/poll', ("select.select", "'select.poll'", "'select.epoll'")),  # sockets or the token prompt
+    ('sleep', ("time.sleep",)),
+    ('other threads', ("'_thread.lock'", "'_thread.RLock'")),
+    ('input', ("builtins.input", "getpass", "'_io.TextIOWrapper' objects>.readline")),
+]
+
+
+def take_profile_flag(argv: List[str]) -> Tuple[List[str], Optional[str]]:
+    """Strip --profile[=PREFIX] from argv; returns (rest, prefix) with prefix '' for the default"""
+    rest, prefix = [], None
+    for arg in argv:
+        if arg == PROFILE_FLAG:
+            prefix = ''
+        elif arg.startswith(PROFILE_FLAG + '='):
+            prefix = arg[len(PROFILE_FLAG) + 1:]
+        else:
+            rest.append(arg)
+    return rest, prefix
+
+
+def default_prefix(tool: str) -> str:
+    return f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+def wait_category(function_name: str) -> Optional[str]:
+    for category, markers in WAIT_CATEGORIES:
+        if any(marker in function_name for marker in markers):
+            return category
+    return None
+
+
+def _frame_label(code) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler(threading.Thread):
+    """Samples every thread's Python stack at a fixed period and counts collapsed stacks"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self.stopping = threading.Event()
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+
+    def write_collapsed(self, path: str):
+        with open(path, 'w', encoding='utf-8') as handle:
+            for stack, count in sorted(self.counts.items()):
+                handle.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Runs one tool entry point under cProfile and the stack sampler"""
+
+    def __init__(self, prefix: str):
+        import cProfile  # only paid for when --profile is given
+
+        self.prefix = prefix
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler()
+
+    def run(self, func: Callable[[], T]) -> T:
+        directory = os.path.dirname(self.prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        self.sampler.start()
+        self.profile.enable()
+        try:
+            return func()
+        finally:
+            self.profile.disable()
+            self.sampler.stop()
+            self.report(time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+    def report(self, wall: float, cpu: float):
+        import pstats
+
+        self.profile.dump_stats(f"{self.prefix}.pstats")
+        self.sampler.write_collapsed(f"{self.prefix}.collapsed")
+
+        stats = pstats.Stats(self.profile, stream=sys.stderr)
+        waits: Dict[str, float] = {category: 0.0 for category, _ in WAIT_CATEGORIES}
+        own_times = []
+        for function, (_, _, own_time, _, _) in stats.stats.items():
+            name = pstats.func_std_string(function)
+            category = wait_category(name)
+            if category:
+                waits[category] += own_time
+            else:
+                own_times.append((own_time, name))
+        waited = sum(waits.values())
+
+        out = sys.stderr
+        print(f"\n📈 Profile: wall {wall:.2f}s, process CPU {cpu:.2f}s (all threads)", file=out)
+        print(f"   ⏳ Main thread waiting {waited:.2f}s: "
+              + ", ".join(f"{category} {seconds:.2f}s" for category, seconds in waits.items()), file=out)
+        print(f"   🧮 Main thread computing {max(0.0, wall - waited):.2f}s", file=out)
+        print("   🔝 Top functions by own time (excluding waits):", file=out)
+        for own_time, name in sorted(own_times, reverse=True)[:10]:
+            print(f"      {own_time * 1000:>9.1f} ms  {name}", file=out)
+        print(f"   💾 {self.prefix}.pstats (python -m pstats / snakeviz), "
+              f"{self.prefix}.collapsed (flamegraph.pl / speedscope)", file=out)
+
+
+def profiled_main(tool: str, main: Callable[[], T]) -> T:
+    """
+    Run a tool's entry point, profiled when --profile is on the command line
+    The flag is removed from sys.argv before main() parses its arguments
+    """
+    sys.argv[1:], prefix = take_profile_flag(sys.argv[1:])
+    if prefix is None:
+        return main()
+    return Profiler(prefix or default_prefix(tool)).run(main)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Client-Side Rate Limiter for the GoBarberly Tools
+Token buckets (one global, one per endpoint) that pace bulk runs so they
+stay under backend throttling and Render's email sender limits
+A 429 halves the endpoint's rate and pauses it for Retry-After; successful
+calls raise the rate again (AIMD), up to the configured rate times
+max_rate_factor, so a run can probe above its starting rate
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from retry_policy import parse_retry_after
+
+# Requests per second; forgot-password sends an email per call
+DEFAULT_ENDPOINT_RATES: Dict[str, float] = {
+    '/api/auth/forgot-password/': 2.0,
+    '/api/auth/reset-password/': 10.0,
+    '/api/auth/login/': 10.0,
+}
+
+# Never back off below this many requests per second
+DEFAULT_MIN_RATE = 0.2
+
+# Multiplicative decrease on 429, additive increase (req/s per second of successful traffic)
+DEFAULT_DECREASE = 0.5
+DEFAULT_INCREASE = 0.5
+
+# Pause used when a 429 carries no usable Retry-After
+DEFAULT_THROTTLE_PAUSE = 1.0
+
+# How far above the configured rate additive increase may probe (1: never above it)
+DEFAULT_MAX_RATE_FACTOR = 1.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; callers reserve a token and sleep off any deficit
+    Reservations queue up in call order, so waiting threads are served fairly
+    The balance is kept as of `updated`, which a 429 pause moves into the
+    future: the deficit of queued senders is paid after the pause, not during it
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, min_rate: float = DEFAULT_MIN_RATE,
+                 max_rate: Optional[float] = None):
+        self.rate = float(rate)
+        self.ceiling = max(self.rate, float(max_rate or rate))
+        self.min_rate = min(min_rate, self.rate)
+        self.burst = float(burst) if burst else 1.0  # evenly spaced sends by default
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self.updated:  # nothing accrues before the end of a pause
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self) -> float:
+        """Take one token; returns how long the caller must wait before sending"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(0.0, self.updated - now) + wait
+
+    def throttle(self, retry_after: Optional[float], decrease: float = DEFAULT_DECREASE):
+        """The backend said 429: slow down and hold every sender until Retry-After"""
+        with self.lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return  # the other 429s of this burst were sent before we slowed down
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * decrease)
+            pause = retry_after if retry_after is not None else DEFAULT_THROTTLE_PAUSE
+            self.paused_until = now + pause
+            # Balance as of the end of the pause: queued senders pay their deficit after it, evenly spaced
+            self.updated = self.paused_until
+            self.tokens = min(self.tokens, 1.0)
+
+    def recover(self, increase: float = DEFAULT_INCREASE):
+        """A call went through: probe upwards, at most to the ceiling"""
+        with self.lock:
+            if self.rate < self.ceiling:
+                self.rate = min(self.ceiling, self.rate + increase / self.rate)
+
+
+class RateLimiter:
+    """
+    Paces requests through a global bucket and per-endpoint buckets
+    Endpoints without a configured rate only go through the global bucket
+    Each bucket starts at its configured rate and may climb to
+    max_rate_factor times that rate while the backend keeps accepting
+    """
+
+    def __init__(self, global_rate: Optional[float] = None,
+                 endpoint_rates: Optional[Dict[str, float]] = None,
+                 burst: Optional[float] = None,
+                 min_rate: float = DEFAULT_MIN_RATE,
+                 decrease: float = DEFAULT_DECREASE,
+                 increase: float = DEFAULT_INCREASE,
+                 max_rate_factor: float = DEFAULT_MAX_RATE_FACTOR):
+        factor = max(1.0, max_rate_factor)
+        self.global_bucket = TokenBucket(global_rate, burst, min_rate, global_rate * factor) if global_rate else None
+        self.buckets: Dict[str, TokenBucket] = {
+            path: TokenBucket(rate, burst, min_rate, rate * factor)
+            for path, rate in (endpoint_rates or {}).items() if rate
+        }
+        self.decrease = decrease
+        self.increase = increase
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "throttled": 0, "waited_seconds": 0.0}
+
+    def _buckets_for(self, url: str) -> Iterable[TokenBucket]:
+        bucket = self.buckets.get(urlsplit(url).path)
+        return [b for b in (self.global_bucket, bucket) if b is not None]
+
+    def acquire(self, url: str) -> float:
+        """Block until the request may be sent; returns the seconds waited"""
+        wait = max((bucket.reserve() for bucket in self._buckets_for(url)), default=0.0)
+        if wait > 0:
+            time.sleep(wait)
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["waited_seconds"] += wait
+        return wait
+
+    def observe(self, url: str, response: requests.Response):
+        """Adapt the rates to the backend's answer"""
+        buckets = self._buckets_for(url)
+        if response.status_code == 429:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            for bucket in buckets:
+                bucket.throttle(retry_after, self.decrease)
+            with self.lock:
+                self.stats["throttled"] += 1
+        elif response.status_code < 500:
+            for bucket in buckets:
+                bucket.recover(self.increase)
+
+    def rates(self) -> Dict[str, float]:
+        """Current (adapted) rate of every bucket in requests per second"""
+        rates = {path: round(bucket.rate, 2) for path, bucket in self.buckets.items()}
+        if self.global_bucket:
+            rates['*'] = round(self.global_bucket.rate, 2)
+        return rates
+
+    def summary(self) -> Dict[str, object]:
+        with self.lock:
+            stats = dict(self.stats)
+        stats["waited_seconds"] = round(stats["waited_seconds"], 3)
+        stats["rates"] = self.rates()
+        return stats
+
+
+def parse_endpoint_rate(spec: str) -> Dict[str, float]:
+    """'/api/auth/login/=5' -> {'/api/auth/login/': 5.0}"""
+    path, sep, rate = spec.rpartition('=')
+    if not sep or not path:
+        raise ValueError(f"expected PATH=RATE, got {spec!r}")
+    return {path: float(rate)}
+
+
+def add_rate_limit_arguments(parser, default_note: str = "none"):
+    """--rate / --endpoint-rate / --no-rate-limit for a tool's argparse parser"""
+    parser.add_argument("--rate", type=float, help="global request ceiling per second")
+    parser.add_argument("--endpoint-rate", action="append", default=[], metavar="PATH=RATE",
+                        type=parse_endpoint_rate,
+                        help=f"per-endpoint ceiling in requests/s, repeatable (default: {default_note})")
+    parser.add_argument("--max-rate-factor", type=float, default=DEFAULT_MAX_RATE_FACTOR,
+                        help="let successful calls raise a rate up to this multiple of its setting (default: 1)")
+    parser.add_argument("--no-rate-limit", action="store_true", help="send as fast as the workers allow")
+
+
+def rate_limiter_from_args(args, default_endpoint_rates: Optional[Dict[str, float]] = None) -> Optional[RateLimiter]:
+    """Build the limiter the command line asked for (None when unlimited)"""
+    if args.no_rate_limit:
+        return None
+    endpoint_rates = dict(default_endpoint_rates or {})
+    for rates in args.endpoint_rate:
+        endpoint_rates.update(rates)
+    if not args.rate and not endpoint_rates:
+        return None
+    return RateLimiter(args.rate, endpoint_rates, max_rate_factor=args.max_rate_factor)
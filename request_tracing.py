@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Per-Phase Request Tracing for the GoBarberly Tools
+Opt-in: set GOBARBERLY_TRACE=spans.jsonl and every session records how long
+each request spent in DNS, connect, TLS, sending, waiting for the first byte
+and downloading the body, one span per line in the JSONL file
+
+    python request_tracing.py summary spans.jsonl
+    python request_tracing.py chrome spans.jsonl -o trace.json   # chrome://tracing or ui.perfetto.dev
+"""
+
+import argparse
+import json
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NameResolutionError
+
+from gobarberly_client import TimeoutHTTPAdapter
+
+# Phase name -> (start mark, end mark)
+PHASES = {
+    'dns': ('dns_start', 'dns_end'),
+    'connect': ('dns_end', 'connect_end'),
+    'tls': ('connect_end', 'tls_end'),
+    'send': ('send_start', 'sent'),
+    'ttfb': ('sent', 'headers'),
+    'body': ('headers', 'end'),
+}
+
+_local = threading.local()
+
+
+class Span:
+    """Timestamps (perf_counter) of one HTTP attempt, filled in by the traced connections"""
+
+    def __init__(self, method: str, url: str):
+        self.span_id = secrets.token_hex(8)
+        self.method = method.upper()
+        self.url = url
+        self.wall_start = time.time()
+        self.marks: Dict[str, float] = {'start': time.perf_counter()}
+        self.attributes: Dict[str, Any] = {}
+
+    def mark(self, name: str):
+        self.marks[name] = time.perf_counter()
+
+    def phases_ms(self) -> Dict[str, float]:
+        """Duration of every phase this attempt went through (reused connections skip dns/connect/tls)"""
+        phases = {}
+        for name, (start, end) in PHASES.items():
+            if start in self.marks and end in self.marks:
+                phases[name] = round((self.marks[end] - self.marks[start]) * 1000, 3)
+        return phases
+
+
+def current_span() -> Optional[Span]:
+    return getattr(_local, 'span', None)
+
+
+class _TracedConnectionMixin:
+    """Times name resolution and the TCP connect separately, then the request/response exchange"""
+
+    def _new_conn(self):
+        span = current_span()
+        if span is None:
+            return super()._new_conn()
+        span.mark('dns_start')
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        span.mark('dns_end')
+        # Connect to the address just resolved so the connect phase holds no second lookup
+        host, self._dns_host = self._dns_host, addresses[0][4][0]
+        try:
+            sock = super()._new_conn()
+        finally:
+            self._dns_host = host
+        span.mark('connect_end')
+        span.attributes["peer"] = addresses[0][4][0]
+        return sock
+
+    def request(self, *args, **kwargs):
+        span = current_span()
+        if span is not None:
+            span.mark('send_start')
+        result = super().request(*args, **kwargs)
+        if span is not None:
+            span.mark('sent')
+            span.attributes["connection_reused"] = 'connect_end' not in span.marks
+            # Plain HTTP connects lazily inside request(); sending starts once connected
+            connected = span.marks.get('tls_end', span.marks.get('connect_end', 0.0))
+            span.marks['send_start'] = max(span.marks['send_start'], connected)
+        return result
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        span = current_span()
+        if span is not None:
+            span.mark('headers')
+        return response
+
+
+class TracedHTTPConnection(_TracedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TracedHTTPSConnection(_TracedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        super().connect()
+        span = current_span()
+        if span is not None:
+            span.mark('tls_end')
+
+
+class TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TracedHTTPConnection
+
+
+class TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TracedHTTPSConnection
+
+
+class TracingHTTPAdapter(TimeoutHTTPAdapter):
+    """TimeoutHTTPAdapter whose pools open traced connections"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TracedHTTPConnectionPool,
+            'https': TracedHTTPSConnectionPool,
+        }
+
+
+class Tracer:
+    """Wraps HTTP attempts in spans and appends them to a JSONL file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.trace_id = secrets.token_hex(16)  # one trace per tool run
+        self.lock = threading.Lock()
+        self.handle = open(path, 'a', encoding='utf-8')
+
+    def call(self, method: str, url: str, send: Callable[[], requests.Response]) -> requests.Response:
+        """Run send() (request plus body download) inside a span"""
+        span = Span(method, url)
+        _local.span = span
+        try:
+            response = send()
+        except requests.exceptions.RequestException as e:
+            span.mark('end')
+            span.attributes["error"] = type(e).__name__
+            self.export(span)
+            raise
+        finally:
+            _local.span = None
+        span.mark('end')
+        span.attributes["status"] = response.status_code
+        response.trace_phases = span.phases_ms()
+        self.export(span)
+        return response
+
+    def export(self, span: Span):
+        """One line for the request span plus one per phase, parented to it"""
+        base = span.marks['start']
+        path = urlsplit(span.url).path
+        attributes = dict(span.attributes, method=span.method, url=span.url,
+                          pid=os.getpid(), thread=threading.current_thread().name)
+        records = [{
+            "trace_id": self.trace_id,
+            "span_id": span.span_id,
+            "parent_id": None,
+            "name": f"{span.method} {path}",
+            "start_us": int(span.wall_start * 1e6),
+            "duration_us": int((span.marks['end'] - base) * 1e6),
+            "attributes": attributes,
+        }]
+        for name, (start, end) in PHASES.items():
+            if start in span.marks and end in span.marks:
+                records.append({
+                    "trace_id": self.trace_id,
+                    "span_id": secrets.token_hex(8),
+                    "parent_id": span.span_id,
+                    "name": name,
+                    "start_us": int((span.wall_start + span.marks[start] - base) * 1e6),
+                    "duration_us": int((span.marks[end] - span.marks[start]) * 1e6),
+                    "attributes": {"pid": attributes["pid"], "thread": attributes["thread"]},
+                })
+        lines = ''.join(json.dumps(record) + '\n' for record in records)
+        with self.lock:
+            self.handle.write(lines)
+            self.handle.flush()
+
+    def close(self):
+        with self.lock:
+            self.handle.close()
+
+
+_tracers: Dict[str, Tracer] = {}
+_tracers_lock = threading.Lock()
+
+
+def tracer_for(path: str) -> Tracer:
+    """Process-wide tracer for a file, so every session of a run appends to the same trace"""
+    path = os.path.abspath(path)
+    with _tracers_lock:
+        if path not in _tracers:
+            _tracers[path] = Tracer(path)
+        return _tracers[path]
+
+
+def read_spans(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def to_chrome_trace(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Chrome trace-event JSON ("X" complete events), loadable in chrome://tracing and Perfetto"""
+    events = []
+    for span in spans:
+        attributes = span.get("attributes") or {}
+        events.append({
+            "name": span["name"],
+            "cat": "http" if span.get("parent_id") is None else "phase",
+            "ph": "X",
+            "ts": span["start_us"],
+            "dur": span["duration_us"],
+            "pid": attributes.get("pid", 0),
+            "tid": attributes.get("thread", "main"),
+            "args": attributes,
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def summarize(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Mean milliseconds per phase for every endpoint (attempts that raised are left out)"""
+    names = {span["span_id"]: span["name"] for span in spans
+             if span.get("parent_id") is None and "error" not in (span.get("attributes") or {})}
+    totals: Dict[str, Dict[str, List[float]]] = {}
+    for span in spans:
+        endpoint = names.get(span.get("parent_id") or span["span_id"])
+        if endpoint is None:
+            continue
+        phase = 'total' if span.get("parent_id") is None else span["name"]
+        totals.setdefault(endpoint, {}).setdefault(phase, []).append(span["duration_us"] / 1000)
+    return {
+        endpoint: {phase: round(sum(values) / len(values), 1) for phase, values in phases.items()}
+        for endpoint, phases in totals.items()
+    }
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Inspect request traces written with GOBARBERLY_TRACE")
+    parser.add_argument("command", choices=("summary", "chrome"))
+    parser.add_argument("spans", help="JSONL span file")
+    parser.add_argument("-o", "--output", help="chrome: write the trace here instead of stdout")
+    args = parser.parse_args(argv)
+
+    spans = list(read_spans(args.spans))
+    if args.command == 'chrome':
+        trace = json.dumps(to_chrome_trace(spans))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as handle:
+                handle.write(trace)
+        else:
+            print(trace)
+        return True
+
+    columns = ['total'] + list(PHASES)
+    print(f"{'endpoint':<44}" + ''.join(f"{name:>9}" for name in columns) + "   (mean ms)")
+    for endpoint, phases in sorted(summarize(spans).items()):
+        cells = ''.join(f"{phases[name]:>9.1f}" if name in phases else f"{'-':>9}" for name in columns)
+        print(f"{endpoint:<44}{cells}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
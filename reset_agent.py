@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+GoBarberly Reset Agent
+A small background process that keeps pooled TLS connections, cached admin
+tokens and the backend's warm state alive between tool runs
+Tools reach it over a Unix domain socket: create_session() mounts an
+AgentAdapter when the agent is running, so back-to-back runs reuse its warm
+connections instead of redoing DNS, TLS and login each time
+
+    python reset_agent.py start | status | stop
+"""
+
+import argparse
+import base64
+import http.client
+import http.cookiejar
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.cookies import extract_cookies_to_jar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from gobarberly_client import (
+    DEFAULT_TIMEOUT, Timeout, TimeoutHTTPAdapter, _normalize_timeout, agent_socket_path,
+    create_session, state_path
+)
+from profiling import profiled_main
+from token_cache import TokenCache
+
+AGENT_LOG_FILE = 'agent.log'
+
+# Agent exits after this long without a client request (seconds)
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+# Render sleeps a dyno after ~15 idle minutes; probe recently used backends more often than that
+KEEP_WARM_INTERVAL = 5 * 60
+
+# Client-side slack on top of the proxied request's own timeout
+SOCKET_TIMEOUT_MARGIN = 5
+
+_HEADER = struct.Struct('>I')
+
+
+def send_frame(sock: socket.socket, message: Dict[str, Any]):
+    payload = json.dumps(message).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    payload = _recv_exact(sock, _HEADER.unpack(header)[0])
+    return json.loads(payload) if payload is not None else None
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def connect_agent(timeout: float = 5.0, path: Optional[str] = None) -> socket.socket:
+    """Socket connected to the agent; raises OSError (nothing sent yet) if it is not running"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        sock.connect(path or agent_socket_path())
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def exchange(sock: socket.socket, message: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one frame and read the reply"""
+    send_frame(sock, message)
+    reply = recv_frame(sock)
+    if reply is None:
+        raise ConnectionError("agent closed the connection")
+    return reply
+
+
+def call_agent(message: Dict[str, Any], timeout: float = 5.0,
+               path: Optional[str] = None) -> Dict[str, Any]:
+    """One request/response round-trip with the agent; raises OSError if it is not running"""
+    with connect_agent(timeout, path) as sock:
+        return exchange(sock, message)
+
+
+# ---- Agent process -----------------------------------------------------
+
+
+class ResetAgent:
+    """State shared by all client connections"""
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.sessions: Dict[str, requests.Session] = {}
+        self.warm_state: Dict[str, Dict[str, Any]] = {}
+        self.tokens = TokenCache()
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.stats = {"requests": 0, "proxied": 0, "errors": 0}
+        self.stopping = threading.Event()
+
+    def session_for(self, url: str) -> requests.Session:
+        """One pooled session per backend origin, never routed back through the agent"""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self.lock:
+            session = self.sessions.get(origin)
+            if session is None:
+                session = create_session(user_agent='GoBarberly-Agent/1.0', pool_maxsize=32, use_agent=False)
+                session.headers.pop('Content-Type', None)  # clients send their own headers
+                # Shared by every client and account: cookies travel in each request's own
+                # headers and go back to the caller, never into this jar
+                session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+                self.sessions[origin] = session
+            return session
+
+    def proxy(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform an HTTP request for a client over the warm pool"""
+        url = message["url"]
+        body = base64.b64decode(message["body"]) if message.get("body") else None
+        timeout = tuple(message["timeout"]) if message.get("timeout") else DEFAULT_TIMEOUT
+        start = time.perf_counter()
+        try:
+            response = self.session_for(url).request(
+                message["method"], url, headers=message.get("headers") or {}, data=body,
+                timeout=timeout, allow_redirects=False
+            )
+            content = response.content
+        except requests.exceptions.RequestException as e:
+            self.stats["errors"] += 1
+            return {"error": type(e).__name__, "message": str(e)}
+        self.stats["proxied"] += 1
+        self.mark_used(url)
+        return {
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "cookies": response.raw.headers.getlist('Set-Cookie'),
+            "body": base64.b64encode(content).decode('ascii'),
+            "elapsed": time.perf_counter() - start
+        }
+
+    def mark_used(self, url: str):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self.lock:
+            self.warm_state.setdefault(origin, {})["last_used"] = time.time()
+
+    def keep_warm(self):
+        """Probe recently used backends so neither the dyno nor the pooled connections go cold"""
+        from backend_warmup import BackendWarmer
+
+        while not self.stopping.wait(KEEP_WARM_INTERVAL):
+            with self.lock:
+                origins = [origin for origin, state in self.warm_state.items()
+                           if time.time() - state.get("last_used", 0) < self.idle_timeout]
+            for origin in origins:
+                # The agent's pooled session is plain already: probing on it keeps its connection warm
+                result = BackendWarmer(base_url=origin, probe_session=self.session_for(origin)).probe()
+                with self.lock:
+                    self.warm_state[origin].update({
+                        "last_probe": time.time(),
+                        "last_probe_ms": round(result["latency"] * 1000),
+                        "up": result["up"]
+                    })
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.last_request = time.monotonic()
+        self.stats["requests"] += 1
+        op = message.get("op")
+        if op == 'http':
+            return self.proxy(message)
+        if op == 'token_get':
+            return {"entry": self.tokens._read(message["key"])}
+        if op == 'token_put':
+            self.tokens._write(message["key"], message["entry"])
+            return {"ok": True}
+        if op == 'token_delete':
+            self.tokens._delete(message["key"])
+            return {"ok": True}
+        if op == 'status':
+            with self.lock:
+                return {
+                    "pid": os.getpid(),
+                    "uptime_s": round(time.time() - self.started),
+                    "backends": dict(self.warm_state),
+                    "cached_tokens": len(self.tokens.entries),
+                    "stats": dict(self.stats)
+                }
+        if op == 'shutdown':
+            self.stopping.set()
+            return {"ok": True}
+        return {"error": "ValueError", "message": f"unknown op {op!r}"}
+
+
+class _AgentServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def run_agent(path: Optional[str] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+    """Serve until shut down or idle for idle_timeout seconds"""
+    path = path or agent_socket_path()
+    agent = ResetAgent(idle_timeout)
+
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            # A client may send several frames over one connection
+            while True:
+                message = recv_frame(self.request)
+                if message is None:
+                    return
+                send_frame(self.request, agent.handle(message))
+
+    if os.path.exists(path):
+        try:
+            call_agent({"op": "status"}, timeout=1, path=path)
+            print(f"⚠️  An agent is already running on {path}", file=sys.stderr)
+            return
+        except OSError:
+            os.unlink(path)  # stale socket from a crashed agent
+
+    old_umask = os.umask(0o177)  # socket is created 0600
+    try:
+        server = _AgentServer(path, Handler)
+    finally:
+        os.umask(old_umask)
+    threading.Thread(target=server.serve_forever, name="agent-server", daemon=True).start()
+    threading.Thread(target=agent.keep_warm, name="agent-keep-warm", daemon=True).start()
+    print(f"🤖 Reset agent {os.getpid()} listening on {path}", file=sys.stderr, flush=True)
+
+    try:
+        while not agent.stopping.wait(1):
+            if time.monotonic() - agent.last_request > idle_timeout:
+                print("💤 Idle timeout reached, exiting", file=sys.stderr)
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+# ---- Client side -------------------------------------------------------
+
+
+class _AgentBody(io.BytesIO):
+    """Buffered body of a proxied response, with its Set-Cookie headers for the caller's cookie jar"""
+
+    def __init__(self, content: bytes, set_cookies: List[str]):
+        super().__init__(content)
+        headers = http.client.HTTPMessage()
+        for value in set_cookies:
+            headers['Set-Cookie'] = value
+        self._original_response = SimpleNamespace(msg=headers)
+
+
+class AgentAdapter(BaseAdapter):
+    """
+    Transport adapter that hands requests to the agent
+    Falls back to a direct connection only when the agent cannot be reached:
+    once a request was handed over it may have been sent, so a lost reply is
+    an error rather than a second (non-idempotent) attempt. Streamed
+    responses always go direct, the agent buffers whole bodies
+    """
+
+    def __init__(self, path: str, timeout: Timeout = DEFAULT_TIMEOUT, **fallback_kwargs):
+        super().__init__()
+        self.path = path
+        self.timeout = timeout
+        self.fallback = TimeoutHTTPAdapter(timeout=timeout, **fallback_kwargs)
+        self.available = True
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if not self.available or proxies or stream:
+            return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify,
+                                      cert=cert, proxies=proxies)
+        timeout = _normalize_timeout(timeout if timeout is not None else self.timeout)
+        body = request.body.encode('utf-8') if isinstance(request.body, str) else request.body
+        message = {
+            "op": "http",
+            "method": request.method,
+            "url": request.url,
+            "headers": dict(request.headers),
+            "body": base64.b64encode(body).decode('ascii') if body else None,
+            "timeout": list(timeout)
+        }
+        try:
+            sock = connect_agent(sum(timeout) + SOCKET_TIMEOUT_MARGIN, self.path)
+        except OSError:
+            self.available = False
+            return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify,
+                                      cert=cert, proxies=proxies)
+        try:
+            with sock:
+                reply = exchange(sock, message)
+        except (OSError, ValueError) as e:
+            raise requests.exceptions.ConnectionError(f"Agent did not answer: {e}", request=request)
+
+        if "error" in reply:
+            error = getattr(requests.exceptions, reply["error"], requests.exceptions.ConnectionError)
+            if not (isinstance(error, type) and issubclass(error, requests.exceptions.RequestException)):
+                error = requests.exceptions.ConnectionError
+            raise error(reply.get("message", reply["error"]), request=request)
+        return self.build_response(request, reply)
+
+    def build_response(self, request, reply: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = reply["status"]
+        response.reason = reply.get("reason")
+        response.headers = CaseInsensitiveDict(reply.get("headers") or {})
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(reply["body"]) if reply.get("body") else b''
+        response._content_consumed = True
+        response.raw = _AgentBody(response._content, reply.get("cookies") or [])
+        extract_cookies_to_jar(response.cookies, request, response.raw)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(seconds=reply.get("elapsed", 0))
+        return response
+
+    def close(self):
+        self.fallback.close()
+
+
+class AgentTokenCache(TokenCache):
+    """TokenCache whose entries live in the agent process"""
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__(persistent=False)
+        self.agent_path = path or agent_socket_path()
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        return call_agent({"op": "token_get", "key": key}, path=self.agent_path).get("entry")
+
+    def _write(self, key: str, entry: Dict[str, Any]):
+        call_agent({"op": "token_put", "key": key, "entry": entry}, path=self.agent_path)
+
+    def _delete(self, key: str):
+        call_agent({"op": "token_delete", "key": key}, path=self.agent_path)
+
+
+def agent_running(path: Optional[str] = None) -> bool:
+    if not hasattr(socket, 'AF_UNIX'):
+        return False
+    path = path or agent_socket_path()
+    if not os.path.exists(path):
+        return False
+    try:
+        call_agent({"op": "status"}, timeout=1, path=path)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def agent_token_cache() -> Optional[AgentTokenCache]:
+    """Token cache backed by the running agent, or None"""
+    return AgentTokenCache() if agent_running() else None
+
+
+def start_agent_process(idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> bool:
+    """Launch the agent detached from this terminal and wait for its socket"""
+    if agent_running():
+        return True
+    log = open(state_path(AGENT_LOG_FILE), 'a')
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), 'run', '--idle-timeout', str(idle_timeout)],
+        stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    log.close()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if agent_running():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main(argv: Optional[list] = None) -> bool:
+    parser = argparse.ArgumentParser(description="Background agent that keeps GoBarberly connections warm")
+    parser.add_argument("command", choices=["start", "run", "status", "stop"])
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help="exit after this many idle seconds (default: 1800)")
+    args = parser.parse_args(argv)
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("❌ Unix domain sockets are not available on this platform", file=sys.stderr)
+        return False
+
+    if args.command == 'run':
+        run_agent(idle_timeout=args.idle_timeout)
+        return True
+    if args.command == 'start':
+        if start_agent_process(args.idle_timeout):
+            print(f"✅ Agent running on {agent_socket_path()}")
+            return True
+        print(f"❌ Agent did not start - see {state_path(AGENT_LOG_FILE)}")
+        return False
+
+    try:
+        reply = call_agent({"op": args.command if args.command == 'status' else 'shutdown'})
+    except OSError:
+        print("💤 Agent is not running")
+        return args.command == 'stop'
+    if args.command == 'status':
+        print(json.dumps(reply, indent=2))
+    else:
+        print("🛑 Agent stopped")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if profiled_main('reset_agent', main) else 1)
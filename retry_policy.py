@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Retry Policy and Circuit Breakers for the GoBarberly Tools
+Retries transient failures (Render 502/503/504, connect timeouts) with
+exponential backoff and full jitter, and stops calling an endpoint that
+keeps failing until a cool-down has passed
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+# Responses worth another attempt: the Render proxy answers these while a dyno restarts
+RETRY_STATUSES: FrozenSet[int] = frozenset({502, 503, 504})
+
+# Throttled: the backend refused the request without running it, so any method may repeat it
+THROTTLE_STATUS = 429
+
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# POSTs without side effects that are safe to repeat
+SAFE_POST_PATHS: FrozenSet[str] = frozenset({'/api/auth/login/'})
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 8.0
+
+# Breaker opens after this many consecutive failures and stays open for the cool-down
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an endpoint whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open (one trial call) after a cool-down"""
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self) -> bool:
+        """May a call go through now? Half-open lets exactly one trial through"""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_running:
+                return False
+            self.trial_running = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a trial call through"""
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class RetryPolicy:
+    """
+    Wraps one HTTP call with retries and a per-endpoint circuit breaker
+    Non-idempotent POSTs (forgot/reset password) are only retried when the
+    request provably never ran (connect timeout, 429)
+    """
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX,
+                 retry_statuses: Iterable[int] = RETRY_STATUSES,
+                 failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+                 safe_post_paths: Iterable[str] = SAFE_POST_PATHS,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.safe_post_paths = frozenset(safe_post_paths)
+        self.sleep = sleep
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.lock = threading.Lock()
+        self.stats = {"attempts": 0, "retries": 0, "short_circuited": 0}
+
+    def breaker_for(self, path: str) -> CircuitBreaker:
+        with self.lock:
+            breaker = self.breakers.get(path)
+            if breaker is None:
+                breaker = self.breakers[path] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full jitter: uniform in [0, min(max, base * 2^attempt)], at least Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def is_retryable(self, method: str, path: str, error: Optional[Exception] = None,
+                     status: Optional[int] = None) -> bool:
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True  # never reached the server, safe for any method
+        if method.upper() not in IDEMPOTENT_METHODS and path not in self.safe_post_paths:
+            return False
+        if error is not None:
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        return status in self.retry_statuses
+
+    def call(self, method: str, url: str, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Run send() under the policy; returns the last response or raises the last error
+        The breaker sees one outcome per call, after its retries are used up
+        """
+        path = urlsplit(url).path
+        breaker = self.breaker_for(path)
+        if not breaker.allow():
+            with self.lock:
+                self.stats["short_circuited"] += 1
+            raise CircuitOpenError(
+                f"Circuit open for {path} after repeated failures; retry in {breaker.retry_in():.0f}s"
+            )
+
+        attempt = 0
+        while True:
+            with self.lock:
+                self.stats["attempts"] += 1
+                if attempt:
+                    self.stats["retries"] += 1
+            last_attempt = attempt + 1 >= self.max_attempts
+
+            try:
+                response = send()
+            except requests.exceptions.RequestException as e:
+                if last_attempt or not self.is_retryable(method, path, error=e):
+                    breaker.record_failure()
+                    raise
+                self.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code == THROTTLE_STATUS and not last_attempt:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                response.close()
+                self.sleep(self.backoff(attempt, retry_after))
+                attempt += 1
+                continue
+            if response.status_code < 500:
+                breaker.record_success()  # a throttled endpoint is alive, not failing
+                return response
+            if last_attempt or not self.is_retryable(method, path, status=response.status_code):
+                breaker.record_failure()
+                return response
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            response.close()
+            self.sleep(self.backoff(attempt, retry_after))
+            attempt += 1
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After in seconds (delta-seconds or HTTP date), None if absent or invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -5,12 +5,22 @@ Just takes email + password and sets it directly
 NO EMAIL, NO TOKENS, NO VERIFICATION - INSTANT UPDATE
 """
 
-import requests
 import getpass
 import sys
+import time
+
+import requests
+
+from console import emit, enable_json_output, take_json_flag
+from gobarberly_client import DEFAULT_BASE_URL, get_session
+from profiling import profiled_main
+from token_log_follower import obtain_reset_token, token_follower_from_env
 
 # Backend URL
-BACKEND_URL = "https://gobarberly-backend.onrender.com"
+BACKEND_URL = DEFAULT_BASE_URL
+
+# Shared pooled session (keep-alive + per-endpoint timeouts)
+session = get_session()
 
 def set_password(email, password):
     """Set password for user directly"""
@@ -27,13 +37,13 @@ def set_password(email, password):
             "bypass_verification": True
         }
         
-        response = requests.post(f"{BACKEND_URL}/api/auth/direct-set-password/", 
-                               json=payload, timeout=30)
+        response = session.post(f"{BACKEND_URL}/api/auth/direct-set-password/", 
+                              json=payload)
         
         if response.status_code in [200, 201]:
             print("✅ Password set successfully (Method 1)")
             return True
-    except Exception:
+    except (requests.exceptions.RequestException, ValueError):
         pass
     
     # Method 2: Admin force update
@@ -47,13 +57,12 @@ def set_password(email, password):
             "role": "super_admin"
         }
         
-        requests.post(f"{BACKEND_URL}/api/auth/register/", json=admin_data, timeout=30)
+        session.post(f"{BACKEND_URL}/api/auth/register/", json=admin_data)
         
         # Login as admin
-        login_response = requests.post(f"{BACKEND_URL}/api/auth/login/", 
-                                     json={"email": "admin@temp.local", 
-                                           "password": "TempAdmin123!"}, 
-                                     timeout=30)
+        login_response = session.post(f"{BACKEND_URL}/api/auth/login/", 
+                                    json={"email": "admin@temp.local", 
+                                          "password": "TempAdmin123!"})
         
         if login_response.status_code == 200:
             data = login_response.json()
@@ -67,13 +76,13 @@ def set_password(email, password):
                     "new_password": password
                 }
                 
-                response = requests.post(f"{BACKEND_URL}/api/admin/force-password-update/",
-                                       json=update_payload, headers=headers, timeout=30)
+                response = session.post(f"{BACKEND_URL}/api/admin/force-password-update/",
+                                      json=update_payload, headers=headers)
                 
                 if response.status_code in [200, 201]:
                     print("✅ Password set successfully (Method 2)")
                     return True
-    except:
+    except (requests.exceptions.RequestException, ValueError):
         pass
     
     # Method 3: Use reset system but with token extraction
@@ -81,8 +90,9 @@ def set_password(email, password):
         print("🔄 Using reset system...")
         
         # Request reset
-        reset_response = requests.post(f"{BACKEND_URL}/api/auth/forgot-password/",
-                                     json={"email": email}, timeout=90)
+        follower = token_follower_from_env()
+        reset_response = session.post(f"{BACKEND_URL}/api/auth/forgot-password/",
+                                    json={"email": email})
         
         if reset_response.status_code in [200, 201]:
             print("✅ Reset token generated")
@@ -90,7 +100,7 @@ def set_password(email, password):
             print("🔍 Look for 'Password reset token generated' in Render logs")
             
             # Get token from user
-            token = input("\n🔑 Paste the reset token here: ").strip()
+            token = obtain_reset_token(follower, email, "\n🔑 Paste the reset token here: ")
             
             if token:
                 # Use token to set password
@@ -100,13 +110,13 @@ def set_password(email, password):
                     "new_password_confirm": password
                 }
                 
-                final_response = requests.post(f"{BACKEND_URL}/api/auth/reset-password/",
-                                             json=reset_payload, timeout=30)
+                final_response = session.post(f"{BACKEND_URL}/api/auth/reset-password/",
+                                            json=reset_payload)
                 
                 if final_response.status_code in [200, 201]:
                     print("✅ Password set successfully (Method 3)")
                     return True
-    except Exception:
+    except (requests.exceptions.RequestException, ValueError):
         pass
     
     print("❌ Could not set password")
@@ -145,11 +155,20 @@ def main():
         print("❌ FAILED!")
         print("💡 Try running the script again or check backend logs")
 
-if __name__ == "__main__":
-    # Command line: python simple_password_setter.py email password
-    if len(sys.argv) >= 3:
-        email = sys.argv[1]
-        password = sys.argv[2]
-        set_password(email, password)
+def run_cli():
+    """Command line: python simple_password_setter.py email password [--json] [--profile]"""
+    argv, as_json = take_json_flag(sys.argv[1:])
+    if len(argv) >= 2:
+        email = argv[0]
+        password = argv[1]
+        if as_json:
+            enable_json_output('simple_password_setter')
+        start_time = time.time()
+        success = set_password(email, password)
+        emit({"event": "result", "operation": "set_password", "email": email, "success": success,
+              "duration_ms": round((time.time() - start_time) * 1000)})
     else:
-        main()
\ No newline at end of file
+        main()
+
+if __name__ == "__main__":
+    profiled_main('simple_password_setter', run_cli)
\ No newline at end of file
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Local SMTP Token Sink
+A small asyncio SMTP server the Django backend can send reset emails to
+Incoming messages are parsed, the reset token is indexed by recipient and
+handed to the reset tools in-process - no real mailbox, no log scraping
+
+Point the backend at it with:
+    EMAIL_HOST=127.0.0.1  EMAIL_PORT=1025  EMAIL_USE_TLS=False
+"""
+
+import argparse
+import asyncio
+import email
+import json
+import re
+import sys
+import threading
+import time
+from email import policy
+from typing import Dict, List, Optional
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 1025
+
+# Largest message accepted (bytes)
+MAX_MESSAGE_SIZE = 1024 * 1024
+
+# Tokens remembered per recipient (oldest dropped first)
+MAX_TOKENS_PER_RECIPIENT = 16
+
+# Token inside a reset link (?token=..., /reset-password/<token>) or a "token: ..." line
+TOKEN_PATTERNS = [
+    re.compile(r'[?&]token=([A-Za-z0-9_\-]{16,})'),
+    re.compile(r'reset-password/([A-Za-z0-9_\-]{16,})/?'),
+    re.compile(r'token\s*[:=]\s*([A-Za-z0-9_\-]{16,})', re.IGNORECASE),
+]
+ADDRESS_PATTERN = re.compile(r'<([^>]*)>')
+
+
+def extract_token(message: email.message.EmailMessage) -> Optional[str]:
+    """Find the reset token in the plain-text or HTML body"""
+    for part in message.walk():
+        if part.get_content_type() not in ('text/plain', 'text/html'):
+            continue
+        try:
+            body = part.get_content()
+        except (LookupError, ValueError):
+            continue
+        for pattern in TOKEN_PATTERNS:
+            match = pattern.search(body)
+            if match:
+                return match.group(1)
+    return None
+
+
+class SMTPTokenSink:
+    """
+    In-process SMTP sink that indexes reset tokens by recipient
+    Exposes the same poll_token()/wait_for_token() API as TokenLogFollower
+    A token is handed out once: a later reset for the same address in the
+    same process waits for its own email instead of reusing a spent token
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.source = f"smtp://{host}:{port}"
+        self.tokens: Dict[str, List[tuple]] = {}
+        self.condition = threading.Condition()
+        self.stats = {"connections": 0, "messages": 0, "tokens": 0, "bytes": 0}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.server = None
+        self.thread: Optional[threading.Thread] = None
+        self.on_token = None  # optional callback(recipient, token)
+
+    # ---- SMTP protocol -------------------------------------------------
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        recipients: List[str] = []
+
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode('ascii'))
+            await writer.drain()
+
+        await reply(f"220 {self.host} GoBarberly token sink ready")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode('utf-8', 'replace').strip()
+                verb = command[:4].upper()
+
+                if verb == 'EHLO':
+                    writer.write(f"250-{self.host}\r\n250-SIZE {MAX_MESSAGE_SIZE}\r\n250 8BITMIME\r\n".encode())
+                    await writer.drain()
+                elif verb == 'HELO':
+                    await reply(f"250 {self.host}")
+                elif verb == 'MAIL':
+                    recipients = []
+                    await reply("250 OK")
+                elif verb == 'RCPT':
+                    address = ADDRESS_PATTERN.search(command)
+                    recipients.append((address.group(1) if address else command[8:]).strip().lower())
+                    await reply("250 OK")
+                elif verb == 'DATA':
+                    if not recipients:
+                        await reply("503 Need RCPT first")
+                        continue
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = await self.read_data(reader)
+                    if data is None:
+                        await reply("552 Message too large")
+                    else:
+                        self.store(recipients, data)
+                        await reply("250 OK")
+                    recipients = []
+                elif verb == 'RSET':
+                    recipients = []
+                    await reply("250 OK")
+                elif verb == 'NOOP':
+                    await reply("250 OK")
+                elif verb == 'QUIT':
+                    await reply("221 Bye")
+                    break
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_data(self, reader: asyncio.StreamReader) -> Optional[bytes]:
+        """Read a DATA section, undoing dot-stuffing"""
+        lines, size = [], 0
+        while True:
+            line = await reader.readline()
+            if not line or line in (b'.\r\n', b'.\n'):
+                break
+            if line.startswith(b'..'):
+                line = line[1:]
+            size += len(line)
+            if size <= MAX_MESSAGE_SIZE:
+                lines.append(line)
+        return b''.join(lines) if size <= MAX_MESSAGE_SIZE else None
+
+    # ---- Token index ---------------------------------------------------
+
+    def store(self, recipients: List[str], data: bytes):
+        """Parse a delivered message and index its token"""
+        self.stats["messages"] += 1
+        self.stats["bytes"] += len(data)
+        token = extract_token(email.message_from_bytes(data, policy=policy.default))
+        if not token:
+            return
+
+        received_at = time.time()
+        with self.condition:
+            for recipient in recipients:
+                entries = self.tokens.setdefault(recipient, [])
+                entries.append((token, received_at))
+                del entries[:-MAX_TOKENS_PER_RECIPIENT]
+            self.stats["tokens"] += 1
+            self.condition.notify_all()
+
+        if self.on_token:
+            for recipient in recipients:
+                self.on_token(recipient, token)
+
+    def poll_token(self, email_address: str, since: float = 0) -> Optional[str]:
+        """Take the latest token delivered to this address (non-blocking)"""
+        with self.condition:
+            entries = self.tokens.get(email_address.lower(), [])
+            for index in range(len(entries) - 1, -1, -1):
+                token, received_at = entries[index]
+                if received_at >= since:
+                    del entries[:index + 1]  # this one is spent, older ones are superseded
+                    return token
+        return None
+
+    def wait_for_token(self, email_address: str, timeout: float = 120, since: float = 0) -> Optional[str]:
+        """Block until a token for this address arrives, or time out"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                token = self.poll_token(email_address, since)
+                remaining = deadline - time.monotonic()
+                if token or remaining <= 0:
+                    return token
+                self.condition.wait(remaining)
+
+    def clear(self, email_address: Optional[str] = None):
+        """Forget tokens for one address, or all of them"""
+        with self.condition:
+            if email_address is None:
+                self.tokens.clear()
+            else:
+                self.tokens.pop(email_address.lower(), None)
+
+    # ---- Lifecycle -----------------------------------------------------
+
+    def start(self) -> 'SMTPTokenSink':
+        """Run the server on a background event loop thread"""
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            try:
+                self.server = self.loop.run_until_complete(
+                    asyncio.start_server(self.handle_client, self.host, self.port)
+                )
+                self.port = self.server.sockets[0].getsockname()[1]
+                self.source = f"smtp://{self.host}:{self.port}"
+            except OSError as e:
+                errors.append(e)
+                ready.set()
+                return
+            ready.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, name="smtp-token-sink", daemon=True)
+        self.thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self):
+        """Stop the server and its loop"""
+        if not self.loop:
+            return
+
+        async def shutdown():
+            self.server.close()
+            await self.server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+_shared_sink: Optional[SMTPTokenSink] = None
+_shared_lock = threading.Lock()
+
+
+def shared_sink(address: str) -> SMTPTokenSink:
+    """One started sink per process for 'host:port' (tools may ask repeatedly)"""
+    global _shared_sink
+    with _shared_lock:
+        if _shared_sink is None:
+            host, _, port = address.rpartition(':')
+            _shared_sink = SMTPTokenSink(host or DEFAULT_HOST, int(port or DEFAULT_PORT)).start()
+        return _shared_sink
+
+
+def main():
+    """Run the sink standalone and print tokens as JSON lines"""
+    parser = argparse.ArgumentParser(description="Local SMTP sink that captures GoBarberly reset tokens")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    sink = SMTPTokenSink(args.host, args.port)
+    sink.on_token = lambda recipient, token: print(
+        json.dumps({"email": recipient, "token": token, "received_at": time.time()}), flush=True
+    )
+    sink.start()
+    print(f"📬 SMTP token sink listening on {sink.host}:{sink.port}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sink.stop()
+        print(f"📊 {json.dumps(sink.stats)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+GoBarberly Auth API Stub Server
+Lightweight local stand-in for the Django auth endpoints, for hermetic
+benchmarks and tool runs without network access
+Simulates Render behavior on demand: base latency + jitter, a slow
+synchronous email send, injected errors and dyno cold starts
+
+Endpoints:
+    POST /api/auth/login/            POST /api/auth/forgot-password/
+    POST /api/auth/reset-password/   POST /api/auth/token/refresh/
+    GET  /api/health/                GET  /api/auth/profile/
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import random
+import secrets
+import smtplib
+import sys
+import threading
+import time
+from email.message import EmailMessage
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+
+ACCESS_TOKEN_LIFETIME = 3600
+REFRESH_TOKEN_LIFETIME = 7 * 24 * 3600
+RESET_TOKEN_LIFETIME = 3600
+
+DEFAULT_USERS = {'admin@gobarberly.com': 'Admin123!'}
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default listen backlog of 5 drops connections under concurrent sweeps
+    request_queue_size = 128
+
+
+class StubAuthServer:
+    """
+    Threaded stub of the auth API with configurable latency and failures
+    All delays are in seconds
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 latency: float = 0.0, jitter: float = 0.0, email_latency: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 cold_start: float = 0.0, idle_timeout: Optional[float] = None,
+                 start_cold: bool = False, token_log: Optional[str] = None,
+                 smtp: Optional[str] = None, users: Optional[Dict[str, str]] = None,
+                 seed: Optional[int] = None, throttle_rate: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.email_latency = email_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.cold_start = cold_start
+        self.idle_timeout = idle_timeout
+        self.token_log = token_log
+        self.smtp = smtp
+        self.throttle_rate = throttle_rate
+        self.throttle_windows: Dict[str, Tuple[int, int]] = {}
+
+        self.users: Dict[str, str] = dict(DEFAULT_USERS if users is None else users)
+        self.reset_tokens: Dict[str, Tuple[str, float]] = {}
+        self.refresh_tokens: Dict[str, Tuple[str, float]] = {}
+        self.secret = secrets.token_bytes(32)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.log_lock = threading.Lock()
+
+        self.last_request = time.monotonic()
+        self.asleep = start_cold
+        self.waking_until = 0.0
+        self.stats = {"requests": 0, "errors_injected": 0, "cold_starts": 0, "throttled": 0}
+
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # ---- Simulation ----------------------------------------------------
+
+    def simulate_dyno(self):
+        """Sleep like a Render dyno that may be cold or idle-suspended"""
+        with self.lock:
+            now = time.monotonic()
+            self.stats["requests"] += 1
+            if self.idle_timeout is not None and now - self.last_request > self.idle_timeout:
+                self.asleep = True
+            if self.asleep and self.cold_start > 0:
+                # Every request that arrives while waking waits for the same boot
+                self.asleep = False
+                self.waking_until = now + self.cold_start
+                self.stats["cold_starts"] += 1
+            self.last_request = now
+            wake_delay = max(0.0, self.waking_until - now)
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+            inject_error = self.error_rate > 0 and self.random.random() < self.error_rate
+            if inject_error:
+                self.stats["errors_injected"] += 1
+
+        time.sleep(wake_delay + delay)
+        return inject_error
+
+    def throttle(self, path: str) -> Optional[int]:
+        """Per-endpoint fixed one-second window like DRF throttling; Retry-After seconds when over"""
+        if not self.throttle_rate:
+            return None
+        with self.lock:
+            now = time.time()
+            window = int(now)
+            start, count = self.throttle_windows.get(path, (window, 0))
+            if start != window:
+                start, count = window, 0
+            if count >= self.throttle_rate:
+                self.stats["throttled"] += 1
+                return 1
+            self.throttle_windows[path] = (start, count + 1)
+            return None
+
+    # ---- Tokens --------------------------------------------------------
+
+    def issue_access_token(self, email: str) -> str:
+        """HS256 JWT so clients can read the exp claim"""
+        header = _b64url(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+        payload = _b64url(json.dumps({
+            "email": email,
+            "token_type": "access",
+            "exp": int(time.time()) + ACCESS_TOKEN_LIFETIME,
+            "jti": secrets.token_hex(8)
+        }).encode())
+        signature = hmac.new(self.secret, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        return f"{header}.{payload}.{_b64url(signature)}"
+
+    def verify_access_token(self, token: str) -> Optional[str]:
+        """Return the email for a valid, unexpired access token"""
+        try:
+            header, payload, signature = token.split('.')
+            expected = hmac.new(self.secret, f"{header}.{payload}".encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(_b64url_decode(signature), expected):
+                return None
+            claims = json.loads(_b64url_decode(payload))
+        except ValueError:
+            return None
+        return claims.get("email") if claims.get("exp", 0) > time.time() else None
+
+    def issue_tokens(self, email: str) -> Dict[str, Any]:
+        refresh = secrets.token_urlsafe(32)
+        with self.lock:
+            self.refresh_tokens[refresh] = (email, time.time() + REFRESH_TOKEN_LIFETIME)
+        return {
+            "access": self.issue_access_token(email),
+            "refresh": refresh,
+            "expires_in": ACCESS_TOKEN_LIFETIME
+        }
+
+    def deliver_reset_token(self, email: str, token: str):
+        """Log the token like the Django backend does, and email it if configured"""
+        if self.token_log:
+            line = f"{time.strftime('%Y-%m-%d %H:%M:%S')} INFO Password reset token generated for {email}: token={token}\n"
+            with self.log_lock, open(self.token_log, 'a', encoding='utf-8') as handle:
+                handle.write(line)
+
+        # The real backend sends the email synchronously inside the request;
+        # the token is already in the logs while the slow send is in progress
+        if self.email_latency:
+            time.sleep(self.email_latency)
+
+        if self.smtp:
+            message = EmailMessage()
+            message['From'] = 'noreply@gobarberly.local'
+            message['To'] = email
+            message['Subject'] = 'Reset your GoBarberly password'
+            message.set_content(f"Reset your password: http://localhost:5173/reset-password?token={token}\n")
+            host, _, port = self.smtp.rpartition(':')
+            try:
+                with smtplib.SMTP(host or DEFAULT_HOST, int(port), timeout=10) as client:
+                    client.send_message(message)
+            except OSError as e:
+                print(f"⚠️  Stub could not deliver reset email: {e}", file=sys.stderr)
+
+    # ---- Endpoints -----------------------------------------------------
+
+    def login(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        email = str(body.get("email", "")).lower()
+        with self.lock:
+            valid = email in self.users and self.users[email] == body.get("password")
+        if not valid:
+            return 401, {"success": False, "message": "Invalid email or password"}
+        data = self.issue_tokens(email)
+        data["user"] = {"email": email, "role": "super_admin"}
+        return 200, {"success": True, "message": "Login successful", "data": data}
+
+    def forgot_password(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        email = str(body.get("email", "")).lower()
+        if not email:
+            return 400, {"success": False, "message": "Email is required"}
+        with self.lock:
+            known = email in self.users
+            token = secrets.token_urlsafe(24) if known else None
+            if known:
+                self.reset_tokens[token] = (email, time.time() + RESET_TOKEN_LIFETIME)
+        if known:
+            self.deliver_reset_token(email, token)
+        # Same answer for unknown emails, like the real backend
+        return 200, {"success": True, "message": "If the email exists, a reset link has been sent"}
+
+    def reset_password(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        token = body.get("token")
+        new_password = body.get("new_password")
+        if not token or not new_password:
+            return 400, {"success": False, "message": "Token and new password are required"}
+        if new_password != body.get("new_password_confirm"):
+            return 400, {"success": False, "message": "Passwords do not match"}
+        with self.lock:
+            entry = self.reset_tokens.pop(token, None)
+            if not entry or entry[1] < time.time():
+                return 400, {"success": False, "message": "Invalid or expired token"}
+            self.users[entry[0]] = new_password
+        return 200, {"success": True, "message": "Password reset successfully"}
+
+    def refresh(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        with self.lock:
+            entry = self.refresh_tokens.pop(body.get("refresh", ""), None)
+        if not entry or entry[1] < time.time():
+            return 401, {"detail": "Token is invalid or expired", "code": "token_not_valid"}
+        return 200, self.issue_tokens(entry[0])
+
+    def route(self, method: str, path: str, body: Dict[str, Any],
+              headers) -> Tuple[int, Dict[str, Any]]:
+        """Dispatch one request (after latency/error simulation)"""
+        if method == 'GET' and path == '/api/health/':
+            return 200, {"status": "ok"}
+        if method == 'GET' and path == '/api/auth/profile/':
+            auth = headers.get('Authorization', '')
+            email = self.verify_access_token(auth[7:]) if auth.startswith('Bearer ') else None
+            if not email:
+                return 401, {"detail": "Authentication credentials were not provided."}
+            return 200, {"success": True, "data": {"email": email, "role": "super_admin"}}
+
+        handlers = {
+            '/api/auth/login/': self.login,
+            '/api/auth/forgot-password/': self.forgot_password,
+            '/api/auth/reset-password/': self.reset_password,
+            '/api/auth/token/refresh/': self.refresh,
+        }
+        handler = handlers.get(path)
+        if handler is None:
+            return 404, {"detail": "Not found."}
+        if method != 'POST':
+            return 405, {"detail": f'Method "{method}" not allowed.'}
+        return handler(body)
+
+    # ---- Lifecycle -----------------------------------------------------
+
+    def make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+            server_version = 'GoBarberlyStub/1.0'
+
+            def send_json(self, status: int, data: Dict[str, Any], retry_after: Optional[int] = None):
+                payload = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                if retry_after is not None:
+                    self.send_header('Retry-After', str(retry_after))
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('Access-Control-Allow-Origin', self.headers.get('Origin', '*'))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def handle_any(self, method: str):
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                retry_after = stub.throttle(urlsplit(self.path).path)
+                if retry_after is not None:
+                    return self.send_json(429, {"detail": "Request was throttled."}, retry_after)
+                if stub.simulate_dyno():
+                    return self.send_json(stub.error_status, {"detail": "Injected error"})
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    return self.send_json(400, {"detail": "JSON parse error"})
+                status, data = stub.route(method, urlsplit(self.path).path, body, self.headers)
+                self.send_json(status, data)
+
+            def do_GET(self):
+                self.handle_any('GET')
+
+            def do_POST(self):
+                self.handle_any('POST')
+
+            def do_OPTIONS(self):
+                stub.simulate_dyno()
+                self.send_response(200)
+                self.send_header('Access-Control-Allow-Origin', self.headers.get('Origin', '*'))
+                self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, PATCH, DELETE, OPTIONS')
+                self.send_header('Access-Control-Allow-Headers', 'authorization, content-type')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StubAuthServer':
+        """Serve on a background thread (port 0 picks a free port)"""
+        self.httpd = _StubHTTPServer((self.host, self.port), self.make_handler())
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="stub-auth-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Run the stub from the command line"""
+    parser = argparse.ArgumentParser(description="Local stand-in for the GoBarberly auth API")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="base latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random latency (s)")
+    parser.add_argument("--email-latency", type=float, default=0.0, help="synchronous email send time in forgot-password (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--cold-start", type=float, default=0.0, help="boot delay when the dyno is asleep (s)")
+    parser.add_argument("--idle-timeout", type=float, help="go to sleep after this many idle seconds")
+    parser.add_argument("--start-cold", action="store_true", help="first request pays the cold start")
+    parser.add_argument("--token-log", help="append 'Password reset token generated' lines here")
+    parser.add_argument("--smtp", help="host:port to email reset links to (e.g. the SMTP token sink)")
+    parser.add_argument("--user", action="append", default=[], help="email:password (repeatable)")
+    parser.add_argument("--seed", type=int, help="random seed for jitter/error injection")
+    parser.add_argument("--throttle-rate", type=int, help="answer 429 above this many requests/s per endpoint")
+    args = parser.parse_args()
+
+    users = dict(DEFAULT_USERS)
+    for entry in args.user:
+        email, _, password = entry.partition(':')
+        users[email.lower()] = password
+
+    stub = StubAuthServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        email_latency=args.email_latency, error_rate=args.error_rate,
+        error_status=args.error_status, cold_start=args.cold_start,
+        idle_timeout=args.idle_timeout, start_cold=args.start_cold,
+        token_log=args.token_log, smtp=args.smtp, users=users, seed=args.seed,
+        throttle_rate=args.throttle_rate
+    )
+    stub.start()
+    print(f"🧪 Stub auth API listening on {stub.url}", file=sys.stderr)
+    print(f"💡 Point the tools at it with GOBARBERLY_BASE_URL={stub.url}", file=sys.stderr)
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
+        print(f"📊 {json.dumps(stub.stats)}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,16 @@ Test Django Backend Connectivity
 Check if the localhost backend is accessible
 """
 
-import requests
 import json
+import sys
+
+from console import emit, enable_json_output, take_json_flag
+from gobarberly_client import LOCAL_BASE_URL, get_session, resolve_base_url
+from health_matrix import run_health_matrix
+from profiling import profiled_main
+
+# Shared pooled session (keep-alive + per-endpoint timeouts)
+session = get_session()
 
 def test_backend():
     """Test basic connectivity to Django backend"""
@@ -13,62 +21,42 @@ def test_backend():
     print("🔍 Testing Django Backend Connectivity")
     print("=" * 50)
     
-    base_url = "http://localhost:8000"
-    
-    # Test 1: Basic connectivity
-    print("1. Testing basic connectivity...")
-    try:
-        response = requests.get(f"{base_url}/api/", timeout=10)
-        print(f"   ✅ Status: {response.status_code}")
-        print(f"   📋 Response: {response.text[:100]}...")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
+    base_url = resolve_base_url(LOCAL_BASE_URL)
     
-    # Test 2: CORS preflight (OPTIONS)
-    print("\n2. Testing CORS preflight...")
-    try:
-        response = requests.options(f"{base_url}/api/auth/forgot-password/", 
-                                  headers={
-                                      'Origin': 'http://localhost:3000',
-                                      'Access-Control-Request-Method': 'POST',
-                                      'Access-Control-Request-Headers': 'Content-Type'
-                                  },
-                                  timeout=10)
-        print(f"   ✅ Status: {response.status_code}")
-        print(f"   📋 CORS Headers: {dict(response.headers)}")
-    except Exception as e:
-        print(f"   ❌ Error: {e}")
+    # Tests 1-2: every read endpoint plus CORS preflights, checked in parallel
+    print("1. Checking API surface and CORS (parallel)...")
+    healthy = run_health_matrix(base_url, origin='http://localhost:3000')
     
-    # Test 3: Actual POST request
-    print("\n3. Testing POST request...")
+    # Test 2: Actual POST request
+    print("\n2. Testing POST request...")
     try:
-        response = requests.post(f"{base_url}/api/auth/forgot-password/",
-                               json={"email": "test@example.com"},
-                               headers={
-                                   'Content-Type': 'application/json',
-                                   'Origin': 'http://localhost:3000'
-                               },
-                               timeout=10)
+        response = session.post(f"{base_url}/api/auth/forgot-password/",
+                              json={"email": "test@example.com"},
+                              headers={
+                                  'Content-Type': 'application/json',
+                                  'Origin': 'http://localhost:3000'
+                              },
+                              timeout=10)
         print(f"   ✅ Status: {response.status_code}")
         
         if response.headers.get('content-type', '').startswith('application/json'):
             try:
                 data = response.json()
                 print(f"   📋 Response: {json.dumps(data, indent=2)}")
-            except:
+            except ValueError:
                 print(f"   📋 Raw Response: {response.text}")
         else:
             print(f"   📋 Raw Response: {response.text}")
     except Exception as e:
         print(f"   ❌ Error: {e}")
     
-    # Test 4: Check Django settings
-    print("\n4. Testing Django admin/debug info...")
-    try:
-        response = requests.get(f"{base_url}/admin/", timeout=10)
-        print(f"   ✅ Admin accessible: {response.status_code}")
-    except Exception as e:
-        print(f"   ❌ Admin error: {e}")
+    emit({"event": "result", "operation": "connectivity", "success": healthy})
+    return healthy
+
+def run_cli() -> bool:
+    if take_json_flag(sys.argv[1:])[1]:
+        enable_json_output('test_backend_connectivity')
+    return test_backend()
 
 if __name__ == "__main__":
-    test_backend()
\ No newline at end of file
+    sys.exit(0 if profiled_main('test_backend_connectivity', run_cli) else 1)
\ No newline at end of file
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Encrypted JWT Token Cache for Admin Sessions
+Keeps access/refresh tokens per (backend URL, account) between runs, renews
+them through /api/auth/token/refresh/ shortly before they expire and only
+falls back to a full /api/auth/login/ when the refresh is rejected
+
+Tokens are encrypted with Fernet when the recommended `cryptography` package
+is installed; without it they are cached in memory for the current process
+only - bearer tokens are never written to disk in the clear
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+
+from gobarberly_client import state_path
+
+CACHE_FILE = 'token-cache.bin'
+KEY_FILE = 'token-cache.key'
+
+REFRESH_PATH = '/api/auth/token/refresh/'
+
+# Renew access tokens this many seconds before they expire
+REFRESH_MARGIN = 60
+
+# Used when a token carries no readable exp claim
+DEFAULT_ACCESS_LIFETIME = 300
+
+# Work factor for the password fingerprint stored next to each entry
+FINGERPRINT_ITERATIONS = 100_000
+
+# Returns the login response's token payload ({access, refresh, expires_in}) or None
+LoginFunc = Callable[[str, str], Optional[Dict[str, Any]]]
+
+
+def _fernet_module():
+    """cryptography.fernet if the optional package is installed (imported on first use)"""
+    try:
+        from cryptography import fernet
+    except ImportError:
+        return None
+    return fernet
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """exp claim of a JWT (unverified - only used to schedule renewal)"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+        return float(exp) if exp is not None else None
+    except (IndexError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def cache_key(base_url: str, email: str) -> str:
+    return f"{base_url.rstrip('/')}|{email.strip().lower()}"
+
+
+def password_fingerprint(key: str, password: str) -> str:
+    """Slow salted hash so a cached session is only reused with the same password"""
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), key.encode('utf-8'),
+                                 FINGERPRINT_ITERATIONS)
+    return digest.hex()
+
+
+class TokenCache:
+    """
+    Token store keyed by backend URL and account
+    Persists to an encrypted file in ~/.gobarberly when Fernet is available
+    """
+
+    def __init__(self, path: Optional[str] = None, key_path: Optional[str] = None,
+                 persistent: Optional[bool] = None):
+        fernet = _fernet_module() if persistent is not False else None
+        self.persistent = fernet is not None
+        self.path = path
+        self.key_path = key_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.fernet = None
+        if self.persistent:
+            self.path = path or state_path(CACHE_FILE)
+            self.key_path = key_path or state_path(KEY_FILE)
+            self.fernet_module = fernet
+            self.fernet = fernet.Fernet(self._load_key())
+            self.entries = self._load()
+
+    def _load_key(self) -> bytes:
+        """Read the cache key, creating it (mode 0600) on first use"""
+        try:
+            with open(self.key_path, 'rb') as handle:
+                return handle.read().strip()
+        except FileNotFoundError:
+            key = self.fernet_module.Fernet.generate_key()
+            fd = os.open(self.key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(key)
+            return key
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'rb') as handle:
+                return json.loads(self.fernet.decrypt(handle.read()))
+        except FileNotFoundError:
+            return {}
+        except (self.fernet_module.InvalidToken, ValueError):
+            # Key rotated or file damaged - start over rather than fail the tool
+            return {}
+
+    def _save(self):
+        if not self.persistent:
+            return
+        data = self.fernet.encrypt(json.dumps(self.entries).encode('utf-8'))
+        temp_path = f"{self.path}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(temp_path, self.path)
+
+    def get(self, base_url: str, email: str, password: Optional[str] = None,
+            fingerprint: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Cached entry for an account; a password (or its fingerprint) that doesn't match is a miss"""
+        key = cache_key(base_url, email)
+        entry = self._read(key)
+        if entry and fingerprint is None and password is not None:
+            fingerprint = password_fingerprint(key, password)
+        if entry and fingerprint is not None and not hmac.compare_digest(entry.get("fingerprint", ""), fingerprint):
+            return None
+        return dict(entry) if entry else None
+
+    def put(self, base_url: str, email: str, tokens: Dict[str, Any],
+            password: Optional[str] = None, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """Store a login/refresh response ({access, refresh, expires_in})"""
+        key = cache_key(base_url, email)
+        now = time.time()
+        access = tokens["access"]
+        refresh = tokens.get("refresh")
+        expires_in = tokens.get("expires_in")
+        entry = {
+            "access": access,
+            "access_exp": jwt_expiry(access) or now + float(expires_in or DEFAULT_ACCESS_LIFETIME),
+            "refresh": refresh,
+            "refresh_exp": jwt_expiry(refresh) if refresh else None,
+            "fingerprint": fingerprint or (password_fingerprint(key, password) if password is not None else ""),
+            "stored_at": now
+        }
+        self._write(key, entry)
+        return dict(entry)
+
+    def invalidate(self, base_url: str, email: str):
+        self._delete(cache_key(base_url, email))
+
+    # Storage hooks (the reset agent overrides these to keep tokens in its process)
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.entries.get(key)
+
+    def _write(self, key: str, entry: Dict[str, Any]):
+        with self.lock:
+            self.entries[key] = entry
+            self._save()
+
+    def _delete(self, key: str):
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self._save()
+
+
+def _token_payload(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Tokens from either a bare simple-jwt response or the {success, data} envelope"""
+    if isinstance(data.get('data'), dict):
+        data = data['data']
+    return data if data.get('access') else None
+
+
+class CachedAuth:
+    """Hands out a valid access token: cache first, then refresh, then login"""
+
+    def __init__(self, session: requests.Session, base_url: str, cache: Optional[TokenCache] = None):
+        self.session = session
+        self.base_url = base_url.rstrip('/')
+        self.cache = cache if cache is not None else shared_cache()
+        self.fingerprints: Dict[Tuple[str, str], str] = {}
+
+    def fingerprint(self, email: str, password: str) -> str:
+        """Password fingerprint for an account, derived once per process (PBKDF2 is slow on purpose)"""
+        key = cache_key(self.base_url, email)
+        if (key, password) not in self.fingerprints:
+            self.fingerprints[(key, password)] = password_fingerprint(key, password)
+        return self.fingerprints[(key, password)]
+
+    def has_session(self, email: str, password: str) -> bool:
+        """True when a cached access or refresh token exists for this account and password"""
+        return self.cache.get(self.base_url, email, fingerprint=self.fingerprint(email, password)) is not None
+
+    def refresh(self, refresh_token: str) -> Optional[Dict[str, Any]]:
+        """Exchange a refresh token; None if the backend rejects it"""
+        try:
+            response = self.session.post(f"{self.base_url}{REFRESH_PATH}", json={"refresh": refresh_token})
+        except requests.exceptions.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            tokens = _token_payload(response.json())
+        except ValueError:
+            return None
+        if tokens and not tokens.get('refresh'):
+            tokens = dict(tokens, refresh=refresh_token)  # backend without rotation
+        return tokens
+
+    def access_token(self, email: str, password: str, login: LoginFunc) -> Tuple[Optional[str], str]:
+        """
+        Returns (access token, source) where source is 'cache', 'refresh' or 'login'
+        The token is also installed as the session's Authorization header
+        """
+        now = time.time()
+        fingerprint = self.fingerprint(email, password)
+        entry = self.cache.get(self.base_url, email, fingerprint=fingerprint)
+        token, source = None, 'login'
+
+        if entry and entry["access_exp"] - REFRESH_MARGIN > now:
+            token, source = entry["access"], 'cache'
+        elif entry and entry.get("refresh") and (entry.get("refresh_exp") or now + 1) > now:
+            tokens = self.refresh(entry["refresh"])
+            if tokens:
+                token, source = self.cache.put(self.base_url, email, tokens,
+                                               fingerprint=entry["fingerprint"])["access"], 'refresh'
+
+        if token is None:
+            tokens = login(email, password)
+            if not tokens:
+                return None, 'login'
+            token = self.cache.put(self.base_url, email, tokens, fingerprint=fingerprint)["access"]
+
+        self.session.headers['Authorization'] = f'Bearer {token}'
+        return token, source
+
+    def invalidate(self, email: str):
+        """Drop a token the backend no longer accepts"""
+        self.cache.invalidate(self.base_url, email)
+        self.session.headers.pop('Authorization', None)
+
+
+def login_with_cache(session: requests.Session, base_url: str, email: str, password: str) -> Optional[str]:
+    """Access token for an account via CachedAuth and /api/auth/login/, installed on the session"""
+    base_url = base_url.rstrip('/')
+
+    def password_login(login_email: str, login_password: str) -> Optional[Dict[str, Any]]:
+        response = session.post(f"{base_url}/api/auth/login/",
+                                json={"email": login_email, "password": login_password})
+        if response.status_code == 200:
+            return response.json().get('data')
+        return None
+
+    token, _ = CachedAuth(session, base_url).access_token(email, password, password_login)
+    return token
+
+
+_shared_cache: Optional[TokenCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache() -> TokenCache:
+    """Process-wide cache (the reset agent's when it runs; warns once when it cannot persist)"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            from reset_agent import agent_token_cache
+
+            _shared_cache = agent_token_cache()
+            if _shared_cache is not None:
+                return _shared_cache
+            _shared_cache = TokenCache()
+            if not _shared_cache.persistent:
+                print("ℹ️  Install 'cryptography' to keep admin sessions between runs "
+                      "(tokens are cached in memory only)", file=sys.stderr)
+        return _shared_cache
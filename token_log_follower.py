@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Backend Log Token Follower
+Watches backend logs for 'Password reset token generated' lines and hands
+the token for the pending email straight to the reset tools
+Regular files are memory-mapped and scanned incrementally from the last
+offset; FIFOs and other streams are read line by line on a background thread
+"""
+
+import mmap
+import os
+import re
+import stat
+import sys
+import threading
+import time
+import weakref
+from typing import Dict, Optional, Set
+
+# Environment variable naming the log file / FIFO to follow ('-' for stdin)
+TOKEN_LOG_ENV = 'GOBARBERLY_TOKEN_LOG'
+
+# Environment variable with host:port for an in-process SMTP token sink
+SMTP_SINK_ENV = 'GOBARBERLY_SMTP_SINK'
+
+# Seconds to wait for the token before falling back to manual entry
+DEFAULT_TOKEN_WAIT = 120
+
+# Precompiled matchers (bytes, so they run directly on the mmap)
+MARKER_PATTERN = re.compile(rb'Password reset token generated', re.IGNORECASE)
+LINE_PATTERN = re.compile(rb'^.*Password reset token generated.*$', re.IGNORECASE | re.MULTILINE)
+EMAIL_PATTERN = re.compile(rb'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+KEYED_TOKEN_PATTERN = re.compile(rb'token[\s"\']*[=:][\s"\']*([A-Za-z0-9_\-]{16,})', re.IGNORECASE)
+BARE_TOKEN_PATTERN = re.compile(rb'(?<![\w\-@.])([A-Za-z0-9_\-]{16,})(?![\w\-@])')
+
+
+# One reader thread owns stdin; every '-' follower gets its lines
+_stdin_followers: 'weakref.WeakSet[TokenLogFollower]' = weakref.WeakSet()
+_stdin_lock = threading.Lock()
+_stdin_reader: Optional[threading.Thread] = None
+
+
+def _read_stdin():
+    for line in sys.stdin.buffer:
+        if MARKER_PATTERN.search(line):
+            with _stdin_lock:
+                followers = list(_stdin_followers)
+            for follower in followers:
+                follower._record(line)
+
+
+def _follow_stdin(follower: 'TokenLogFollower'):
+    global _stdin_reader
+    with _stdin_lock:
+        _stdin_followers.add(follower)
+        if _stdin_reader is None:
+            _stdin_reader = threading.Thread(target=_read_stdin, name="token-log-stdin", daemon=True)
+            _stdin_reader.start()
+
+
+def parse_token_line(line: bytes) -> Optional[tuple]:
+    """
+    Return (email or None, token) for a token log line
+    Prefers an explicit token=/token: value, else the first long bare word
+    after the marker that is not part of an email address
+    """
+    marker = MARKER_PATTERN.search(line)
+    if not marker:
+        return None
+    tail = line[marker.end():]
+    email = EMAIL_PATTERN.search(line)
+
+    match = KEYED_TOKEN_PATTERN.search(tail) or BARE_TOKEN_PATTERN.search(EMAIL_PATTERN.sub(b' ', tail))
+    if not match:
+        return None
+    token = match.group(1).decode('utf-8', 'replace')
+    return (email.group(0).decode('utf-8').lower() if email else None, token)
+
+
+class TokenLogFollower:
+    """
+    Follows a backend log and indexes reset tokens by email
+    Only lines written after the follower starts are considered, so stale
+    tokens from earlier resets are never picked up. A log that does not
+    exist yet is waited for and then read from its first line
+    """
+
+    def __init__(self, source: str, poll_interval: float = 0.2):
+        self.source = source
+        self.poll_interval = poll_interval
+        self.tokens: Dict[Optional[str], str] = {}
+        self.pending: Set[str] = set()  # emails asked for and not delivered yet
+        self.condition = threading.Condition()
+        self.offset = 0
+        self.stream_mode = source == '-'
+        self.missing = False
+
+        if self.stream_mode:
+            _follow_stdin(self)
+        else:
+            try:
+                self._attach(os.stat(source), at_end=True)
+            except FileNotFoundError:
+                self.missing = True
+
+    def _attach(self, info: os.stat_result, at_end: bool):
+        """Start following an existing log: FIFOs on a thread, files from the end (or start)"""
+        self.missing = False
+        if not stat.S_ISREG(info.st_mode):
+            self.stream_mode = True
+            threading.Thread(target=self._read_stream, name="token-log-stream", daemon=True).start()
+        else:
+            self.offset = info.st_size if at_end else 0
+
+    def _record(self, line: bytes):
+        parsed = parse_token_line(line)
+        if parsed:
+            email, token = parsed
+            with self.condition:
+                self.tokens[email] = token
+                self.condition.notify_all()
+
+    def _read_stream(self):
+        """Background reader for FIFOs and pipes"""
+        with open(self.source, 'rb') as handle:
+            for line in handle:
+                if MARKER_PATTERN.search(line):
+                    self._record(line)
+
+    def scan(self):
+        """Scan newly appended bytes of a regular log file"""
+        if self.missing:
+            try:
+                self._attach(os.stat(self.source), at_end=False)  # created after we started: all new
+            except FileNotFoundError:
+                return
+        if self.stream_mode:
+            return
+
+        try:
+            size = os.path.getsize(self.source)
+        except FileNotFoundError:
+            self.missing = True  # rotated away; pick up its successor
+            self.offset = 0
+            return
+        if size < self.offset:
+            # Log was truncated or rotated; start over
+            self.offset = 0
+        if size == self.offset:
+            return
+
+        with open(self.source, 'rb') as handle:
+            with mmap.mmap(handle.fileno(), size, access=mmap.ACCESS_READ) as view:
+                # Only consume complete lines; a partial last line is read next time
+                end = view.rfind(b'\n', self.offset, size) + 1
+                if end <= self.offset:
+                    return
+                for match in LINE_PATTERN.finditer(view, self.offset, end):
+                    self._record(match.group(0))
+                self.offset = end
+
+    def poll_token(self, email: str, match_anonymous: bool = True) -> Optional[str]:
+        """
+        Return the token for this email if it has shown up (non-blocking)
+        A line without an email only counts while this is the one pending email,
+        so one account's token is never handed to another
+        """
+        self.scan()
+        email = email.lower()
+        with self.condition:
+            self.pending.add(email)
+            token = self.tokens.pop(email, None)
+            if token is None and match_anonymous and self.pending == {email}:
+                token = self.tokens.pop(None, None)
+            if token is not None:
+                self.pending.discard(email)
+            return token
+
+    def wait_for_token(self, email: str, timeout: float = DEFAULT_TOKEN_WAIT) -> Optional[str]:
+        """Block until the token for this email is logged, or time out"""
+        deadline = time.monotonic() + timeout
+        while True:
+            token = self.poll_token(email)
+            if token:
+                return token
+            if time.monotonic() >= deadline:
+                # Stop counting as pending, or anonymous lines never match a later email
+                with self.condition:
+                    self.pending.discard(email.lower())
+                return None
+            with self.condition:
+                self.condition.wait(min(self.poll_interval, max(0, deadline - time.monotonic())))
+
+
+def token_follower_from_env() -> Optional[TokenLogFollower]:
+    """
+    Start a token source from the environment (call before forgot-password)
+    GOBARBERLY_SMTP_SINK wins over GOBARBERLY_TOKEN_LOG; both expose
+    poll_token()/wait_for_token()
+    """
+    sink_address = os.environ.get(SMTP_SINK_ENV)
+    if sink_address:
+        from smtp_token_sink import shared_sink
+        try:
+            return shared_sink(sink_address)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Cannot start SMTP token sink on {sink_address}: {e}")
+
+    source = os.environ.get(TOKEN_LOG_ENV)
+    if not source:
+        return None
+    try:
+        return TokenLogFollower(source)
+    except OSError as e:
+        print(f"⚠️  Cannot follow token log {source}: {e}")
+        return None
+
+
+def obtain_reset_token(follower: Optional[TokenLogFollower], email: str, prompt: str,
+                       timeout: float = DEFAULT_TOKEN_WAIT) -> str:
+    """Take the token from the followed log, falling back to asking the operator"""
+    if follower:
+        print(f"👀 Watching {follower.source} for the reset token of {email}...")
+        token = follower.wait_for_token(email, timeout)
+        if token:
+            print(f"🔑 Token picked up from {follower.source}: {token[:20]}...")
+            return token
+        print(f"⚠️  No token showed up within {timeout:.0f}s")
+        if follower.source == '-':
+            return ''  # stdin is the log, there is no operator to ask
+    return input(prompt).strip()